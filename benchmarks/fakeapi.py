@@ -0,0 +1,506 @@
+"""A local stand-in for the Discord REST API for benchmarks and offline testing.
+
+Every APIEndpoint in snekcord.rest.endpoints is served with a synthesized
+response. Requests are rate limited per route and major parameters (with
+the same headers Discord sends) and globally, and the server can add latency
+and inject 429 and 5xx responses at random.
+
+Run with `python benchmarks/fakeapi.py --port 8080` from the root of the repository
+and point a session at it with RESTSession(api='http://127.0.0.1:8080'),
+or start it from a script with `await FakeDiscordAPI(...).start()`."""
+
+import argparse
+import asyncio
+import collections
+import hashlib
+import json
+import random
+import time
+from datetime import datetime, timezone
+
+from aiohttp import web
+
+from snekcord.rest import endpoints
+from snekcord.rest.endpoints import MAJOR_PARAMS, APIEndpoint
+from snekcord.snowflake import Snowflake
+
+ERROR_STATUSES = (500, 502, 503, 504)
+
+# POST routes that Discord answers with 204 No Content
+NO_CONTENT_SUFFIXES = ('/typing', '/bulk-delete')
+
+CURRENT_USER_ID = '1'
+DEFAULT_GUILD_ID = '1'
+
+# Routes whose responses are lists, keyed by the last segment of their path
+LIST_RESOURCES = {
+    'audit-logs',
+    'bans',
+    'channels',
+    'emojis',
+    'integrations',
+    'invites',
+    'members',
+    'messages',
+    'pins',
+    'regions',
+    'roles',
+    'search',
+    'templates',
+    'webhooks',
+}
+
+
+def snowflake(offset=0):
+    return str(Snowflake.build() + (offset << 22))
+
+
+def timestamp():
+    return datetime.now(timezone.utc).isoformat()
+
+
+def json_response(data, *, status=200, headers=None):
+    # aiohttp's json_response appends a charset, Discord sends the bare content type
+    headers = dict(headers) if headers is not None else {}
+    headers['Content-Type'] = 'application/json'
+
+    return web.Response(body=json.dumps(data).encode(), status=status, headers=headers)
+
+
+def make_user(user_id):
+    if user_id == '@me':
+        user_id = CURRENT_USER_ID
+
+    return {
+        'id': str(user_id),
+        'username': f'user{user_id}',
+        'discriminator': f'{int(user_id) % 10000:04}',
+        'avatar': None,
+    }
+
+
+def make_member(guild_id, user_id):
+    return {
+        'user': make_user(user_id),
+        'guild_id': guild_id,
+        'nick': None,
+        'roles': [],
+        'joined_at': timestamp(),
+        'deaf': False,
+        'mute': False,
+    }
+
+
+def make_message(channel_id, message_id, **fields):
+    message = {
+        'id': str(message_id),
+        'channel_id': channel_id,
+        'author': make_user(CURRENT_USER_ID),
+        'content': f'message {message_id}',
+        'timestamp': Snowflake(message_id).to_datetime().isoformat(),
+        'edited_timestamp': None,
+        'tts': False,
+        'mention_everyone': False,
+        'mentions': [],
+        'mention_roles': [],
+        'attachments': [],
+        'embeds': [],
+        'pinned': False,
+        'type': 0,
+    }
+    message.update(fields)
+    return message
+
+
+def make_channel(channel_id, guild_id=None, **fields):
+    channel = {
+        'id': str(channel_id),
+        'type': 0,
+        'guild_id': guild_id if guild_id is not None else DEFAULT_GUILD_ID,
+        'name': f'channel-{channel_id}',
+        'position': 0,
+        'topic': None,
+        'nsfw': False,
+        'rate_limit_per_user': 0,
+        'last_message_id': None,
+        'parent_id': None,
+    }
+    channel.update(fields)
+    return channel
+
+
+def make_role(role_id, **fields):
+    role = {
+        'id': str(role_id),
+        'name': f'role-{role_id}',
+        'color': 0,
+        'hoist': False,
+        'icon': None,
+        'unicode_emoji': None,
+        'position': 0,
+        'permissions': '0',
+        'managed': False,
+        'mentionable': False,
+    }
+    role.update(fields)
+    return role
+
+
+def make_guild(guild_id, **fields):
+    guild = {
+        'id': str(guild_id),
+        'name': f'guild-{guild_id}',
+        'icon': None,
+        'splash': None,
+        'discovery_splash': None,
+        'owner_id': CURRENT_USER_ID,
+        'afk_channel_id': None,
+        'afk_timeout': 300,
+        'verification_level': 0,
+        'default_message_notifications': 0,
+        'explicit_content_filter': 0,
+        'features': [],
+        'mfa_level': 0,
+        'application_id': None,
+        'system_channel_id': None,
+        'system_channel_flags': 0,
+        'rules_channel_id': None,
+        'vanity_url_code': None,
+        'description': None,
+        'banner': None,
+        'premium_tier': 0,
+        'preferred_locale': 'en-US',
+        'public_updates_channel_id': None,
+        'nsfw_level': 0,
+        'premium_progress_bar_enabled': False,
+        'roles': [make_role(guild_id, name='@everyone')],
+        'emojis': [],
+    }
+    guild.update(fields)
+    return guild
+
+
+class Bucket:
+    def __init__(self, limit, window):
+        self.limit = limit
+        self.window = window
+        self.remaining = limit
+        self.reset_at = 0.0
+
+    def acquire(self):
+        now = time.monotonic()
+        if now >= self.reset_at:
+            self.remaining = self.limit
+            self.reset_at = now + self.window
+
+        if self.remaining == 0:
+            return False
+
+        self.remaining -= 1
+        return True
+
+    def get_headers(self, bucket_hash):
+        reset_after = max(self.reset_at - time.monotonic(), 0.0)
+        return {
+            'X-RateLimit-Limit': str(self.limit),
+            'X-RateLimit-Remaining': str(self.remaining),
+            'X-RateLimit-Reset': f'{time.time() + reset_after:.3f}',
+            'X-RateLimit-Reset-After': f'{reset_after:.3f}',
+            'X-RateLimit-Bucket': bucket_hash,
+        }
+
+
+class FakeDiscordAPI:
+    """An aiohttp application that imitates the Discord REST API.
+
+    latency and jitter are in seconds; every response is delayed by latency plus
+    a random amount up to jitter. ratelimit_rate and error_rate are the
+    probabilities of answering a request that is within its limits with a
+    shared-scope 429 or a 5xx response."""
+
+    def __init__(
+        self,
+        *,
+        latency=0.0,
+        jitter=0.0,
+        bucket_limit=5,
+        bucket_window=1.0,
+        global_limit=50,
+        ratelimit_rate=0.0,
+        error_rate=0.0,
+        list_size=10,
+        seed=None,
+    ):
+        self.latency = latency
+        self.jitter = jitter
+        self.bucket_limit = bucket_limit
+        self.bucket_window = bucket_window
+        self.global_limit = global_limit
+        self.ratelimit_rate = ratelimit_rate
+        self.error_rate = error_rate
+        self.list_size = list_size
+        self.random = random.Random(seed)
+
+        self.buckets = {}
+        self.global_bucket = Bucket(global_limit, 1.0)
+
+        self.requests = collections.Counter()
+        self.statuses = collections.Counter()
+
+        self.runner = None
+
+    def get_endpoints(self):
+        api_endpoints = [
+            value for value in vars(endpoints).values() if isinstance(value, APIEndpoint)
+        ]
+
+        # Routes are matched in the order they are added, so literal segments
+        # (/members/@me, /members/search) have to come before placeholders
+        return sorted(api_endpoints, key=lambda endpoint: endpoint.path.count('{'))
+
+    def create_app(self):
+        app = web.Application(client_max_size=2**26)
+
+        seen = set()
+        for endpoint in self.get_endpoints():
+            if (endpoint.method, endpoint.path) in seen:
+                continue
+
+            seen.add((endpoint.method, endpoint.path))
+            app.router.add_route(endpoint.method, endpoint.path, self.create_handler(endpoint))
+
+        return app
+
+    async def start(self, host='127.0.0.1', port=0):
+        """Start serving and return the base url to pass to RESTSession(api=...)."""
+        self.runner = web.AppRunner(self.create_app(), access_log=None)
+        await self.runner.setup()
+
+        await web.TCPSite(self.runner, host, port).start()
+
+        host, port = self.runner.addresses[0][:2]
+        return f'http://{host}:{port}'
+
+    async def close(self):
+        if self.runner is not None:
+            await self.runner.cleanup()
+
+    def create_handler(self, endpoint):
+        route = f'{endpoint.method} {endpoint.path}'
+        bucket_hash = hashlib.sha1(route.encode()).hexdigest()[:16]
+        major_params = sorted(endpoint.keywords & MAJOR_PARAMS)
+
+        async def handler(request):
+            self.requests[route] += 1
+
+            response = await self.handle(endpoint, bucket_hash, major_params, request)
+
+            self.statuses[response.status] += 1
+            return response
+
+        return handler
+
+    async def handle(self, endpoint, bucket_hash, major_params, request):
+        if 'Authorization' not in request.headers:
+            return json_response({'message': '401: Unauthorized', 'code': 0}, status=401)
+
+        delay = self.latency + self.random.uniform(0, self.jitter)
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+        if not self.global_bucket.acquire():
+            retry_after = max(self.global_bucket.reset_at - time.monotonic(), 0.0)
+            return json_response(
+                {
+                    'message': 'You are being rate limited.',
+                    'retry_after': retry_after,
+                    'global': True,
+                },
+                status=429,
+                headers={'X-RateLimit-Global': 'true', 'Retry-After': f'{retry_after:.3f}'},
+            )
+
+        key = (bucket_hash, *(request.match_info[param] for param in major_params))
+
+        bucket = self.buckets.get(key)
+        if bucket is None:
+            bucket = self.buckets[key] = Bucket(self.bucket_limit, self.bucket_window)
+
+        if not bucket.acquire():
+            headers = bucket.get_headers(bucket_hash)
+            headers['X-RateLimit-Scope'] = 'user'
+            headers['Retry-After'] = headers['X-RateLimit-Reset-After']
+
+            return json_response(
+                {
+                    'message': 'You are being rate limited.',
+                    'retry_after': float(headers['X-RateLimit-Reset-After']),
+                    'global': False,
+                },
+                status=429,
+                headers=headers,
+            )
+
+        headers = bucket.get_headers(bucket_hash)
+
+        if self.random.random() < self.ratelimit_rate:
+            retry_after = self.random.uniform(0.05, 0.5)
+
+            headers['X-RateLimit-Scope'] = 'shared'
+            headers['Retry-After'] = f'{retry_after:.3f}'
+
+            return json_response(
+                {
+                    'message': 'You are being rate limited.',
+                    'retry_after': retry_after,
+                    'global': False,
+                },
+                status=429,
+                headers=headers,
+            )
+
+        if self.random.random() < self.error_rate:
+            return json_response(
+                {'message': 'Internal Server Error', 'code': 0},
+                status=self.random.choice(ERROR_STATUSES),
+                headers=headers,
+            )
+
+        body = None
+        if request.can_read_body and request.content_type == 'application/json':
+            body = await request.json()
+        elif request.can_read_body:
+            # Multipart uploads are read to the end like Discord would
+            await request.read()
+
+        data = self.make_response(endpoint, request, body)
+        if data is None:
+            return web.Response(status=204, headers=headers)
+
+        return json_response(data, headers=headers)
+
+    def make_response(self, endpoint, request, body):
+        if endpoint.method in ('DELETE', 'PUT') or endpoint.path.endswith(NO_CONTENT_SUFFIXES):
+            return None
+
+        info = request.match_info
+        resource = endpoint.path.rsplit('/', 1)[-1]
+
+        fields = body if isinstance(body, dict) else {}
+
+        if endpoint.method == 'GET' and resource in LIST_RESOURCES:
+            return self.make_list(resource, info, request.query)
+
+        if endpoint.path.endswith('/messages') or 'message_id' in info:
+            message_id = info.get('message_id') or snowflake()
+            return make_message(info['channel_id'], message_id, **fields)
+
+        if endpoint.path.endswith('/roles') or 'role_id' in info:
+            return make_role(info.get('role_id') or snowflake(), **fields)
+
+        if endpoint.path.endswith('/channels') or 'channel_id' in info:
+            return make_channel(
+                info.get('channel_id') or snowflake(), info.get('guild_id'), **fields
+            )
+
+        if 'user_id' in info and 'guild_id' in info:
+            return make_member(info['guild_id'], info['user_id'])
+
+        if endpoint.path in ('/guilds', '/guilds/{guild_id}'):
+            return make_guild(info.get('guild_id') or snowflake(), **fields)
+
+        if endpoint.path.startswith('/users/'):
+            return make_user(info.get('user_id', CURRENT_USER_ID))
+
+        return dict(fields, id=snowflake())
+
+    def make_list(self, resource, info, query):
+        limit = self.list_size
+
+        if resource == 'messages':
+            limit = min(int(query.get('limit', 50)), 100)
+
+            if 'after' in query:
+                start = int(query['after'])
+                ids = [start + ((index + 1) << 22) for index in range(limit)]
+                ids.reverse()
+            else:
+                start = int(query.get('before', query.get('around', snowflake())))
+                ids = [start - ((index + 1) << 22) for index in range(limit)]
+
+            return [
+                make_message(info['channel_id'], message_id) for message_id in ids if message_id > 0
+            ]
+
+        if resource in ('members', 'search'):
+            limit = min(int(query.get('limit', 1)), 1000)
+            after = int(query.get('after', 0))
+
+            return [
+                make_member(info['guild_id'], user_id)
+                for user_id in range(after + 1, after + 1 + limit)
+            ]
+
+        if resource == 'roles':
+            return [make_role(info['guild_id'], name='@everyone')] + [
+                make_role(snowflake(index)) for index in range(1, limit)
+            ]
+
+        if resource == 'channels':
+            return [make_channel(snowflake(index), info.get('guild_id')) for index in range(limit)]
+
+        if resource == 'pins':
+            return [
+                make_message(info['channel_id'], snowflake(-index), pinned=True)
+                for index in range(1, limit + 1)
+            ]
+
+        if resource == 'bans':
+            return [{'reason': None, 'user': make_user(index)} for index in range(1, limit + 1)]
+
+        if resource == 'audit-logs':
+            return {'audit_log_entries': [], 'users': [], 'webhooks': [], 'integrations': []}
+
+        return []
+
+
+async def serve(args):
+    api = FakeDiscordAPI(
+        latency=args.latency,
+        jitter=args.jitter,
+        bucket_limit=args.bucket_limit,
+        bucket_window=args.bucket_window,
+        global_limit=args.global_limit,
+        ratelimit_rate=args.ratelimit_rate,
+        error_rate=args.error_rate,
+    )
+
+    url = await api.start(args.host, args.port)
+    print(f'Serving a fake Discord API at {url}')
+
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await api.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--latency', type=float, default=0.0)
+    parser.add_argument('--jitter', type=float, default=0.0)
+    parser.add_argument('--bucket-limit', type=int, default=5)
+    parser.add_argument('--bucket-window', type=float, default=1.0)
+    parser.add_argument('--global-limit', type=int, default=50)
+    parser.add_argument('--ratelimit-rate', type=float, default=0.0)
+    parser.add_argument('--error-rate', type=float, default=0.0)
+
+    try:
+        asyncio.run(serve(parser.parse_args()))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,120 @@
+"""Compares a plain text gateway connection with a compress=zlib-stream one: the bytes
+that go over the wire and the CPU time ShardWebSocket spends on every event, from the
+frame arriving to the payload being handed to the shard.
+
+The compressed frames are made the way the gateway makes them, every payload is written
+to a single zlib stream and flushed with Z_SYNC_FLUSH. Frames larger than --frame-size
+are split like a fragmented message would be, to exercise the buffering.
+
+Run with `python benchmarks/gateway_compression.py` from the root of the repository,
+pass --recording FILE to use payloads recorded from a real connection instead of
+the ones synthesized by benchmarks/payloads.py."""
+
+import argparse
+import asyncio
+import time
+import types
+import zlib
+
+from loguru import logger
+from payloads import add_arguments, get_payloads
+
+from snekcord.json import get_json_backend
+from snekcord.websockets.shard_websocket import ShardOptions, ShardWebSocket
+
+REPEAT = 5
+
+
+class StubShard:
+    """Just enough of a Shard for ShardWebSocket to hand payloads to."""
+
+    def __init__(self, loop, *, compress):
+        self.loop = loop
+        self.client = types.SimpleNamespace(
+            rest=types.SimpleNamespace(json_backend=get_json_backend())
+        )
+        self.options = ShardOptions(compress=compress)
+        self.state = types.SimpleNamespace(cancel=self.cancel)
+        self.received = 0
+
+    def cancel(self, token, info=None):
+        raise RuntimeError(f'the connection was cancelled with {token.name}')
+
+    async def on_dispatch(self, event, sequence, data):
+        self.received += 1
+
+    async def on_hello(self, data):
+        self.received += 1
+
+    async def on_heartbeat_ack(self):
+        self.received += 1
+
+
+def compress_frames(texts, frame_size):
+    compressor = zlib.compressobj()
+    frames = []
+
+    for text in texts:
+        data = compressor.compress(text.encode('utf-8')) + compressor.flush(zlib.Z_SYNC_FLUSH)
+
+        for start in range(0, len(data), frame_size):
+            end = start + frame_size
+            frames.append(data[start:end])
+
+    return frames
+
+
+async def receive(frames, *, compress):
+    timings = []
+
+    for _ in range(REPEAT):
+        # Every connection starts a new stream
+        shard = StubShard(asyncio.get_running_loop(), compress=compress)
+        ws = ShardWebSocket(shard)
+        on_frame = ws.on_binary if compress else ws.on_text
+
+        started_at = time.process_time()
+
+        for frame in frames:
+            await on_frame(frame)
+
+        timings.append(time.process_time() - started_at)
+
+    return min(timings), shard.received
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    add_arguments(parser)
+    parser.add_argument('--frame-size', type=int, default=16384)
+    args = parser.parse_args()
+
+    logger.disable('snekcord')
+
+    texts = get_payloads(args)
+    frames = compress_frames(texts, args.frame_size)
+
+    raw_size = sum(len(text.encode('utf-8')) for text in texts)
+    compressed_size = sum(len(frame) for frame in frames)
+
+    print(f'{len(texts)} payloads in {len(frames)} compressed frames')
+    print()
+    print(f'{"transport":<14}{"wire KiB":>12}{"ratio":>8}{"µs/event":>12}')
+
+    for name, items, size, compress in (
+        ('text', texts, raw_size, False),
+        ('zlib-stream', frames, compressed_size, True),
+    ):
+        elapsed, received = await receive(items, compress=compress)
+
+        if received != len(texts):
+            raise AssertionError(f'{name} delivered {received} of {len(texts)} payloads')
+
+        ratio = size / raw_size
+        per_event = elapsed / received * 10**6
+
+        print(f'{name:<14}{size / 1024:>12.0f}{ratio:>8.2f}{per_event:>12.1f}')
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
@@ -0,0 +1,82 @@
+"""Compares decoding gateway payloads encoded as ETF with snekcord.etf.load_etf against
+decoding the same payloads encoded as JSON with snekcord.json.load_json.
+
+The ETF payloads are made the way the gateway makes them, snowflakes are integers
+instead of strings. A string of 15 to 20 digits is taken to be a snowflake.
+
+Run with `python benchmarks/gateway_encodings.py` from the root of the repository,
+pass --recording FILE to use payloads recorded from a real connection instead of
+the ones synthesized by benchmarks/payloads.py."""
+
+import argparse
+import re
+import time
+
+from payloads import add_arguments, get_payloads
+
+from snekcord.etf import dump_etf, load_etf
+from snekcord.json import get_json_backend, load_json
+
+REPEAT = 5
+
+SNOWFLAKE_PATTERN = re.compile(r'[0-9]{15,20}')
+
+
+def to_etf_shape(object):
+    if isinstance(object, dict):
+        return {key: to_etf_shape(value) for key, value in object.items()}
+
+    if isinstance(object, list):
+        return [to_etf_shape(item) for item in object]
+
+    if isinstance(object, str) and SNOWFLAKE_PATTERN.fullmatch(object):
+        return int(object)
+
+    return object
+
+
+def measure(function, items):
+    timings = []
+
+    for _ in range(REPEAT):
+        started_at = time.perf_counter()
+
+        for item in items:
+            function(item)
+
+        timings.append(time.perf_counter() - started_at)
+
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    add_arguments(parser)
+    args = parser.parse_args()
+
+    texts = get_payloads(args)
+    objects = [to_etf_shape(load_json(text)) for text in texts]
+    terms = [dump_etf(object) for object in objects]
+
+    # ETF has to decode to the same objects as JSON, with integer snowflakes
+    if [load_etf(term) for term in terms] != objects:
+        raise AssertionError('ETF decoded the payloads differently')
+
+    print(f'{len(texts)} payloads, JSON backend: {get_json_backend().name}')
+    print()
+    print(f'{"encoding":<12}{"MiB":>10}{"payloads/s":>14}{"MiB/s":>10}')
+
+    for name, function, items in (
+        ('json', load_json, texts),
+        ('etf', load_etf, terms),
+    ):
+        size = sum(len(item.encode('utf-8') if isinstance(item, str) else item) for item in items)
+        size /= 2**20
+
+        elapsed = measure(function, items)
+
+        print(f'{name:<12}{size:>10.1f}{len(items) / elapsed:>14.0f}{size / elapsed:>10.1f}')
+
+
+if __name__ == '__main__':
+    main()
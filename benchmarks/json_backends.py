@@ -0,0 +1,67 @@
+"""Compares the JSON backends in snekcord.json that are installed on gateway payloads:
+decoding them as ShardWebSocket.on_text does and encoding them again, as str for the
+gateway and as bytes for REST request bodies.
+
+Run with `python benchmarks/json_backends.py` from the root of the repository,
+pass --recording FILE to use payloads recorded from a real connection instead of
+the ones synthesized by benchmarks/payloads.py."""
+
+import argparse
+import time
+
+from payloads import add_arguments, get_payloads
+
+from snekcord.json import JSON_BACKENDS, create_json_backend, get_json_backend
+
+REPEAT = 5
+
+
+def measure(function, items):
+    timings = []
+
+    for _ in range(REPEAT):
+        started_at = time.perf_counter()
+
+        for item in items:
+            function(item)
+
+        timings.append(time.perf_counter() - started_at)
+
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    add_arguments(parser)
+    args = parser.parse_args()
+
+    texts = get_payloads(args)
+    size = sum(len(text.encode('utf-8')) for text in texts) / 2**20
+
+    reference = create_json_backend('json')
+    objects = [reference.loads(text) for text in texts]
+
+    print(f'{len(texts)} payloads, {size:.1f} MiB, default backend: {get_json_backend().name}')
+    print()
+    print(f'{"backend":<12}{"loads MiB/s":>14}{"dumps MiB/s":>14}{"dumpb MiB/s":>14}')
+
+    for name in JSON_BACKENDS:
+        try:
+            backend = create_json_backend(name)
+        except ImportError:
+            print(f'{name:<12}{"not installed":>14}')
+            continue
+
+        # Every backend has to decode to the same objects as the standard library
+        if [backend.loads(text) for text in texts] != objects:
+            raise AssertionError(f'{name} decoded the payloads differently')
+
+        loads = measure(backend.loads, texts)
+        dumps = measure(backend.dumps, objects)
+        dumpb = measure(backend.dumpb, objects)
+
+        print(f'{name:<12}{size / loads:>14.0f}{size / dumps:>14.0f}{size / dumpb:>14.0f}')
+
+
+if __name__ == '__main__':
+    main()
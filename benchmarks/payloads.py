@@ -0,0 +1,198 @@
+"""Gateway payloads shaped like the ones Discord sends, used by the gateway benchmarks
+when no recording of a real connection is given: a READY, a GUILD_CREATE for every guild
+with its channels, roles, members and presences, then a stream of MESSAGE_CREATE,
+TYPING_START, PRESENCE_UPDATE and MESSAGE_REACTION_ADD dispatches.
+
+A recording is a file with one payload per line, exactly as it was received.
+Run `python benchmarks/payloads.py FILE` from the root of the repository to write the
+synthesized payloads to FILE."""
+
+import argparse
+import json
+import random
+
+from fakeapi import make_channel, make_member, make_message, make_role, make_user
+
+BASE_ID = 900000000000000000
+
+
+def make_presence(user_id, guild_id, rng):
+    return {
+        'user': {'id': str(user_id)},
+        'guild_id': str(guild_id),
+        'status': rng.choice(('online', 'idle', 'dnd')),
+        'activities': [
+            {
+                'name': 'a game',
+                'type': 0,
+                'created_at': 1640995200000 + rng.randrange(10**8),
+            }
+        ],
+        'client_status': {'desktop': 'online'},
+    }
+
+
+def make_guild_create(guild_id, *, channels, roles, members, rng):
+    channel_ids = [guild_id + index + 1 for index in range(channels)]
+    role_ids = [guild_id + channels + index + 1 for index in range(roles)]
+    user_ids = [BASE_ID + rng.randrange(10**9) for _ in range(members)]
+
+    guild_members = []
+    for user_id in user_ids:
+        member = make_member(str(guild_id), user_id)
+        member['roles'] = [str(role_id) for role_id in rng.sample(role_ids, min(roles, 3))]
+        del member['guild_id']
+        guild_members.append(member)
+
+    return {
+        'id': str(guild_id),
+        'name': f'guild-{guild_id}',
+        'owner_id': str(user_ids[0]),
+        'member_count': members,
+        'large': members > 250,
+        'joined_at': '2022-01-01T00:00:00+00:00',
+        'features': ['COMMUNITY', 'NEWS'],
+        'channels': [
+            make_channel(channel_id, str(guild_id), position=index, topic='a' * rng.randrange(64))
+            for index, channel_id in enumerate(channel_ids)
+        ],
+        'roles': [
+            make_role(role_id, position=index, color=rng.randrange(2**24))
+            for index, role_id in enumerate(role_ids)
+        ],
+        'members': guild_members,
+        'presences': [make_presence(user_id, guild_id, rng) for user_id in user_ids[::2]],
+        'voice_states': [],
+        'threads': [],
+        'emojis': [],
+        'stickers': [],
+    }
+
+
+def make_payloads(*, guilds=10, channels=50, roles=30, members=500, events=5000, seed=0):
+    """Returns the synthesized payloads as decoded JSON objects."""
+    rng = random.Random(seed)
+    sequence = 0
+
+    def dispatch(event, data):
+        nonlocal sequence
+        sequence += 1
+        return {'op': 0, 's': sequence, 't': event, 'd': data}
+
+    guild_ids = [BASE_ID + index * 10**6 for index in range(guilds)]
+
+    payloads = [
+        {'op': 10, 'd': {'heartbeat_interval': 41250}},
+        dispatch(
+            'READY',
+            {
+                'v': 9,
+                'user': make_user(BASE_ID),
+                'guilds': [{'id': str(guild_id), 'unavailable': True} for guild_id in guild_ids],
+                'session_id': 'a' * 32,
+                'application': {'id': str(BASE_ID), 'flags': 0},
+            },
+        ),
+    ]
+
+    for guild_id in guild_ids:
+        payloads.append(
+            dispatch(
+                'GUILD_CREATE',
+                make_guild_create(
+                    guild_id, channels=channels, roles=roles, members=members, rng=rng
+                ),
+            )
+        )
+
+    message_id = BASE_ID * 2
+
+    for _ in range(events):
+        guild_id = rng.choice(guild_ids)
+        channel_id = str(guild_id + rng.randrange(channels) + 1)
+        user_id = str(BASE_ID + rng.randrange(10**9))
+
+        kind = rng.random()
+        if kind < 0.6:
+            message_id += 1
+            message = make_message(
+                channel_id,
+                message_id,
+                content=' '.join('word' for _ in range(rng.randrange(1, 40))),
+                author=make_user(user_id),
+                guild_id=str(guild_id),
+            )
+            message['member'] = make_member(str(guild_id), user_id)
+            del message['member']['user']
+            payloads.append(dispatch('MESSAGE_CREATE', message))
+        elif kind < 0.75:
+            payloads.append(
+                dispatch(
+                    'TYPING_START',
+                    {
+                        'channel_id': channel_id,
+                        'guild_id': str(guild_id),
+                        'user_id': user_id,
+                        'timestamp': 1640995200 + rng.randrange(10**6),
+                    },
+                )
+            )
+        elif kind < 0.9:
+            payloads.append(dispatch('PRESENCE_UPDATE', make_presence(user_id, guild_id, rng)))
+        else:
+            payloads.append(
+                dispatch(
+                    'MESSAGE_REACTION_ADD',
+                    {
+                        'user_id': user_id,
+                        'channel_id': channel_id,
+                        'message_id': str(message_id),
+                        'guild_id': str(guild_id),
+                        'emoji': {'id': None, 'name': '\N{THUMBS UP SIGN}'},
+                    },
+                )
+            )
+
+        if rng.random() < 0.01:
+            payloads.append({'op': 11})
+
+    return payloads
+
+
+def load_recording(path):
+    """Returns the payloads in a recording as the text that was received."""
+    with open(path, encoding='utf-8') as fp:
+        return [line.rstrip('\n') for line in fp if line.strip()]
+
+
+def get_payloads(args):
+    """Returns the payloads of the recording given with --recording,
+    or the synthesized payloads, as text."""
+    if args.recording is not None:
+        return load_recording(args.recording)
+
+    return [
+        json.dumps(payload, ensure_ascii=False, separators=(',', ':'))
+        for payload in make_payloads(events=args.events, members=args.members)
+    ]
+
+
+def add_arguments(parser):
+    parser.add_argument('--recording', help='a file with one gateway payload per line')
+    parser.add_argument('--events', type=int, default=5000)
+    parser.add_argument('--members', type=int, default=500)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('file')
+    add_arguments(parser)
+    args = parser.parse_args()
+
+    with open(args.file, 'w', encoding='utf-8') as fp:
+        for payload in get_payloads(args):
+            fp.write(payload + '\n')
+
+
+if __name__ == '__main__':
+    main()
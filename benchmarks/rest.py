@@ -0,0 +1,164 @@
+"""Measures end-to-end REST throughput against the fake API in benchmarks/fakeapi.py:
+raw request_api calls spread over many rate limit buckets, calls that contend
+for a single bucket, state fetch methods, message history, member streaming
+and message builders.
+
+Run with `python benchmarks/rest.py` from the root of the repository,
+pass --latency, --error-rate or --ratelimit-rate to change the server's behaviour."""
+
+import argparse
+import asyncio
+import time
+
+from fakeapi import FakeDiscordAPI
+from loguru import logger
+
+from snekcord import Client
+from snekcord.enums import FetchOrdering
+from snekcord.rest import RESTMetrics, RetryPolicy
+from snekcord.rest.endpoints import GET_CHANNEL_MESSAGE
+from snekcord.rest.ratelimit import RateLimiter
+
+
+async def measure(name, count, function):
+    started_at = time.perf_counter()
+    await function()
+    elapsed = time.perf_counter() - started_at
+
+    print(f'{name:<32}{count:>8}{elapsed:>12.3f}{count / elapsed:>12.0f}')
+
+
+async def gather_limited(coroutines, concurrency):
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def run(coroutine):
+        async with semaphore:
+            return await coroutine
+
+    # Requests that are not retried (POST) fail when errors are injected, they are counted
+    # in the summary from the server's statuses instead of stopping the benchmark
+    return await asyncio.gather(
+        *(run(coroutine) for coroutine in coroutines), return_exceptions=True
+    )
+
+
+async def run(args):
+    api = FakeDiscordAPI(
+        latency=args.latency,
+        jitter=args.latency / 2,
+        bucket_limit=args.bucket_limit,
+        bucket_window=args.bucket_window,
+        global_limit=args.global_limit,
+        ratelimit_rate=args.ratelimit_rate,
+        error_rate=args.error_rate,
+        seed=0,
+    )
+    url = await api.start()
+
+    client = Client('Bot benchmark')
+    client.rest.api = url
+    client.rest.retry_policy = RetryPolicy(backoff_base=0.05)
+    client.rest.metrics = metrics = RESTMetrics()
+
+    # The client enforces the same global limit as the server
+    client.rest.ratelimiter = RateLimiter(global_limit=args.global_limit)
+
+    count = args.requests
+
+    print(f'{"case":<32}{"count":>8}{"time (s)":>12}{"per second":>12}')
+
+    try:
+        await measure(
+            'request_api, many buckets',
+            count,
+            lambda: gather_limited(
+                (
+                    client.rest.request_api(
+                        GET_CHANNEL_MESSAGE, channel_id=str(index), message_id=str(index)
+                    )
+                    for index in range(count)
+                ),
+                args.concurrency,
+            ),
+        )
+
+        contended = args.bucket_limit * 4
+        await measure(
+            'request_api, one bucket',
+            contended,
+            lambda: gather_limited(
+                (
+                    client.rest.request_api(
+                        GET_CHANNEL_MESSAGE, channel_id='1', message_id=str(index)
+                    )
+                    for index in range(contended)
+                ),
+                args.concurrency,
+            ),
+        )
+
+        await measure(
+            'channels.fetch',
+            count,
+            lambda: gather_limited(
+                (client.channels.fetch(1000 + index) for index in range(count)),
+                args.concurrency,
+            ),
+        )
+
+        async def history():
+            async for _ in client.messages.history(2, FetchOrdering.BEFORE, limit=args.history):
+                pass
+
+        await measure('messages.history', args.history, history)
+
+        async def members():
+            async for _ in client.members.stream(3, limit=args.members):
+                pass
+
+        await measure('members.stream', args.members, members)
+
+        await measure(
+            'messages.create builder',
+            count,
+            lambda: gather_limited(
+                (
+                    client.messages.create(4000 + index, content='benchmark')
+                    for index in range(count)
+                ),
+                args.concurrency,
+            ),
+        )
+    finally:
+        await client.rest.close()
+        await api.close()
+
+    print()
+    print(f'server responses: {dict(api.statuses)}')
+
+    ratelimited = sum(endpoint.ratelimited for endpoint in metrics.endpoints.values())
+    errors = sum(endpoint.errors for endpoint in metrics.endpoints.values())
+    print(f'client saw {ratelimited} rate limited responses and {errors} failed requests')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--requests', type=int, default=1000)
+    parser.add_argument('--concurrency', type=int, default=50)
+    parser.add_argument('--history', type=int, default=2000)
+    parser.add_argument('--members', type=int, default=10000)
+    parser.add_argument('--latency', type=float, default=0.0)
+    parser.add_argument('--bucket-limit', type=int, default=5)
+    parser.add_argument('--bucket-window', type=float, default=0.25)
+    parser.add_argument('--global-limit', type=int, default=10000)
+    parser.add_argument('--ratelimit-rate', type=float, default=0.0)
+    parser.add_argument('--error-rate', type=float, default=0.0)
+
+    # Injected errors and rate limits are logged on every retry
+    logger.disable('snekcord')
+
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == '__main__':
+    main()
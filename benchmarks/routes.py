@@ -0,0 +1,114 @@
+"""Measures the per-request overhead of preparing a REST request:
+building the url, extracting the major parameters, computing the
+rate limit bucket key and merging headers.
+
+Run with `python benchmarks/routes.py` from the root of the repository."""
+
+import string
+import timeit
+
+from multidict import CIMultiDict
+
+from snekcord.rest.endpoints import GET_CHANNEL_MESSAGE, GET_GATEWAY, MAJOR_PARAMS
+from snekcord.rest.ratelimit import RateLimiter
+
+NUMBER = 200_000
+REPEAT = 5
+
+BASE_URL = 'https://discord.com/api/v9'
+
+SESSION_HEADERS = CIMultiDict({'Authorization': 'Bot token'})
+
+_formatter_parse = string.Formatter().parse
+
+
+class LegacyEndpoint:
+    """The endpoint implementation before routes were compiled."""
+
+    def __init__(self, method, path):
+        self.method = method
+        self.path = path
+
+        self.keywords = set()
+        for _, name, _, _ in _formatter_parse(self.path):
+            if name is not None:
+                self.keywords.add(name)
+
+        self.major_params = self.keywords & MAJOR_PARAMS
+
+    def url(self, base, **kwargs):
+        keywords = {keyword: kwargs.pop(keyword) for keyword in self.keywords}
+        return base + self.path.format_map(keywords)
+
+
+def legacy_prepare(endpoint, routes, kwargs, headers):
+    keywords = {param: kwargs[param] for param in endpoint.major_params}
+    url = endpoint.url(BASE_URL, **kwargs)
+
+    route = f'{endpoint.method} {endpoint.path}'
+    major = ':'.join(str(keywords[param]) for param in sorted(endpoint.major_params))
+    key = f'{routes.get(route, route)}:{major}'
+
+    if headers is not None:
+        headers.update(SESSION_HEADERS)
+
+    return url, key
+
+
+def compiled_prepare(endpoint, ratelimiter, kwargs, headers):
+    keywords = endpoint.get_major_keywords(kwargs)
+    url = endpoint.build_url(BASE_URL, kwargs)
+
+    key = ratelimiter.get_bucket_key(endpoint, keywords)
+
+    if headers is not None:
+        headers = CIMultiDict(headers)
+        headers.update(SESSION_HEADERS)
+
+    return url, key
+
+
+def measure(statement, namespace):
+    timings = timeit.repeat(statement, globals=namespace, number=NUMBER, repeat=REPEAT)
+    return min(timings) / NUMBER * 1e9
+
+
+def main():
+    ratelimiter = RateLimiter()
+
+    cases = {
+        'no keywords': (GET_GATEWAY, {}),
+        'two keywords': (
+            GET_CHANNEL_MESSAGE,
+            {'channel_id': 381870553235193857, 'message_id': 1012345678901234567},
+        ),
+    }
+
+    print(f'{"case":<28}{"before (ns)":>14}{"after (ns)":>14}{"speedup":>10}')
+
+    for name, (endpoint, kwargs) in cases.items():
+        legacy = LegacyEndpoint(endpoint.method, endpoint.path)
+
+        for headers in (None, {'X-Audit-Log-Reason': 'benchmark'}):
+            namespace = {
+                'legacy_prepare': legacy_prepare,
+                'compiled_prepare': compiled_prepare,
+                'legacy': legacy,
+                'endpoint': endpoint,
+                'ratelimiter': ratelimiter,
+                'routes': ratelimiter.routes,
+                'kwargs': kwargs,
+                'headers': headers,
+            }
+
+            before = measure('legacy_prepare(legacy, routes, dict(kwargs), headers)', namespace)
+            after = measure(
+                'compiled_prepare(endpoint, ratelimiter, dict(kwargs), headers)', namespace
+            )
+
+            label = f'{name}{", headers" if headers is not None else ""}'
+            print(f'{label:<28}{before:>14.0f}{after:>14.0f}{before / after:>9.2f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,57 @@
+"""Compares reading a file through FSReadStream, which reads every chunk
+in an executor, with MappedFSReadStream, which slices a memory map.
+
+Run with `python benchmarks/streams.py [size in MiB]` from the root of the repository."""
+
+import asyncio
+import os
+import sys
+import tempfile
+import time
+import zlib
+
+from snekcord.streams import FSReadStream, MappedFSReadStream
+
+REPEAT = 5
+
+
+async def consume(stream):
+    # Checksum every chunk so the pages of the map are actually read
+    checksum = 0
+
+    async for chunk in stream.aiter():
+        checksum = zlib.crc32(chunk, checksum)
+
+    stream.close()
+    return checksum
+
+
+async def measure(cls, path):
+    timings = []
+
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        await consume(cls(path))
+        timings.append(time.perf_counter() - start)
+
+    return min(timings)
+
+
+async def main():
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 256
+
+    with tempfile.NamedTemporaryFile() as fp:
+        for _ in range(size):
+            fp.write(os.urandom(2**20))
+
+        fp.flush()
+
+        print(f'{"stream":<24}{"time (s)":>12}{"MiB/s":>12}')
+
+        for cls in (FSReadStream, MappedFSReadStream):
+            elapsed = await measure(cls, fp.name)
+            print(f'{cls.__name__:<24}{elapsed:>12.3f}{size / elapsed:>12.0f}')
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
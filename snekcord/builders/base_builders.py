@@ -11,6 +11,8 @@ from ..undefined import undefined
 if typing.TYPE_CHECKING:
     from typing_extensions import Concatenate, Self
 
+    from ..rest.scheduler import RequestPriority
+
     P = typing.ParamSpec('P')
     T_co = typing.TypeVar('T_co', covariant=True)
     T_contra = typing.TypeVar('T_contra', contravariant=True)
@@ -75,6 +77,13 @@ class AwaitableBuilder(BaseBuilder):
     result: typing.Any = attr.ib(init=False, default=None)
     """The return value of action or None if it hasn't been called yet."""
 
+    request_priority: typing.Optional[RequestPriority] = attr.ib(init=False, default=None)
+    """The priority of the request sent by action or None for the endpoint's default."""
+
+    @setter
+    def priority(self, priority: RequestPriority) -> None:
+        self.request_priority = priority
+
     async def __aenter__(self) -> Self:
         if self.awaited:
             raise RuntimeError(f'cannot reuse {self.__class__.__name__}')
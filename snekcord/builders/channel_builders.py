@@ -67,7 +67,10 @@ class ChannelCreateBuilder(AwaitableBuilder):
 
     async def action(self) -> Channel:
         data = await self.client.rest.request_api(
-            CREATE_GUILD_CHANNEL, guild_id=self.guild_id, json=self.data
+            CREATE_GUILD_CHANNEL,
+            guild_id=self.guild_id,
+            json=self.data,
+            priority=self.request_priority,
         )
         assert isinstance(data, dict)
 
@@ -119,5 +122,8 @@ class ChannelPositionsBuilder(AwaitableBuilder):
 
     async def action(self) -> None:
         await self.client.rest.request_api(
-            UPDATE_GUILD_CHANNEL_POSITIONS, guild_id=self.guild_id, json=self.channels
+            UPDATE_GUILD_CHANNEL_POSITIONS,
+            guild_id=self.guild_id,
+            json=self.channels,
+            priority=self.request_priority,
         )
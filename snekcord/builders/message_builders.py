@@ -5,6 +5,7 @@ import typing
 import attr
 
 from ..rest.endpoints import CREATE_CHANNEL_MESSAGE, UPDATE_CHANNEL_MESSAGE
+from ..rest.multipart import MultipartFile
 from ..snowflake import Snowflake
 from .base_builders import AwaitableBuilder, setter
 
@@ -12,6 +13,7 @@ if typing.TYPE_CHECKING:
     from ..clients import Client
     from ..json import JSONObject
     from ..objects import Message, MessageFlags
+    from ..streams import SupportsStream
 
 __all__ = ('MessageCreateBuilder', 'MessageUpdateBuilder')
 
@@ -24,6 +26,7 @@ class MessageCreateBuilder(AwaitableBuilder):
     channel_id: Snowflake = attr.ib()
 
     data: JSONObject = attr.ib(init=False, factory=dict)
+    files: typing.List[MultipartFile] = attr.ib(init=False, factory=list)
 
     @setter
     def content(self, content: str) -> None:
@@ -37,9 +40,23 @@ class MessageCreateBuilder(AwaitableBuilder):
     def flags(self, flags: MessageFlags) -> None:
         self.data['flags'] = int(flags)
 
+    @setter
+    def attachment(
+        self,
+        file: SupportsStream,
+        *,
+        filename: typing.Optional[str] = None,
+        description: typing.Optional[str] = None,
+    ) -> None:
+        self.files.append(MultipartFile(file, filename=filename, description=description))
+
     async def action(self) -> Message:
         data = await self.client.rest.request_api(
-            CREATE_CHANNEL_MESSAGE, channel_id=self.channel_id, json=self.data
+            CREATE_CHANNEL_MESSAGE,
+            channel_id=self.channel_id,
+            json=self.data,
+            files=self.files,
+            priority=self.request_priority,
         )
         assert isinstance(data, dict)
 
@@ -63,6 +80,7 @@ class MessageUpdateBuilder(AwaitableBuilder):
     message_id: Snowflake = attr.ib()
 
     data: JSONObject = attr.ib(init=False, factory=dict)
+    files: typing.List[MultipartFile] = attr.ib(init=False, factory=list)
 
     @setter
     def content(self, content: typing.Optional[str]) -> None:
@@ -72,12 +90,24 @@ class MessageUpdateBuilder(AwaitableBuilder):
     def flags(self, flags: typing.Optional[MessageFlags]) -> None:
         self.data['flags'] = int(flags) if flags is not None else None
 
+    @setter
+    def attachment(
+        self,
+        file: SupportsStream,
+        *,
+        filename: typing.Optional[str] = None,
+        description: typing.Optional[str] = None,
+    ) -> None:
+        self.files.append(MultipartFile(file, filename=filename, description=description))
+
     async def action(self) -> Message:
         data = await self.client.rest.request_api(
             UPDATE_CHANNEL_MESSAGE,
             channel_id=self.channel_id,
             message_id=self.message_id,
             json=self.data,
+            files=self.files,
+            priority=self.request_priority,
         )
         assert isinstance(data, dict)
 
@@ -71,7 +71,10 @@ class RoleCreateBuilder(AwaitableBuilder):
             self.data['icon'] = await self.icon_stream.to_data_uri()
 
         data = await self.client.rest.request_api(
-            CREATE_GUILD_ROLE, guild_id=self.guild_id, json=self.data
+            CREATE_GUILD_ROLE,
+            guild_id=self.guild_id,
+            json=self.data,
+            priority=self.request_priority,
         )
         assert isinstance(data, dict)
 
@@ -135,7 +138,11 @@ class RoleUpdateBuilder(AwaitableBuilder):
                 self.data['icon'] = None
 
         data = await self.client.rest.request_api(
-            UPDATE_GUILD_ROLE, guild_id=self.guild_id, role_id=self.role_id, json=self.data
+            UPDATE_GUILD_ROLE,
+            guild_id=self.guild_id,
+            role_id=self.role_id,
+            json=self.data,
+            priority=self.request_priority,
         )
         assert isinstance(data, dict)
 
@@ -166,7 +173,10 @@ class RolePositionsBuilder(AwaitableBuilder):
 
     async def action(self) -> typing.List[Role]:
         data = await self.client.rest.request_api(
-            UPDATE_GUILD_ROLE_POSITIONS, guild_id=self.guild_id, json=self.roles
+            UPDATE_GUILD_ROLE_POSITIONS,
+            guild_id=self.guild_id,
+            json=self.roles,
+            priority=self.request_priority,
         )
         assert isinstance(data, list)
 
@@ -1,3 +1,4 @@
+from .checkpoint import *
 from .driver import *
 from .model import *
 from .refstore import *
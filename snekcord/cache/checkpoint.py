@@ -0,0 +1,91 @@
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import os
+import typing
+
+from ..snowflake import Snowflake
+
+__all__ = ('Checkpoint', 'MemoryCheckpoint', 'FileCheckpoint')
+
+
+class Checkpoint:
+    """The abstract base class for all checkpoints. Checkpoints record the ids that
+    a long running bulk operation has finished with so that it can be resumed after
+    the process exits without repeating work."""
+
+    async def load(self) -> typing.Set[Snowflake]:
+        """Retrieves every id that has been recorded."""
+        raise NotImplementedError
+
+    async def add_many(self, ids: typing.Iterable[Snowflake]) -> None:
+        """Records several ids."""
+        raise NotImplementedError
+
+    async def clear(self) -> None:
+        """Forgets every recorded id."""
+        raise NotImplementedError
+
+
+class MemoryCheckpoint(Checkpoint):
+    """A checkpoint that keeps the ids in a set, it only survives
+    for as long as the object is kept around."""
+
+    ids: typing.Set[Snowflake]
+
+    def __init__(self) -> None:
+        self.ids = set()
+
+    async def load(self) -> typing.Set[Snowflake]:
+        return set(self.ids)
+
+    async def add_many(self, ids: typing.Iterable[Snowflake]) -> None:
+        self.ids.update(ids)
+
+    async def clear(self) -> None:
+        self.ids.clear()
+
+
+class FileCheckpoint(Checkpoint):
+    """A checkpoint that appends the ids to a file, one per line. Every batch is
+    flushed to the disk before add_many() returns, a line cut short by a crash
+    is discarded when the file is loaded."""
+
+    def __init__(self, path: typing.Union[str, os.PathLike[str]]) -> None:
+        self.path = os.fspath(path)
+
+    def read_ids(self) -> typing.Set[Snowflake]:
+        try:
+            with open(self.path, 'r+b') as fp:
+                data = fp.read()
+
+                # A line cut short by a crash is removed so the next batch is not appended to it
+                end = data.rfind(b'\n') + 1
+                if end != len(data):
+                    fp.truncate(end)
+        except FileNotFoundError:
+            return set()
+
+        return {Snowflake(line) for line in data[:end].split()}
+
+    def write_ids(self, ids: typing.List[Snowflake]) -> None:
+        with open(self.path, 'a') as fp:
+            fp.write(''.join(f'{id}\n' for id in ids))
+            fp.flush()
+            os.fsync(fp.fileno())
+
+    def remove_file(self) -> None:
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(self.path)
+
+    async def load(self) -> typing.Set[Snowflake]:
+        return await asyncio.get_running_loop().run_in_executor(None, self.read_ids)
+
+    async def add_many(self, ids: typing.Iterable[Snowflake]) -> None:
+        ids = list(ids)
+        if ids:
+            await asyncio.get_running_loop().run_in_executor(None, self.write_ids, ids)
+
+    async def clear(self) -> None:
+        await asyncio.get_running_loop().run_in_executor(None, self.remove_file)
@@ -31,10 +31,36 @@ class CacheDriver(typing.Generic[UniqueT, CachedObjectT]):
         """Updates the object in the cache under key."""
         raise NotImplementedError
 
+    async def create_many(
+        self, items: typing.Iterable[typing.Tuple[UniqueT, CachedObjectT]]
+    ) -> None:
+        """Creates an entry in the cache for each (key, object) pair."""
+        for key, object in items:
+            await self.create(key, object)
+
+    async def get_many(
+        self, keys: typing.Iterable[UniqueT]
+    ) -> typing.List[typing.Optional[CachedObjectT]]:
+        """Retrieves the object in the cache under each key."""
+        return [await self.get(key) for key in keys]
+
+    async def update_many(
+        self, items: typing.Iterable[typing.Tuple[UniqueT, CachedObjectT]]
+    ) -> None:
+        """Updates the object in the cache under each key."""
+        for key, object in items:
+            await self.update(key, object)
+
     async def drop(self, key: UniqueT) -> typing.Optional[CachedObjectT]:
         """Removes the object in the cache under key and returns it."""
         raise NotImplementedError
 
+    async def drop_many(
+        self, keys: typing.Iterable[UniqueT]
+    ) -> typing.List[typing.Optional[CachedObjectT]]:
+        """Removes the object in the cache under each key and returns them."""
+        return [await self.drop(key) for key in keys]
+
 
 class MemoryCacheDriver(CacheDriver[UniqueT, CachedObjectT]):
     """A simple in-memory cache driver using a dictionary."""
@@ -58,5 +84,25 @@ class MemoryCacheDriver(CacheDriver[UniqueT, CachedObjectT]):
     async def update(self, key: UniqueT, object: CachedObjectT) -> None:
         return None  # the object has already been mutated
 
+    async def create_many(
+        self, items: typing.Iterable[typing.Tuple[UniqueT, CachedObjectT]]
+    ) -> None:
+        self.map.update(items)
+
+    async def get_many(
+        self, keys: typing.Iterable[UniqueT]
+    ) -> typing.List[typing.Optional[CachedObjectT]]:
+        return [self.map.get(key) for key in keys]
+
+    async def update_many(
+        self, items: typing.Iterable[typing.Tuple[UniqueT, CachedObjectT]]
+    ) -> None:
+        return None  # the objects have already been mutated
+
     async def drop(self, key: UniqueT) -> typing.Optional[CachedObjectT]:
         return self.map.pop(key, None)
+
+    async def drop_many(
+        self, keys: typing.Iterable[UniqueT]
+    ) -> typing.List[typing.Optional[CachedObjectT]]:
+        return [self.map.pop(key, None) for key in keys]
@@ -26,10 +26,20 @@ class RefStore(typing.Generic[UniqueT, RefT]):
         """Adds a reference under key."""
         raise NotImplementedError
 
+    async def add_many(self, key: UniqueT, refs: typing.Iterable[RefT]) -> None:
+        """Adds several references under key."""
+        for ref in refs:
+            await self.add(key, ref)
+
     async def remove(self, key: UniqueT, ref: RefT) -> None:
         """Removes a reference under key."""
         raise NotImplementedError
 
+    async def remove_many(self, key: UniqueT, refs: typing.Iterable[RefT]) -> None:
+        """Removes several references under key."""
+        for ref in refs:
+            await self.remove(key, ref)
+
     async def clear(self, key: UniqueT) -> None:
         """Clears every reference under key."""
         raise NotImplementedError
@@ -49,6 +59,9 @@ class MemoryRefStore(RefStore[UniqueT, RefT]):
     async def add(self, key: UniqueT, ref: RefT) -> None:
         self.refs[key].append(ref)
 
+    async def add_many(self, key: UniqueT, refs: typing.Iterable[RefT]) -> None:
+        self.refs[key].extend(refs)
+
     async def remove(self, key: UniqueT, ref: RefT) -> None:
         refs = self.refs.get(key)
         if refs is None:
@@ -57,6 +70,14 @@ class MemoryRefStore(RefStore[UniqueT, RefT]):
         with contextlib.suppress(ValueError):
             refs.remove(ref)
 
+    async def remove_many(self, key: UniqueT, refs: typing.Iterable[RefT]) -> None:
+        current = self.refs.get(key)
+        if current is None:
+            return None
+
+        removed = set(refs)
+        current[:] = [ref for ref in current if ref not in removed]
+
     async def clear(self, key: UniqueT) -> None:
         self.refs.pop(key, None)
 
@@ -75,6 +96,9 @@ class SnowflakeMemoryRefStore(RefStore[UniqueT, Snowflake]):
     async def add(self, key: UniqueT, ref: Snowflake) -> None:
         self.refs[key].append(ref)
 
+    async def add_many(self, key: UniqueT, refs: typing.Iterable[Snowflake]) -> None:
+        self.refs[key].extend(refs)
+
     async def remove(self, key: UniqueT, ref: Snowflake) -> None:
         refs = self.refs.get(key)
         if refs is None:
@@ -83,5 +107,14 @@ class SnowflakeMemoryRefStore(RefStore[UniqueT, Snowflake]):
         with contextlib.suppress(ValueError):
             refs.remove(ref)
 
+    async def remove_many(self, key: UniqueT, refs: typing.Iterable[Snowflake]) -> None:
+        current = self.refs.get(key)
+        if current is None:
+            return None
+
+        # Rebuilding the array once is cheaper than a linear search for every ref
+        removed = set(refs)
+        self.refs[key] = array.array('Q', (ref for ref in current if ref not in removed))
+
     async def clear(self, key: UniqueT) -> None:
         self.refs.pop(key, None)
@@ -1,2 +1,3 @@
 from .client import *
+from .cluster import *
 from .websocket_client import *
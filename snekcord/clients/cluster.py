@@ -0,0 +1,649 @@
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import inspect
+import itertools
+import math
+import multiprocessing
+import os
+import tempfile
+import time
+import typing
+from signal import Signals
+
+import asygpy
+from loguru import logger
+
+from ..auth import Authorization
+from ..json import JSONObject, JSONType, json_get, load_json
+from ..rest import RESTSession
+from ..rest.coordinator import encode_message
+from ..rest.endpoints import GET_GATEWAY_BOT
+from ..websockets.shard_launcher import SessionStartLimit, ShardLauncher
+
+if typing.TYPE_CHECKING:
+    from multiprocessing.process import BaseProcess
+
+    from ..websockets.shard_launcher import ShardLaunchCallback
+    from .websocket_client import WebSocketClient
+
+__all__ = ('ClusterSupervisor', 'ClusterWorker')
+
+# The number of seconds a query waits for a worker to answer
+QUERY_TIMEOUT = 10.0
+
+# The number of seconds workers are given to close their shards before they are killed
+SHUTDOWN_TIMEOUT = 30.0
+
+# A crashed worker is restarted after RESTART_DELAY seconds, the delay is doubled
+# every time the worker crashes again within MIN_UPTIME seconds of starting
+RESTART_DELAY = 5.0
+MAX_RESTART_DELAY = 300.0
+MIN_UPTIME = 60.0
+
+ClientFactory = typing.Callable[..., 'WebSocketClient']
+QueryHandler = typing.Callable[[JSONType], typing.Union[JSONType, typing.Awaitable[JSONType]]]
+
+
+class BaseCluster:
+    """The abstract base class for both ends of a cluster, queries are answered by every worker."""
+
+    async def query(self, name: str, data: JSONType = None) -> typing.List[JSONType]:
+        """Sends a query to every worker, returns the answers of the workers that answered."""
+        raise NotImplementedError
+
+    async def get_stats(self) -> typing.List[JSONObject]:
+        """Retrieves the shard ids, guild count, shard latencies and number of
+        commands waiting for the gateway's send limit of every worker."""
+        return [result for result in await self.query('stats') if isinstance(result, dict)]
+
+    async def get_guild_count(self) -> int:
+        """Retrieves the number of guilds on every shard of the cluster."""
+        return sum(json_get(stats, 'guilds', int, default=0) for stats in await self.get_stats())
+
+    async def get_latencies(self) -> typing.Dict[int, typing.Optional[float]]:
+        """Retrieves the latency of every shard of the cluster,
+        None for shards that have not heartbeated yet."""
+        latencies: typing.Dict[int, typing.Optional[float]] = {}
+
+        for stats in await self.get_stats():
+            shards = json_get(stats, 'latencies', JSONObject, default={})
+            for shard_id, latency in shards.items():
+                latencies[int(shard_id)] = latency if isinstance(latency, (int, float)) else None
+
+        return latencies
+
+
+class SupervisorConnection:
+    futures: typing.Dict[int, asyncio.Future[JSONType]]
+
+    def __init__(
+        self,
+        supervisor: ClusterSupervisor,
+        reader: asyncio.StreamReader,
+        writer: asyncio.StreamWriter,
+    ) -> None:
+        self.supervisor = supervisor
+        self.reader = reader
+        self.writer = writer
+
+        self.worker_id: typing.Optional[int] = None
+
+        self.ids = itertools.count()
+        self.futures = {}
+        self.tasks: typing.Set[asyncio.Task[None]] = set()
+
+    def send(self, message: JSONObject) -> None:
+        if not self.writer.is_closing():
+            self.writer.write(encode_message(message))
+
+    def create_task(self, coro: typing.Coroutine[typing.Any, typing.Any, None]) -> None:
+        task = asyncio.create_task(coro)
+        task.add_done_callback(self.tasks.discard)
+        self.tasks.add(task)
+
+    async def identify(self, id: int, shard_id: int) -> None:
+        launcher = self.supervisor.launcher
+        assert launcher is not None
+
+        await launcher.wait_for_identify(shard_id)
+        self.send({'id': id})
+
+        await launcher.mark_identified(shard_id)
+
+    async def answer_query(self, id: int, name: str, data: JSONType) -> None:
+        results = await self.supervisor.query(name, data)
+        self.send({'id': id, 'results': results})
+
+    async def query(self, name: str, data: JSONType) -> JSONType:
+        id = next(self.ids)
+
+        future = asyncio.get_running_loop().create_future()
+        self.futures[id] = future
+
+        try:
+            self.send({'op': 'query', 'id': id, 'name': name, 'data': data})
+            return await asyncio.wait_for(future, QUERY_TIMEOUT)
+        finally:
+            self.futures.pop(id, None)
+
+    async def handle(self) -> None:
+        try:
+            while True:
+                line = await self.reader.readline()
+                if not line:
+                    break
+
+                try:
+                    message = load_json(line)
+                    assert isinstance(message, dict)
+
+                    op = message['op']
+                except Exception:
+                    logger.debug('Supervisor received invalid message, closing connection')
+                    break
+
+                id = message.get('id')
+
+                if op == 'hello':
+                    worker_id = message.get('worker_id')
+                    if not isinstance(worker_id, int):
+                        break
+
+                    self.worker_id = worker_id
+                    self.supervisor.connections[worker_id] = self
+
+                elif op == 'identify':
+                    shard_id = message.get('shard_id')
+                    if not isinstance(id, int) or not isinstance(shard_id, int):
+                        break
+
+                    self.create_task(self.identify(id, shard_id))
+
+                elif op == 'ready':
+                    shard_id = message.get('shard_id')
+                    if isinstance(shard_id, int) and self.supervisor.launcher is not None:
+                        await self.supervisor.launcher.mark_ready(shard_id)
+
+                elif op == 'query':
+                    name = message.get('name')
+                    if not isinstance(id, int) or not isinstance(name, str):
+                        break
+
+                    self.create_task(self.answer_query(id, name, message.get('data')))
+
+                elif op == 'result':
+                    future = self.futures.pop(id, None) if isinstance(id, int) else None
+                    if future is not None and not future.done():
+                        future.set_result(message.get('result'))
+        finally:
+            await self.cleanup()
+
+    async def cleanup(self) -> None:
+        if self.worker_id is not None and self.supervisor.connections.get(self.worker_id) is self:
+            del self.supervisor.connections[self.worker_id]
+
+        for task in self.tasks:
+            task.cancel()
+
+        for future in self.futures.values():
+            if not future.done():
+                future.set_exception(ConnectionResetError('Lost connection to worker'))
+
+        self.tasks.clear()
+        self.futures.clear()
+
+        self.writer.close()
+
+
+class ClusterSupervisor(BaseCluster):
+    """Runs the shards of a bot in several worker processes and restarts workers that exit.
+
+    Every worker runs its own WebSocketClient, created by calling factory with the
+    keyword arguments shard_ids, shard_count and cluster, which should be passed on
+    to WebSocketClient. Workers are started with the spawn method so factory has to
+    be a module level function and the script that starts the supervisor has to be
+    guarded by `if __name__ == '__main__':`.
+
+    The supervisor listens on a unix socket that the workers connect to. Workers ask
+    it before every IDENTIFY so the identify and session start limits of the bot are
+    shared between them, and queries sent by the supervisor or any worker are
+    answered by every worker (see BaseCluster)."""
+
+    processes: typing.Dict[int, BaseProcess]
+
+    def __init__(
+        self,
+        authorization: typing.Union[Authorization, str],
+        factory: ClientFactory,
+        *,
+        workers: typing.Optional[int] = None,
+        shard_count: typing.Optional[int] = None,
+        path: typing.Optional[str] = None,
+        launch_callback: typing.Optional[ShardLaunchCallback] = None,
+    ) -> None:
+        if isinstance(authorization, Authorization):
+            self.authorization = authorization
+        else:
+            self.authorization = Authorization.parse(authorization)
+
+        self.factory = factory
+        self.workers = workers if workers is not None else os.cpu_count() or 1
+        self.shard_count = shard_count
+        self.launch_callback = launch_callback
+
+        if path is None:
+            path = os.path.join(tempfile.gettempdir(), f'snekcord-cluster-{os.getpid()}.sock')
+
+        self.path = path
+
+        self.context = multiprocessing.get_context('spawn')
+        self.launcher: typing.Optional[ShardLauncher] = None
+        self.server: typing.Optional[asyncio.AbstractServer] = None
+
+        self.processes = {}
+        self.connections: typing.Dict[int, SupervisorConnection] = {}
+        self.watchers: typing.List[asyncio.Task[None]] = []
+
+        self.stopping = False
+
+    def get_shard_ids(self, worker_id: int) -> typing.Tuple[int, ...]:
+        """Returns the shard ids run by a worker, every worker runs a contiguous range."""
+        assert self.shard_count is not None
+
+        size = math.ceil(self.shard_count / self.workers)
+        return tuple(range(worker_id * size, min((worker_id + 1) * size, self.shard_count)))
+
+    async def fetch_gateway(self) -> JSONObject:
+        rest = RESTSession(authorization=self.authorization)
+
+        try:
+            data = await rest.request_api(GET_GATEWAY_BOT)
+        finally:
+            await rest.close()
+
+        assert isinstance(data, dict)
+        return data
+
+    def create_launcher(self, gateway: JSONObject) -> ShardLauncher:
+        data = gateway.get('session_start_limit')
+
+        if isinstance(data, dict):
+            limit = SessionStartLimit.from_json(data)
+            return ShardLauncher(
+                max_concurrency=limit.max_concurrency, limit=limit, callback=self.launch_callback
+            )
+
+        return ShardLauncher(callback=self.launch_callback)
+
+    async def query(self, name: str, data: JSONType = None) -> typing.List[JSONType]:
+        connections = list(self.connections.values())
+
+        results = await asyncio.gather(
+            *(connection.query(name, data) for connection in connections), return_exceptions=True
+        )
+
+        for connection, result in zip(connections, results):
+            if isinstance(result, BaseException):
+                logger.warning(f'Worker {connection.worker_id} did not answer {name!r} query')
+
+        return [result for result in results if not isinstance(result, BaseException)]
+
+    async def on_connection(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        await SupervisorConnection(self, reader, writer).handle()
+
+    def start_worker(self, worker_id: int) -> BaseProcess:
+        shard_ids = self.get_shard_ids(worker_id)
+
+        process = self.context.Process(
+            target=run_worker,
+            args=(self.factory, self.path, worker_id, shard_ids, self.shard_count),
+            name=f'snekcord-worker-{worker_id}',
+        )
+        process.start()
+
+        logger.info(f'Started worker {worker_id} (pid {process.pid}) with shards {shard_ids}')
+
+        self.processes[worker_id] = process
+        return process
+
+    async def wait_for_exit(self, process: BaseProcess) -> None:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+
+        # The sentinel becomes readable when the process exits
+        loop.add_reader(process.sentinel, lambda: future.done() or future.set_result(None))
+
+        try:
+            await future
+        finally:
+            loop.remove_reader(process.sentinel)
+
+        process.join()
+
+    async def watch_worker(self, worker_id: int) -> None:
+        delay = RESTART_DELAY
+
+        while not self.stopping:
+            started_at = time.monotonic()
+            process = self.start_worker(worker_id)
+
+            await self.wait_for_exit(process)
+
+            if self.stopping:
+                break
+
+            if time.monotonic() - started_at >= MIN_UPTIME:
+                delay = RESTART_DELAY
+
+            logger.warning(
+                f'Worker {worker_id} exited with code {process.exitcode}, '
+                f'restarting in {delay:.0f}s'
+            )
+            await asyncio.sleep(delay)
+
+            delay = min(delay * 2, MAX_RESTART_DELAY)
+
+    async def start(self) -> None:
+        gateway = await self.fetch_gateway()
+
+        if self.shard_count is None:
+            self.shard_count = json_get(gateway, 'shards', int, default=1)
+
+        # A worker without shards would have nothing to do
+        self.workers = max(min(self.workers, self.shard_count), 1)
+
+        self.launcher = self.create_launcher(gateway)
+        self.launcher.progress.total = self.shard_count
+
+        with contextlib.suppress(FileNotFoundError):
+            os.unlink(self.path)
+
+        self.server = await asyncio.start_unix_server(self.on_connection, self.path)
+        logger.info(
+            f'Supervisor listening on {self.path}, '
+            f'running {self.shard_count} shards in {self.workers} workers'
+        )
+
+        for worker_id in range(self.workers):
+            self.watchers.append(asyncio.create_task(self.watch_worker(worker_id)))
+
+    async def stop(self) -> None:
+        self.stopping = True
+
+        processes = [process for process in self.processes.values() if process.is_alive()]
+
+        # Workers close their shards when they receive SIGTERM
+        for process in processes:
+            process.terminate()
+
+        try:
+            await asyncio.wait_for(
+                asyncio.gather(*(self.wait_for_exit(process) for process in processes)),
+                SHUTDOWN_TIMEOUT,
+            )
+        except asyncio.TimeoutError:
+            for process in processes:
+                if process.is_alive():
+                    logger.warning(f'Worker {process.name} did not exit in time, killing it')
+                    process.kill()
+                    process.join()
+
+        for watcher in self.watchers:
+            watcher.cancel()
+
+        await asyncio.gather(*self.watchers, return_exceptions=True)
+        self.watchers.clear()
+
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
+
+        with contextlib.suppress(FileNotFoundError):
+            os.unlink(self.path)
+
+    async def run(self) -> typing.Literal[Signals.SIGINT, Signals.SIGTERM]:
+        notifier = asygpy.create_notifier()
+
+        channel = notifier.open_channel()
+        channel.add_signal(Signals.SIGINT)
+        channel.add_signal(Signals.SIGTERM)
+
+        notifier.start_notifying()
+
+        await self.start()
+
+        signum = await channel.receive()
+        assert signum in (Signals.SIGINT, Signals.SIGTERM)
+        logger.debug(f'Supervisor received signal {signum!r}, shutting down')
+
+        await self.stop()
+
+        notifier.stop_notifying()
+        return signum
+
+
+class ClusterLauncher(ShardLauncher):
+    """A shard launcher that asks the supervisor before every IDENTIFY. When the supervisor
+    cannot be reached it falls back to limiting identifies in the worker."""
+
+    def __init__(
+        self,
+        worker: ClusterWorker,
+        *,
+        max_concurrency: int = 1,
+        callback: typing.Optional[ShardLaunchCallback] = None,
+    ) -> None:
+        super().__init__(max_concurrency=max_concurrency, callback=callback)
+        self.worker = worker
+
+    async def wait_for_identify(self, shard_id: int) -> None:
+        try:
+            await self.worker.wait_for_identify(shard_id)
+        except ConnectionError:
+            logger.warning('Lost connection to supervisor, limiting identifies locally')
+            await super().wait_for_identify(shard_id)
+
+    async def mark_ready(self, shard_id: int) -> None:
+        await super().mark_ready(shard_id)
+        self.worker.send({'op': 'ready', 'shard_id': shard_id})
+
+
+class ClusterWorker(BaseCluster):
+    """The connection of a worker process to its ClusterSupervisor,
+    available as WebSocketClient.cluster in the worker."""
+
+    reader: typing.Optional[asyncio.StreamReader]
+    writer: typing.Optional[asyncio.StreamWriter]
+    futures: typing.Dict[int, asyncio.Future[JSONObject]]
+
+    def __init__(
+        self, path: str, *, worker_id: int, shard_ids: typing.Tuple[int, ...], shard_count: int
+    ) -> None:
+        self.path = path
+        self.worker_id = worker_id
+        self.shard_ids = shard_ids
+        self.shard_count = shard_count
+
+        self.client: typing.Optional[WebSocketClient] = None
+
+        self.reader = None
+        self.writer = None
+        self.reader_task: typing.Optional[asyncio.Task[None]] = None
+
+        self.ids = itertools.count()
+        self.futures = {}
+        self.tasks: typing.Set[asyncio.Task[None]] = set()
+
+        self.handlers: typing.Dict[str, QueryHandler] = {'stats': self.answer_stats}
+
+    def is_connected(self) -> bool:
+        return self.writer is not None and not self.writer.is_closing()
+
+    def add_query_handler(self, name: str, handler: QueryHandler) -> None:
+        """Answers queries named name with the result of handler(data),
+        handler can be a function or a coroutine function."""
+        self.handlers[name] = handler
+
+    def create_launcher(
+        self, *, max_concurrency: int = 1, callback: typing.Optional[ShardLaunchCallback] = None
+    ) -> ClusterLauncher:
+        return ClusterLauncher(self, max_concurrency=max_concurrency, callback=callback)
+
+    async def connect(self) -> None:
+        self.reader, self.writer = await asyncio.open_unix_connection(self.path)
+        self.reader_task = asyncio.create_task(self.read_messages())
+
+        self.send({'op': 'hello', 'worker_id': self.worker_id})
+
+    def send(self, message: JSONObject) -> None:
+        if self.is_connected():
+            assert self.writer is not None
+            self.writer.write(encode_message(message))
+
+    async def request(self, message: JSONObject) -> JSONObject:
+        if not self.is_connected():
+            raise ConnectionResetError('Not connected to supervisor')
+
+        id = next(self.ids)
+
+        future = asyncio.get_running_loop().create_future()
+        self.futures[id] = future
+
+        try:
+            self.send({**message, 'id': id})
+            return await future
+        finally:
+            self.futures.pop(id, None)
+
+    async def wait_for_identify(self, shard_id: int) -> None:
+        await self.request({'op': 'identify', 'shard_id': shard_id})
+
+    async def query(self, name: str, data: JSONType = None) -> typing.List[JSONType]:
+        response = await asyncio.wait_for(
+            self.request({'op': 'query', 'name': name, 'data': data}), QUERY_TIMEOUT * 2
+        )
+        return json_get(response, 'results', typing.List[JSONType], default=[])
+
+    def answer_stats(self, data: JSONType) -> JSONObject:
+        shards = self.client.get_shards() if self.client is not None else ()
+
+        return {
+            'worker_id': self.worker_id,
+            'shard_ids': list(self.shard_ids),
+            'guilds': sum(len(shard.state.guilds) for shard in shards),
+            'queued_commands': sum(shard.queued_commands for shard in shards),
+            'latencies': {
+                str(shard.shard_id): None if math.isnan(shard.latency) else shard.latency
+                for shard in shards
+            },
+        }
+
+    async def answer_query(self, id: int, name: str, data: JSONType) -> None:
+        result: JSONType = None
+
+        handler = self.handlers.get(name)
+        if handler is None:
+            logger.debug(f'Worker received unhandled query {name!r}')
+        else:
+            try:
+                result = handler(data)
+                if inspect.isawaitable(result):
+                    result = await result
+            except Exception:
+                logger.exception(f'Worker failed to answer query {name!r}')
+                result = None
+
+        self.send({'op': 'result', 'id': id, 'result': result})
+
+    async def read_messages(self) -> None:
+        assert self.reader is not None
+
+        try:
+            while True:
+                line = await self.reader.readline()
+                if not line:
+                    break
+
+                message = load_json(line)
+                if not isinstance(message, dict):
+                    continue
+
+                id = message.get('id')
+                if not isinstance(id, int):
+                    continue
+
+                if message.get('op') == 'query':
+                    name = message.get('name')
+                    if isinstance(name, str):
+                        task = asyncio.create_task(self.answer_query(id, name, message.get('data')))
+                        task.add_done_callback(self.tasks.discard)
+                        self.tasks.add(task)
+
+                    continue
+
+                future = self.futures.pop(id, None)
+                if future is not None and not future.done():
+                    future.set_result(message)
+        finally:
+            if self.writer is not None:
+                self.writer.close()
+
+            for future in self.futures.values():
+                if not future.done():
+                    future.set_exception(ConnectionResetError('Lost connection to supervisor'))
+
+            self.futures.clear()
+
+    async def close(self) -> None:
+        for task in self.tasks:
+            task.cancel()
+
+        if self.writer is not None:
+            self.writer.close()
+
+        if self.reader_task is not None:
+            with contextlib.suppress(asyncio.CancelledError):
+                await self.reader_task
+
+
+async def worker_main(
+    factory: ClientFactory,
+    path: str,
+    worker_id: int,
+    shard_ids: typing.Tuple[int, ...],
+    shard_count: int,
+) -> None:
+    worker = ClusterWorker(path, worker_id=worker_id, shard_ids=shard_ids, shard_count=shard_count)
+
+    try:
+        await worker.connect()
+    except OSError as exc:
+        logger.warning(
+            f'Worker {worker_id} could not connect to supervisor: {exc}, '
+            'limiting identifies locally'
+        )
+
+        # Without a supervisor the client uses a plain ShardLauncher
+        client = factory(shard_ids=shard_ids, shard_count=shard_count, cluster=None)
+        return await client.connect()
+
+    try:
+        worker.client = factory(shard_ids=shard_ids, shard_count=shard_count, cluster=worker)
+        await worker.client.connect()
+    finally:
+        await worker.close()
+
+
+def run_worker(
+    factory: ClientFactory,
+    path: str,
+    worker_id: int,
+    shard_ids: typing.Tuple[int, ...],
+    shard_count: int,
+) -> None:
+    """The entry point of worker processes."""
+    asyncio.run(worker_main(factory, path, worker_id, shard_ids, shard_count))
@@ -12,11 +12,14 @@ from ..enums import WebSocketIntents
 from ..json import json_get
 from ..rest.endpoints import GET_GATEWAY, GET_GATEWAY_BOT
 from ..states import EventState
-from ..websockets.shard_websocket import Shard, ShardCancellationToken
+from ..websockets.shard_launcher import SessionStartLimit, ShardLauncher
+from ..websockets.shard_websocket import Shard, ShardCancellationToken, ShardOptions
 from .client import Client
 
 if typing.TYPE_CHECKING:
     from ..json import JSONObject
+    from ..websockets.shard_launcher import ShardLaunchCallback
+    from .cluster import ClusterWorker
 
 __all__ = ('WebSocketClient',)
 
@@ -28,6 +31,10 @@ class WebSocketClient(Client):
         *,
         intents: WebSocketIntents,
         shard_ids: typing.Optional[typing.Iterable[int]] = None,
+        shard_count: typing.Optional[int] = None,
+        shard_options: typing.Optional[ShardOptions] = None,
+        launch_callback: typing.Optional[ShardLaunchCallback] = None,
+        cluster: typing.Optional[ClusterWorker] = None,
     ) -> None:
         super().__init__(authorization)
 
@@ -35,7 +42,15 @@ class WebSocketClient(Client):
             raise TypeError(f'Cannot connect to gateway using {self.authorization.type.name} token')
 
         self.shard_ids = tuple(shard_ids) if shard_ids is not None else None
+        # The number of shards the bot has across every process, not just the ones in shard_ids
+        self.shard_count = shard_count
         self.intents = intents
+        self.shard_options = shard_options if shard_options is not None else ShardOptions()
+        self.launch_callback = launch_callback
+        self.cluster = cluster
+
+        self.launcher: typing.Optional[ShardLauncher] = None
+        self.launch_task: typing.Optional[asyncio.Task[None]] = None
 
         self._shards: typing.Dict[int, Shard] = {}
 
@@ -65,6 +80,25 @@ class WebSocketClient(Client):
 
         return data
 
+    def create_launcher(self, gateway: JSONObject) -> ShardLauncher:
+        data = gateway.get('session_start_limit')
+
+        if self.cluster is not None:
+            # The session start limit is tracked by the supervisor
+            max_concurrency = data.get('max_concurrency') if isinstance(data, dict) else None
+            return self.cluster.create_launcher(
+                max_concurrency=max_concurrency if isinstance(max_concurrency, int) else 1,
+                callback=self.launch_callback,
+            )
+
+        if isinstance(data, dict):
+            limit = SessionStartLimit.from_json(data)
+            return ShardLauncher(
+                max_concurrency=limit.max_concurrency, limit=limit, callback=self.launch_callback
+            )
+
+        return ShardLauncher(callback=self.launch_callback)
+
     async def connect(self) -> typing.Literal[Signals.SIGINT, Signals.SIGTERM]:
         self.loop = asyncio.get_running_loop()
 
@@ -76,23 +110,29 @@ class WebSocketClient(Client):
 
         notifier.start_notifying()
 
+        await self.rest.warmup()
+
         gateway = await self.fetch_gateway()
         url = json_get(gateway, 'url', str)
 
         if self.shard_ids is not None:
             sharded = True
+
+            if self.shard_count is None:
+                self.shard_count = len(self.shard_ids)
         else:
             shards = json_get(gateway, 'shards', int, default=1)
 
             sharded = shards > 1
             self.shard_ids = tuple(range(shards))
+            self.shard_count = shards
 
         for shard_id in self.shard_ids:
-            shard = Shard(self, url, shard_id, sharded=sharded)
+            shard = Shard(self, url, shard_id, sharded=sharded, options=self.shard_options)
             self._shards[shard_id] = shard
 
-        for shard in self.get_shards():
-            shard.start()
+        self.launcher = self.create_launcher(gateway)
+        self.launch_task = self.loop.create_task(self.launcher.launch(self.get_shards()))
 
         signum = await channel.receive()
         assert signum in (Signals.SIGINT, Signals.SIGTERM)
@@ -104,6 +144,9 @@ class WebSocketClient(Client):
         return signum
 
     async def cleanup(self) -> None:
+        if self.launch_task is not None:
+            self.launch_task.cancel()
+
         for shard in self.get_shards():
             shard.state.cancel(ShardCancellationToken.SIGNAL_INTERRUPT)
 
@@ -0,0 +1,342 @@
+"""An encoder and decoder for the External Term Format, the binary encoding used
+by Erlang that the gateway speaks when it is connected to with encoding=etf.
+
+Only the terms that the gateway sends and accepts are supported. Decoding produces
+the same shapes that JSON decoding does, except for snowflakes which the gateway
+sends as integers instead of strings: atoms become strings (nil becomes None, true
+and false become booleans), binaries become strings and tuples become lists."""
+
+from __future__ import annotations
+
+import struct
+import typing
+import zlib
+
+from .json import JSONObject, JSONType
+
+__all__ = ('load_etf', 'dump_etf')
+
+FORMAT_VERSION = 131
+
+NEW_FLOAT_EXT = 70
+COMPRESSED = 80
+SMALL_INTEGER_EXT = 97
+INTEGER_EXT = 98
+FLOAT_EXT = 99
+ATOM_EXT = 100
+SMALL_TUPLE_EXT = 104
+LARGE_TUPLE_EXT = 105
+NIL_EXT = 106
+STRING_EXT = 107
+LIST_EXT = 108
+BINARY_EXT = 109
+SMALL_BIG_EXT = 110
+LARGE_BIG_EXT = 111
+MAP_EXT = 116
+SMALL_ATOM_EXT = 115
+ATOM_UTF8_EXT = 118
+SMALL_ATOM_UTF8_EXT = 119
+
+ATOMS: typing.Dict[bytes, JSONType] = {
+    b'nil': None,
+    b'null': None,
+    b'true': True,
+    b'false': False,
+}
+
+unpack_int32 = struct.Struct('>i').unpack_from
+unpack_uint32 = struct.Struct('>I').unpack_from
+unpack_uint16 = struct.Struct('>H').unpack_from
+unpack_double = struct.Struct('>d').unpack_from
+
+pack_int32 = struct.Struct('>Bi').pack
+pack_uint32 = struct.Struct('>BI').pack
+pack_double = struct.Struct('>Bd').pack
+
+Decoder = typing.Callable[[bytes, int], typing.Tuple[JSONType, int]]
+
+
+def decode_atom(data: bytes, offset: int, length: int) -> typing.Tuple[JSONType, int]:
+    end = offset + length
+    name = data[offset:end]
+
+    try:
+        return ATOMS[name], end
+    except KeyError:
+        return name.decode('utf-8'), end
+
+
+def decode_small_integer(data: bytes, offset: int) -> typing.Tuple[JSONType, int]:
+    return data[offset], offset + 1
+
+
+def decode_integer(data: bytes, offset: int) -> typing.Tuple[JSONType, int]:
+    return unpack_int32(data, offset)[0], offset + 4
+
+
+def decode_new_float(data: bytes, offset: int) -> typing.Tuple[JSONType, int]:
+    return unpack_double(data, offset)[0], offset + 8
+
+
+def decode_float(data: bytes, offset: int) -> typing.Tuple[JSONType, int]:
+    # The old format is a float formatted as a string padded to 31 bytes with null bytes
+    end = offset + 31
+    return float(data[offset:end].rstrip(b'\x00')), end
+
+
+def decode_atom_ext(data: bytes, offset: int) -> typing.Tuple[JSONType, int]:
+    return decode_atom(data, offset + 2, unpack_uint16(data, offset)[0])
+
+
+def decode_small_atom_ext(data: bytes, offset: int) -> typing.Tuple[JSONType, int]:
+    return decode_atom(data, offset + 1, data[offset])
+
+
+def decode_items(data: bytes, offset: int, length: int) -> typing.Tuple[JSONType, int]:
+    items: typing.List[JSONType] = []
+
+    for _ in range(length):
+        item, offset = DECODERS[data[offset]](data, offset + 1)
+        items.append(item)
+
+    return items, offset
+
+
+def decode_small_tuple(data: bytes, offset: int) -> typing.Tuple[JSONType, int]:
+    return decode_items(data, offset + 1, data[offset])
+
+
+def decode_large_tuple(data: bytes, offset: int) -> typing.Tuple[JSONType, int]:
+    return decode_items(data, offset + 4, unpack_uint32(data, offset)[0])
+
+
+def decode_nil(data: bytes, offset: int) -> typing.Tuple[JSONType, int]:
+    return [], offset
+
+
+def decode_string(data: bytes, offset: int) -> typing.Tuple[JSONType, int]:
+    # Erlang encodes lists of integers that fit in a byte this way
+    start = offset + 2
+    end = start + unpack_uint16(data, offset)[0]
+    return list(data[start:end]), end
+
+
+def decode_list(data: bytes, offset: int) -> typing.Tuple[JSONType, int]:
+    items, offset = decode_items(data, offset + 4, unpack_uint32(data, offset)[0])
+
+    # The tail of a proper list is NIL_EXT, anything else is an improper list
+    if data[offset] != NIL_EXT:
+        raise ValueError('improper lists are not supported')
+
+    return items, offset + 1
+
+
+def decode_binary(data: bytes, offset: int) -> typing.Tuple[JSONType, int]:
+    start = offset + 4
+    end = start + unpack_uint32(data, offset)[0]
+    return data[start:end].decode('utf-8'), end
+
+
+def decode_big(data: bytes, offset: int, length: int) -> typing.Tuple[JSONType, int]:
+    start = offset + 1
+    end = start + length
+    value = int.from_bytes(data[start:end], 'little')
+    return -value if data[offset] else value, end
+
+
+def decode_small_big(data: bytes, offset: int) -> typing.Tuple[JSONType, int]:
+    return decode_big(data, offset + 1, data[offset])
+
+
+def decode_large_big(data: bytes, offset: int) -> typing.Tuple[JSONType, int]:
+    return decode_big(data, offset + 4, unpack_uint32(data, offset)[0])
+
+
+def decode_map(data: bytes, offset: int) -> typing.Tuple[JSONType, int]:
+    length = unpack_uint32(data, offset)[0]
+    offset += 4
+
+    object: JSONObject = {}
+
+    # Maps make up most of a payload, so the common keys and values are decoded inline
+    for _ in range(length):
+        tag = data[offset]
+
+        if tag == SMALL_ATOM_UTF8_EXT or tag == SMALL_ATOM_EXT:
+            start = offset + 2
+            offset = start + data[offset + 1]
+            key = data[start:offset].decode('utf-8')
+
+        elif tag == BINARY_EXT:
+            start = offset + 5
+            offset = start + unpack_uint32(data, offset + 1)[0]
+            key = data[start:offset].decode('utf-8')
+
+        else:
+            key, offset = DECODERS[tag](data, offset + 1)
+            if not isinstance(key, str):
+                # JSON objects only have string keys
+                key = str(key)
+
+        tag = data[offset]
+
+        if tag == BINARY_EXT:
+            start = offset + 5
+            offset = start + unpack_uint32(data, offset + 1)[0]
+            object[key] = data[start:offset].decode('utf-8')
+
+        elif tag == SMALL_BIG_EXT:
+            start = offset + 3
+            end = start + data[offset + 1]
+            value = int.from_bytes(data[start:end], 'little')
+            object[key] = -value if data[offset + 2] else value
+            offset = end
+
+        elif tag == SMALL_ATOM_UTF8_EXT:
+            object[key], offset = decode_atom(data, offset + 2, data[offset + 1])
+
+        elif tag == SMALL_INTEGER_EXT:
+            object[key] = data[offset + 1]
+            offset += 2
+
+        else:
+            object[key], offset = DECODERS[tag](data, offset + 1)
+
+    return object, offset
+
+
+def decode_compressed(data: bytes, offset: int) -> typing.Tuple[JSONType, int]:
+    size = unpack_uint32(data, offset)[0]
+
+    start = offset + 4
+
+    decompressor = zlib.decompressobj()
+    uncompressed = decompressor.decompress(data[start:], size)
+
+    if len(uncompressed) != size:
+        raise ValueError('compressed term is shorter than its size')
+
+    value, _ = DECODERS[uncompressed[0]](uncompressed, 1)
+    return value, len(data) - len(decompressor.unused_data)
+
+
+DECODERS: typing.Dict[int, Decoder] = {
+    NEW_FLOAT_EXT: decode_new_float,
+    COMPRESSED: decode_compressed,
+    SMALL_INTEGER_EXT: decode_small_integer,
+    INTEGER_EXT: decode_integer,
+    FLOAT_EXT: decode_float,
+    ATOM_EXT: decode_atom_ext,
+    SMALL_TUPLE_EXT: decode_small_tuple,
+    LARGE_TUPLE_EXT: decode_large_tuple,
+    NIL_EXT: decode_nil,
+    STRING_EXT: decode_string,
+    LIST_EXT: decode_list,
+    BINARY_EXT: decode_binary,
+    SMALL_BIG_EXT: decode_small_big,
+    LARGE_BIG_EXT: decode_large_big,
+    MAP_EXT: decode_map,
+    SMALL_ATOM_EXT: decode_small_atom_ext,
+    ATOM_UTF8_EXT: decode_atom_ext,
+    SMALL_ATOM_UTF8_EXT: decode_small_atom_ext,
+}
+
+
+def load_etf(data: typing.Union[bytes, bytearray, memoryview]) -> JSONType:
+    """Decodes a term, raises ValueError if data is not a valid or supported term."""
+    data = bytes(data)
+
+    try:
+        if data[0] != FORMAT_VERSION:
+            raise ValueError(f'unsupported format version {data[0]}')
+
+        value, offset = DECODERS[data[1]](data, 2)
+    except KeyError as exc:
+        raise ValueError(f'unsupported term with tag {exc.args[0]}') from None
+    except (IndexError, struct.error):
+        raise ValueError('term is truncated') from None
+    except zlib.error as exc:
+        raise ValueError(f'compressed term is invalid: {exc}') from None
+
+    if offset != len(data):
+        raise ValueError('extra data after term')
+
+    return value
+
+
+def encode_atom(buffer: bytearray, name: bytes) -> None:
+    buffer.append(SMALL_ATOM_UTF8_EXT)
+    buffer.append(len(name))
+    buffer += name
+
+
+def encode_term(buffer: bytearray, object: typing.Any) -> None:
+    if object is None:
+        encode_atom(buffer, b'nil')
+
+    elif object is True:
+        encode_atom(buffer, b'true')
+
+    elif object is False:
+        encode_atom(buffer, b'false')
+
+    elif isinstance(object, int):
+        if 0 <= object <= 255:
+            buffer.append(SMALL_INTEGER_EXT)
+            buffer.append(object)
+
+        elif -(2**31) <= object < 2**31:
+            buffer += pack_int32(INTEGER_EXT, object)
+
+        else:
+            value = abs(object)
+            data = value.to_bytes((value.bit_length() + 7) // 8, 'little')
+
+            if len(data) > 255:
+                raise ValueError('integer is too large to encode')
+
+            buffer.append(SMALL_BIG_EXT)
+            buffer.append(len(data))
+            buffer.append(object < 0)
+            buffer += data
+
+    elif isinstance(object, float):
+        buffer += pack_double(NEW_FLOAT_EXT, object)
+
+    elif isinstance(object, str):
+        data = object.encode('utf-8')
+        buffer += pack_uint32(BINARY_EXT, len(data))
+        buffer += data
+
+    elif isinstance(object, (bytes, bytearray)):
+        buffer += pack_uint32(BINARY_EXT, len(object))
+        buffer += object
+
+    elif isinstance(object, dict):
+        buffer += pack_uint32(MAP_EXT, len(object))
+
+        for key, value in object.items():
+            encode_term(buffer, key)
+            encode_term(buffer, value)
+
+    elif isinstance(object, (list, tuple)):
+        if object:
+            buffer += pack_uint32(LIST_EXT, len(object))
+
+            for item in object:
+                encode_term(buffer, item)
+
+        buffer.append(NIL_EXT)
+
+    elif isinstance(object, typing.Iterable):
+        encode_term(buffer, tuple(object))
+
+    else:
+        raise TypeError(f'Object of type {object.__class__.__name__} is not ETF serializable')
+
+
+def dump_etf(object: typing.Any) -> bytes:
+    """Encodes object as a term, converting any iterable object into a list."""
+    buffer = bytearray((FORMAT_VERSION,))
+    encode_term(buffer, object)
+    return bytes(buffer)
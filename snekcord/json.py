@@ -4,6 +4,15 @@ import typing
 from .undefined import MaybeUndefined, undefined
 
 __all__ = (
+    'JSONBackend',
+    'StdlibJSONBackend',
+    'OrjsonJSONBackend',
+    'MsgspecJSONBackend',
+    'UjsonJSONBackend',
+    'register_json_backend',
+    'create_json_backend',
+    'get_json_backend',
+    'set_json_backend',
     'load_json',
     'dump_json',
 )
@@ -14,9 +23,12 @@ DefaultT = typing.TypeVar('DefaultT')
 JSONObject = typing.Dict[str, 'JSONType']
 JSONType = typing.Union[None, bool, str, int, float, JSONObject, typing.List['JSONType']]
 
+# Snowflakes are strings in JSON payloads and integers in ETF payloads
+JSONSnowflake = typing.Union[str, int]
+
 
 def dump_default(
-    object: typing.Union[typing.Iterable[T], typing.Any]
+    object: typing.Union[typing.Iterable[T], typing.Any],
 ) -> typing.Union[typing.Tuple[T, ...], typing.Any]:
     if isinstance(object, typing.Iterable):
         return tuple(object)
@@ -24,16 +36,188 @@ def dump_default(
     raise TypeError(f'Object of type {object.__class__.__name__} is not JSON serializable')
 
 
-def load_json(*args: typing.Union[str, bytes], **kwargs: typing.Any) -> JSONType:
-    """Equivalent to json.loads."""
-    return json.loads(*args, **kwargs)
+class JSONBackend:
+    """The abstract base class for all JSON backends. Backends that depend on an optional
+    package import it in __init__ and raise ImportError when it is not installed.
+
+    Every backend converts iterable objects that are not lists or tuples into arrays."""
+
+    name: typing.ClassVar[str]
+
+    def loads(self, data: typing.Union[str, bytes]) -> JSONType:
+        """Decodes a JSON document."""
+        raise NotImplementedError
+
+    def dumps(self, object: typing.Any) -> str:
+        """Encodes an object as a compact JSON document."""
+        raise NotImplementedError
+
+    def dumpb(self, object: typing.Any) -> bytes:
+        """Encodes an object as a compact UTF-8 JSON document."""
+        return self.dumps(object).encode('utf-8')
+
+    def __repr__(self) -> str:
+        return f'<{self.__class__.__name__} {self.name!r}>'
+
+
+class StdlibJSONBackend(JSONBackend):
+    """A backend using the json module from the standard library."""
+
+    name = 'json'
+
+    def __init__(self) -> None:
+        # json.dumps() creates an encoder on every call when it is given any options
+        self.encoder = json.JSONEncoder(separators=(',', ':'), default=dump_default)
+
+    def loads(self, data: typing.Union[str, bytes]) -> JSONType:
+        return json.loads(data)
+
+    def dumps(self, object: typing.Any) -> str:
+        return self.encoder.encode(object)
+
+
+class OrjsonJSONBackend(JSONBackend):
+    """A backend using orjson, which encodes straight to bytes. Subclasses of int,
+    such as Snowflake, and enums are encoded without going through dump_default."""
+
+    name = 'orjson'
+
+    def __init__(self) -> None:
+        import orjson
+
+        self.orjson = orjson
+
+    def loads(self, data: typing.Union[str, bytes]) -> JSONType:
+        return self.orjson.loads(data)
+
+    def dumps(self, object: typing.Any) -> str:
+        return self.orjson.dumps(object, default=dump_default).decode('utf-8')
+
+    def dumpb(self, object: typing.Any) -> bytes:
+        return self.orjson.dumps(object, default=dump_default)
+
+
+class MsgspecJSONBackend(JSONBackend):
+    """A backend using msgspec's JSON encoder and decoder, which encodes straight to bytes."""
+
+    name = 'msgspec'
+
+    def __init__(self) -> None:
+        import msgspec
+
+        self.decoder = msgspec.json.Decoder()
+        self.encoder = msgspec.json.Encoder(enc_hook=self.encode_default)
+
+    @staticmethod
+    def encode_default(object: typing.Any) -> typing.Any:
+        if isinstance(object, int):
+            return int(object)
+
+        return dump_default(object)
+
+    def loads(self, data: typing.Union[str, bytes]) -> JSONType:
+        return self.decoder.decode(data)
+
+    def dumps(self, object: typing.Any) -> str:
+        return self.encoder.encode(object).decode('utf-8')
+
+    def dumpb(self, object: typing.Any) -> bytes:
+        return self.encoder.encode(object)
+
+
+class UjsonJSONBackend(JSONBackend):
+    """A backend using ujson."""
+
+    name = 'ujson'
+
+    def __init__(self) -> None:
+        import ujson
+
+        self.ujson = ujson
+
+    def loads(self, data: typing.Union[str, bytes]) -> JSONType:
+        return self.ujson.loads(data)
+
+    def dumps(self, object: typing.Any) -> str:
+        return self.ujson.dumps(object, ensure_ascii=False, default=dump_default)
+
+
+JSON_BACKENDS: typing.Dict[str, typing.Callable[[], JSONBackend]] = {}
+
+
+def register_json_backend(name: str, factory: typing.Callable[[], JSONBackend]) -> None:
+    """Registers a JSON backend under name. Backends registered later are
+    preferred by create_json_backend() when no name is given."""
+    JSON_BACKENDS.pop(name, None)
+    JSON_BACKENDS[name] = factory
+
+
+# From the least to the most preferred
+register_json_backend(StdlibJSONBackend.name, StdlibJSONBackend)
+register_json_backend(UjsonJSONBackend.name, UjsonJSONBackend)
+register_json_backend(MsgspecJSONBackend.name, MsgspecJSONBackend)
+register_json_backend(OrjsonJSONBackend.name, OrjsonJSONBackend)
+
+
+def create_json_backend(name: typing.Optional[str] = None) -> JSONBackend:
+    """Creates the JSON backend registered under name, or the most preferred
+    backend whose package is installed if name is None.
+
+    Raises KeyError if no backend is registered under name and ImportError
+    if its package is not installed."""
+    if name is not None:
+        return JSON_BACKENDS[name]()
+
+    for factory in reversed(JSON_BACKENDS.values()):
+        try:
+            return factory()
+        except ImportError:
+            pass
+
+    return StdlibJSONBackend()
+
+
+json_backend: typing.Optional[JSONBackend] = None
+
+
+def get_json_backend() -> JSONBackend:
+    """Returns the JSON backend used by default, it is created on first use."""
+    global json_backend
+
+    if json_backend is None:
+        json_backend = create_json_backend()
+
+    return json_backend
+
+
+def set_json_backend(backend: typing.Union[str, JSONBackend]) -> None:
+    """Sets the JSON backend used by default, either a backend or the name of a registered one.
+    Sessions and shards that already exist keep the backend they were created with."""
+    global json_backend
+
+    if isinstance(backend, str):
+        backend = create_json_backend(backend)
+
+    json_backend = backend
+
+
+def load_json(data: typing.Union[str, bytes], **kwargs: typing.Any) -> JSONType:
+    """Decodes data with the default backend, passing keyword arguments
+    falls back to json.loads."""
+    if kwargs:
+        return json.loads(data, **kwargs)
+
+    return get_json_backend().loads(data)
+
 
+def dump_json(obj: typing.Any, **kwargs: typing.Any) -> str:
+    """Encodes obj with the default backend, converting any iterable object into an array.
+    Passing keyword arguments falls back to json.dumps."""
+    if kwargs:
+        kwargs.setdefault('separators', (',', ':'))
+        return json.dumps(obj, **kwargs, default=dump_default)
 
-def dump_json(
-    obj: typing.Any, *, separators: typing.Tuple[str, str] = (',', ':'), **kwargs: typing.Any
-) -> str:
-    """Equivalent to json.dumps but converts any iterable object into a tuple."""
-    return json.dumps(obj, separators=separators, **kwargs, default=dump_default)
+    return get_json_backend().dumps(obj)
 
 
 def json_get(
@@ -54,7 +238,7 @@ def json_get(
     origin = typing.get_origin(tp)
 
     if origin is typing.Union:
-        args = typing.get_args(origin)
+        args = typing.get_args(tp)
         tps = tuple(typing.get_origin(arg) or arg for arg in args)
     else:
         tps = origin if origin is not None else tp
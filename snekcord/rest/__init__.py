@@ -1 +1,8 @@
+from .cdn_cache import CDNCache, DiskCDNCache
+from .connector import RESTConnectorOptions
+from .metrics import RESTMetrics
+from .multipart import MultipartFile
+from .response_cache import CachedResponse, MemoryResponseCache, ResponseCache
+from .retry import RetryPolicy
+from .scheduler import RequestPriority, RequestScheduler
 from .session import RESTSession
@@ -0,0 +1,268 @@
+from __future__ import annotations
+
+import asyncio
+import collections
+import contextlib
+import hashlib
+import os
+import tempfile
+import typing
+
+from loguru import logger
+
+from ..json import dump_json, load_json
+from ..streams import AsyncReadStream, FSReadStream
+
+__all__ = ('CDNCache', 'DiskCDNCache')
+
+INDEX_FILENAME = 'index.json'
+OBJECTS_DIRECTORY = 'objects'
+
+
+class CDNCacheEntry:
+    __slots__ = ('digest', 'size', 'content_type')
+
+    def __init__(self, digest: str, *, size: int, content_type: typing.Optional[str]) -> None:
+        self.digest = digest
+        self.size = size
+        self.content_type = content_type
+
+    def __repr__(self) -> str:
+        return f'CDNCacheEntry(digest={self.digest!r}, size={self.size!r})'
+
+
+class CDNCache:
+    """The abstract base class for all CDN caches."""
+
+    async def get(self, key: str) -> typing.Optional[AsyncReadStream]:
+        """Returns a stream of the asset cached for key."""
+        raise NotImplementedError
+
+    async def set(self, key: str, stream: AsyncReadStream) -> None:
+        """Reads the stream to the end and caches its contents for key."""
+        raise NotImplementedError
+
+    async def drop(self, key: str) -> None:
+        """Removes the asset cached for key."""
+        raise NotImplementedError
+
+    async def clear(self) -> None:
+        """Removes every cached asset."""
+        raise NotImplementedError
+
+    async def close(self) -> None:
+        """Flushes any state the cache needs to persist."""
+
+
+class DiskCDNCache(CDNCache):
+    """A CDN cache that stores assets in a directory, named by the SHA-256 of their content.
+
+    Keys that resolve to identical content share one file. The least recently used keys
+    are evicted once the combined size of the files exceeds max_size. The index is
+    written to the directory on close() so the cache survives restarts, files that
+    are missing from the index are deleted when it is loaded."""
+
+    entries: collections.OrderedDict[str, CDNCacheEntry]
+    references: typing.Dict[str, int]
+
+    def __init__(
+        self, directory: typing.Union[str, os.PathLike[str]], *, max_size: int = 2**28
+    ) -> None:
+        self.directory = os.fspath(directory)
+        self.max_size = max_size
+        self.size = 0
+
+        self.entries = collections.OrderedDict()
+        self.references = {}
+
+        self.loaded = False
+        self.lock = asyncio.Lock()
+
+    def get_path(self, digest: str) -> str:
+        return os.path.join(self.directory, OBJECTS_DIRECTORY, digest[:2], digest)
+
+    def load_index(self) -> None:
+        os.makedirs(os.path.join(self.directory, OBJECTS_DIRECTORY), exist_ok=True)
+
+        try:
+            with open(os.path.join(self.directory, INDEX_FILENAME), 'rb') as fp:
+                index = load_json(fp.read())
+        except FileNotFoundError:
+            index = []
+        except ValueError:
+            logger.warning(f'Discarding corrupt CDN cache index in {self.directory!r}')
+            index = []
+
+        for key, digest, size, content_type in typing.cast(typing.List[typing.Any], index):
+            if digest not in self.references:
+                if not os.path.isfile(self.get_path(digest)):
+                    continue
+
+                self.references[digest] = 0
+                self.size += size
+
+            self.references[digest] += 1
+            self.entries[key] = CDNCacheEntry(digest, size=size, content_type=content_type)
+
+        # Files written by a process that exited before saving its index are unreachable
+        for directory in os.scandir(os.path.join(self.directory, OBJECTS_DIRECTORY)):
+            if not directory.is_dir():
+                continue
+
+            for file in os.scandir(directory.path):
+                if file.name not in self.references:
+                    with contextlib.suppress(OSError):
+                        os.remove(file.path)
+
+    def save_index(self) -> None:
+        index = [
+            (key, entry.digest, entry.size, entry.content_type)
+            for key, entry in self.entries.items()
+        ]
+
+        fd, path = tempfile.mkstemp(dir=self.directory)
+
+        with open(fd, 'w') as fp:
+            fp.write(dump_json(index))
+
+        os.replace(path, os.path.join(self.directory, INDEX_FILENAME))
+
+    async def ensure_loaded(self) -> None:
+        async with self.lock:
+            if not self.loaded:
+                await asyncio.get_running_loop().run_in_executor(None, self.load_index)
+                self.loaded = True
+
+    def open_file(self, digest: str) -> typing.Optional[typing.IO[bytes]]:
+        try:
+            return open(self.get_path(digest), 'rb')
+        except FileNotFoundError:
+            return None
+
+    def remove_file(self, digest: str) -> None:
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(self.get_path(digest))
+
+    def store_file(self, path: str, digest: str) -> None:
+        destination = self.get_path(digest)
+        os.makedirs(os.path.dirname(destination), exist_ok=True)
+
+        if os.path.exists(destination):
+            os.remove(path)
+        else:
+            os.replace(path, destination)
+
+    def pop_entry(self, key: str) -> typing.Optional[str]:
+        # Returns the digest of the entry if no other key refers to its file
+        entry = self.entries.pop(key, None)
+        if entry is None:
+            return None
+
+        self.references[entry.digest] -= 1
+        if self.references[entry.digest] > 0:
+            return None
+
+        del self.references[entry.digest]
+        self.size -= entry.size
+
+        return entry.digest
+
+    async def remove_files(self, digests: typing.Iterable[str]) -> None:
+        loop = asyncio.get_running_loop()
+
+        for digest in digests:
+            await loop.run_in_executor(None, self.remove_file, digest)
+
+    async def get(self, key: str) -> typing.Optional[FSReadStream]:
+        await self.ensure_loaded()
+
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+
+        self.entries.move_to_end(key)
+
+        # The file is opened up front so it can be read even if the entry is evicted
+        fp = await asyncio.get_running_loop().run_in_executor(None, self.open_file, entry.digest)
+        if fp is None:
+            await self.drop(key)
+            return None
+
+        stream = FSReadStream(self.get_path(entry.digest), content_type=entry.content_type)
+        stream.fp = fp
+
+        return stream
+
+    async def set(self, key: str, stream: AsyncReadStream) -> None:
+        await self.ensure_loaded()
+
+        loop = asyncio.get_running_loop()
+
+        fd, path = await loop.run_in_executor(None, tempfile.mkstemp, None, None, self.directory)
+
+        sha = hashlib.sha256()
+        size = 0
+
+        try:
+            with open(fd, 'wb') as fp:
+                async for chunk in stream.aiter():
+                    sha.update(chunk)
+                    size += len(chunk)
+
+                    if size > self.max_size:
+                        break
+
+                    await loop.run_in_executor(None, fp.write, chunk)
+
+            if size > self.max_size:
+                await loop.run_in_executor(None, os.remove, path)
+                return await self.drop(key)
+
+            digest = sha.hexdigest()
+            await loop.run_in_executor(None, self.store_file, path, digest)
+        except BaseException:
+            with contextlib.suppress(FileNotFoundError):
+                os.remove(path)
+            raise
+
+        removed = []
+
+        previous = self.pop_entry(key)
+        if previous is not None and previous != digest:
+            removed.append(previous)
+
+        if digest not in self.references:
+            self.references[digest] = 0
+            self.size += size
+
+        self.references[digest] += 1
+        self.entries[key] = CDNCacheEntry(digest, size=size, content_type=stream.content_type)
+
+        while self.size > self.max_size:
+            evicted = self.pop_entry(next(iter(self.entries)))
+            if evicted is not None:
+                removed.append(evicted)
+
+        await self.remove_files(removed)
+
+    async def drop(self, key: str) -> None:
+        await self.ensure_loaded()
+
+        digest = self.pop_entry(key)
+        if digest is not None:
+            await self.remove_files((digest,))
+
+    async def clear(self) -> None:
+        await self.ensure_loaded()
+
+        digests = list(self.references)
+
+        self.entries.clear()
+        self.references.clear()
+        self.size = 0
+
+        await self.remove_files(digests)
+
+    async def close(self) -> None:
+        if self.loaded:
+            await asyncio.get_running_loop().run_in_executor(None, self.save_index)
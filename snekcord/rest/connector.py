@@ -0,0 +1,65 @@
+from __future__ import annotations
+
+import socket
+import typing
+
+import aiohttp
+import attr
+
+if typing.TYPE_CHECKING:
+    from aiohttp.client_reqrep import ClientRequest
+    from aiohttp.tracing import Trace
+
+__all__ = ('RESTConnectorOptions', 'RESTConnector')
+
+
+@attr.s(kw_only=True)
+class RESTConnectorOptions:
+    """Connection pool settings used by RESTSession."""
+
+    limit: int = attr.ib(default=100)
+    """The maximum number of simultaneous connections, 0 means no limit."""
+
+    limit_per_host: int = attr.ib(default=0)
+    """The maximum number of simultaneous connections to a single host, 0 means no limit."""
+
+    keepalive_timeout: float = attr.ib(default=30.0)
+    """The number of seconds an idle connection is kept open for reuse."""
+
+    use_dns_cache: bool = attr.ib(default=True)
+    """Whether DNS lookups should be cached."""
+
+    ttl_dns_cache: typing.Optional[int] = attr.ib(default=300)
+    """The number of seconds a DNS lookup is cached for, None caches forever."""
+
+    tcp_nodelay: bool = attr.ib(default=True)
+    """Whether Nagle's algorithm should be disabled on new connections."""
+
+    warmup_connections: int = attr.ib(default=0)
+    """The number of connections opened to each host by RESTSession.warmup."""
+
+
+class RESTConnector(aiohttp.TCPConnector):
+    def __init__(self, options: RESTConnectorOptions) -> None:
+        super().__init__(
+            limit=options.limit,
+            limit_per_host=options.limit_per_host,
+            keepalive_timeout=options.keepalive_timeout,
+            use_dns_cache=options.use_dns_cache,
+            ttl_dns_cache=options.ttl_dns_cache,
+        )
+        self.tcp_nodelay = options.tcp_nodelay
+
+    async def connect(
+        self, req: ClientRequest, traces: typing.List[Trace], timeout: aiohttp.ClientTimeout
+    ) -> aiohttp.connector.Connection:
+        connection = await super().connect(req, traces, timeout)
+
+        # aiohttp enables TCP_NODELAY for every connection, so this is only needed to disable it
+        if not self.tcp_nodelay and connection.transport is not None:
+            sock = connection.transport.get_extra_info('socket')
+
+            if sock is not None and sock.family in (socket.AF_INET, socket.AF_INET6):
+                sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, False)
+
+        return connection
@@ -0,0 +1,419 @@
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import itertools
+import os
+import sys
+import time
+import typing
+
+from loguru import logger
+
+from ..json import JSONObject, dump_json, load_json
+from . import hdrs
+from .endpoints import APIEndpoint
+from .ratelimit import BaseRateLimiter, RateLimitBucket, RateLimiter
+from .scheduler import RequestPriority
+
+__all__ = ('RateLimitCoordinator', 'CoordinatedRateLimiter')
+
+RECONNECT_DELAY = 5.0
+
+FORWARDED_HEADERS = (
+    hdrs.X_RATELIMIT_LIMIT,
+    hdrs.X_RATELIMIT_REMAINING,
+    hdrs.X_RATELIMIT_RESET,
+    hdrs.X_RATELIMIT_RESET_AFTER,
+    hdrs.X_RATELIMIT_BUCKET,
+    hdrs.X_RATELIMIT_GLOBAL,
+    hdrs.X_RATELIMIT_SCOPE,
+    hdrs.RETRY_AFTER,
+)
+
+
+def encode_message(message: JSONObject) -> bytes:
+    return dump_json(message).encode('utf-8') + b'\n'
+
+
+class CoordinatorConnection:
+    def __init__(
+        self,
+        coordinator: RateLimitCoordinator,
+        reader: asyncio.StreamReader,
+        writer: asyncio.StreamWriter,
+    ) -> None:
+        self.coordinator = coordinator
+        self.reader = reader
+        self.writer = writer
+
+        self.tickets: typing.Dict[int, typing.Tuple[APIEndpoint, JSONObject, RateLimitBucket]] = {}
+        self.tasks: typing.Dict[int, asyncio.Task[None]] = {}
+
+    def send(self, message: JSONObject) -> None:
+        if not self.writer.is_closing():
+            self.writer.write(encode_message(message))
+
+    async def acquire(
+        self, id: int, endpoint: APIEndpoint, keywords: JSONObject, priority: RequestPriority
+    ) -> None:
+        try:
+            bucket = await self.coordinator.ratelimiter.acquire(
+                endpoint, keywords, priority=priority
+            )
+        finally:
+            self.tasks.pop(id, None)
+
+        self.tickets[id] = (endpoint, keywords, bucket)
+        self.send({'id': id, 'bucket': bucket.key})
+
+    async def release(self, id: int, message: JSONObject) -> None:
+        try:
+            endpoint, keywords, bucket = self.tickets.pop(id)
+        except KeyError:
+            return self.send({'id': id, 'retry_after': None})
+
+        headers = message.get('headers')
+        status = message.get('status')
+
+        retry_after = await self.coordinator.ratelimiter.release(
+            endpoint,
+            keywords,
+            bucket,
+            status=status if isinstance(status, int) else None,
+            headers=headers if isinstance(headers, dict) else None,
+            data=message.get('data'),
+        )
+        self.send({'id': id, 'retry_after': retry_after})
+
+    async def cancel(self, id: int) -> None:
+        task = self.tasks.pop(id, None)
+        if task is not None:
+            task.cancel()
+
+        ticket = self.tickets.pop(id, None)
+        if ticket is not None:
+            endpoint, keywords, bucket = ticket
+            await self.coordinator.ratelimiter.release(endpoint, keywords, bucket)
+
+    async def handle(self) -> None:
+        try:
+            while True:
+                line = await self.reader.readline()
+                if not line:
+                    break
+
+                try:
+                    message = load_json(line)
+                    assert isinstance(message, dict)
+
+                    op = message['op']
+                    id = message['id']
+                    assert isinstance(id, int)
+                except Exception:
+                    logger.debug('Coordinator received invalid message, closing connection')
+                    break
+
+                if op == 'acquire':
+                    method = message.get('method')
+                    path = message.get('path')
+                    keywords = message.get('keywords')
+
+                    if not isinstance(method, str) or not isinstance(path, str):
+                        break
+
+                    endpoint = self.coordinator.get_endpoint(method, path)
+                    keywords = keywords if isinstance(keywords, dict) else {}
+
+                    try:
+                        priority = RequestPriority(message.get('priority'))
+                    except ValueError:
+                        priority = RequestPriority.NORMAL
+
+                    self.tasks[id] = asyncio.create_task(
+                        self.acquire(id, endpoint, keywords, priority)
+                    )
+
+                elif op == 'release':
+                    await self.release(id, message)
+
+                elif op == 'cancel':
+                    await self.cancel(id)
+        finally:
+            await self.cleanup()
+
+    async def cleanup(self) -> None:
+        for task in self.tasks.values():
+            task.cancel()
+
+        for endpoint, keywords, bucket in self.tickets.values():
+            await self.coordinator.ratelimiter.release(endpoint, keywords, bucket)
+
+        self.tasks.clear()
+        self.tickets.clear()
+
+        self.writer.close()
+
+
+class RateLimitCoordinator:
+    """A unix socket server that shares one RateLimiter between several processes.
+
+    Every process using the same token should use a CoordinatedRateLimiter pointed
+    at the socket, the coordinator can be run on its own with
+    `python -m snekcord.rest.coordinator <path>`. Messages are newline delimited JSON
+    objects with an op (acquire, release or cancel) and an id that is echoed back."""
+
+    def __init__(self, path: str, *, ratelimiter: typing.Optional[RateLimiter] = None) -> None:
+        self.path = path
+        self.ratelimiter = ratelimiter if ratelimiter is not None else RateLimiter()
+
+        self.endpoints: typing.Dict[typing.Tuple[str, str], APIEndpoint] = {}
+        self.server: typing.Optional[asyncio.AbstractServer] = None
+
+    def get_endpoint(self, method: str, path: str) -> APIEndpoint:
+        key = (method, path)
+
+        endpoint = self.endpoints.get(key)
+        if endpoint is None:
+            endpoint = self.endpoints[key] = APIEndpoint(method, path)
+
+        return endpoint
+
+    async def on_connection(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        await CoordinatorConnection(self, reader, writer).handle()
+
+    async def start(self) -> None:
+        with contextlib.suppress(FileNotFoundError):
+            os.unlink(self.path)
+
+        self.server = await asyncio.start_unix_server(self.on_connection, self.path)
+        logger.info(f'Coordinator listening on {self.path}')
+
+    async def serve_forever(self) -> None:
+        if self.server is None:
+            await self.start()
+
+        assert self.server is not None
+        await self.server.serve_forever()
+
+    async def close(self) -> None:
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
+
+        with contextlib.suppress(FileNotFoundError):
+            os.unlink(self.path)
+
+
+class CoordinatedTicket:
+    __slots__ = ('id', 'bucket', 'key')
+
+    def __init__(
+        self,
+        id: int,
+        bucket: typing.Optional[RateLimitBucket] = None,
+        *,
+        key: typing.Optional[str] = None,
+    ) -> None:
+        self.id = id
+        self.bucket = bucket
+        self.key = key if bucket is None else bucket.key
+
+
+class CoordinatedRateLimiter(BaseRateLimiter):
+    """A rate limiter that reserves slots from a RateLimitCoordinator.
+
+    When the coordinator cannot be reached the limiter falls back to
+    a process-local RateLimiter so requests keep flowing."""
+
+    reader: typing.Optional[asyncio.StreamReader]
+    writer: typing.Optional[asyncio.StreamWriter]
+    futures: typing.Dict[int, asyncio.Future[JSONObject]]
+
+    def __init__(self, path: str, *, fallback: typing.Optional[RateLimiter] = None) -> None:
+        self.path = path
+        self.fallback = fallback if fallback is not None else RateLimiter()
+
+        self.reader = None
+        self.writer = None
+        self.reader_task: typing.Optional[asyncio.Task[None]] = None
+        self.connect_lock: typing.Optional[asyncio.Lock] = None
+        self.reconnect_at = 0.0
+
+        self.ids = itertools.count()
+        self.futures = {}
+
+    def is_connected(self) -> bool:
+        return self.writer is not None and not self.writer.is_closing()
+
+    async def connect(self) -> bool:
+        if self.connect_lock is None:
+            self.connect_lock = asyncio.Lock()
+
+        async with self.connect_lock:
+            if self.is_connected():
+                return True
+
+            if time.monotonic() < self.reconnect_at:
+                return False
+
+            try:
+                self.reader, self.writer = await asyncio.open_unix_connection(self.path)
+            except OSError as exc:
+                logger.warning(f'Failed to connect to coordinator at {self.path}: {exc}')
+
+                self.reconnect_at = time.monotonic() + RECONNECT_DELAY
+                return False
+
+            self.reader_task = asyncio.create_task(self.read_responses())
+            return True
+
+    async def read_responses(self) -> None:
+        assert self.reader is not None
+
+        try:
+            while True:
+                line = await self.reader.readline()
+                if not line:
+                    break
+
+                message = load_json(line)
+                if not isinstance(message, dict):
+                    continue
+
+                id = message.get('id')
+                if not isinstance(id, int):
+                    continue
+
+                future = self.futures.pop(id, None)
+                if future is not None and not future.done():
+                    future.set_result(message)
+        finally:
+            if self.writer is not None:
+                self.writer.close()
+
+            for future in self.futures.values():
+                if not future.done():
+                    future.set_exception(ConnectionResetError('Lost connection to coordinator'))
+
+            self.futures.clear()
+
+    async def request(self, message: JSONObject) -> JSONObject:
+        assert self.writer is not None
+
+        future = asyncio.get_running_loop().create_future()
+        self.futures[typing.cast(int, message['id'])] = future
+
+        self.writer.write(encode_message(message))
+        return await future
+
+    async def acquire(
+        self,
+        endpoint: APIEndpoint,
+        keywords: typing.Mapping[str, typing.Any],
+        *,
+        priority: RequestPriority = RequestPriority.NORMAL,
+    ) -> CoordinatedTicket:
+        id = next(self.ids)
+
+        if self.is_connected() or await self.connect():
+            message: JSONObject = {
+                'op': 'acquire',
+                'id': id,
+                'method': endpoint.method,
+                'path': endpoint.path,
+                'keywords': {key: str(value) for key, value in keywords.items()},
+                'priority': int(priority),
+            }
+
+            try:
+                response = await self.request(message)
+            except ConnectionError:
+                logger.warning('Lost connection to coordinator, using local rate limits')
+            except asyncio.CancelledError:
+                self.futures.pop(id, None)
+
+                if self.is_connected():
+                    assert self.writer is not None
+                    self.writer.write(encode_message({'op': 'cancel', 'id': id}))
+
+                raise
+            else:
+                key = response.get('bucket')
+                return CoordinatedTicket(id, key=key if isinstance(key, str) else None)
+
+        return CoordinatedTicket(
+            id, await self.fallback.acquire(endpoint, keywords, priority=priority)
+        )
+
+    async def release(
+        self,
+        endpoint: APIEndpoint,
+        keywords: typing.Mapping[str, typing.Any],
+        ticket: CoordinatedTicket,
+        *,
+        status: typing.Optional[int] = None,
+        headers: typing.Optional[typing.Mapping[str, str]] = None,
+        data: typing.Any = None,
+    ) -> typing.Optional[float]:
+        if ticket.bucket is not None:
+            return await self.fallback.release(
+                endpoint, keywords, ticket.bucket, status=status, headers=headers, data=data
+            )
+
+        if not self.is_connected():
+            return None
+
+        if headers is not None:
+            headers = {name: headers[name] for name in FORWARDED_HEADERS if name in headers}
+
+        if isinstance(data, dict):
+            data = {key: data[key] for key in ('retry_after', 'global') if key in data}
+        else:
+            data = None
+
+        message: JSONObject = {
+            'op': 'release',
+            'id': ticket.id,
+            'status': status,
+            'headers': headers,
+            'data': data,
+        }
+
+        try:
+            response = await self.request(message)
+        except ConnectionError:
+            return None
+
+        retry_after = response.get('retry_after')
+        return float(retry_after) if isinstance(retry_after, (int, float)) else None
+
+    def get_bucket_name(self, ticket: CoordinatedTicket) -> typing.Optional[str]:
+        return ticket.key
+
+    async def close(self) -> None:
+        if self.writer is not None:
+            self.writer.close()
+
+        if self.reader_task is not None:
+            with contextlib.suppress(asyncio.CancelledError):
+                await self.reader_task
+
+
+async def main(path: str) -> None:
+    coordinator = RateLimitCoordinator(path)
+
+    try:
+        await coordinator.serve_forever()
+    finally:
+        await coordinator.close()
+
+
+if __name__ == '__main__':
+    if len(sys.argv) != 2:
+        sys.exit(f'usage: {sys.executable} -m snekcord.rest.coordinator <path>')
+
+    with contextlib.suppress(KeyboardInterrupt):
+        asyncio.run(main(sys.argv[1]))
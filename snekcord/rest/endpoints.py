@@ -1,7 +1,10 @@
 from __future__ import annotations
 
 import enum
+import operator
+import os
 import string
+import sys
 import typing
 
 _formatter_parse = string.Formatter().parse
@@ -9,26 +12,74 @@ _formatter_parse = string.Formatter().parse
 MAJOR_PARAMS = {'channel_id', 'guild_id', 'webhook_id', 'webhook_token'}
 
 
+def compile_path(path: str) -> typing.Tuple[str, typing.Tuple[str, ...]]:
+    """Convert a path into a %-style template with a leading placeholder
+    for the base url and the names of the keywords in the order they appear."""
+    template = '%s'
+    fields: typing.List[str] = []
+
+    for literal, name, _, _ in _formatter_parse(path):
+        template += literal.replace('%', '%%')
+
+        if name is not None:
+            template += '%s'
+            fields.append(name)
+
+    return template, tuple(fields)
+
+
 class APIEndpoint:
-    __slots__ = ('method', 'path', 'keywords', 'major_params')
+    __slots__ = (
+        'method',
+        'path',
+        'keywords',
+        'major_params',
+        'route',
+        'template',
+        'fields',
+        'getter',
+        'major_fields',
+    )
 
     def __init__(self, method: str, path: str) -> None:
         self.method = method
         self.path = path
 
-        self.keywords: typing.Set[str] = set()
-        for _, name, _, _ in _formatter_parse(self.path):
-            if name is not None:
-                self.keywords.add(name)
+        self.template, self.fields = compile_path(self.path)
+        self.getter = operator.itemgetter(*self.fields) if self.fields else None
 
+        self.keywords: typing.Set[str] = set(self.fields)
         self.major_params = self.keywords & MAJOR_PARAMS
 
+        # The route and major parameters make up the rate limit bucket of a request
+        self.route = sys.intern(f'{self.method} {self.path}')
+        self.major_fields = tuple(sorted(self.major_params))
+
     def __repr__(self):
         return f'APIEndpoint(method={self.method!r}, path={self.path!r})'
 
     def url(self, base: str, **kwargs: typing.Any) -> str:
-        keywords = {keyword: kwargs.pop(keyword) for keyword in self.keywords}
-        return base + self.path.format_map(keywords)
+        return self.build_url(base, kwargs)
+
+    def build_url(self, base: str, keywords: typing.Mapping[str, typing.Any]) -> str:
+        if self.getter is None:
+            return self.template % base
+
+        if len(self.fields) == 1:
+            return self.template % (base, self.getter(keywords))
+
+        return self.template % (base, *self.getter(keywords))
+
+    def get_major_keywords(
+        self, keywords: typing.Mapping[str, typing.Any]
+    ) -> typing.Dict[str, typing.Any]:
+        return {param: keywords[param] for param in self.major_fields}
+
+    def get_major_key(self, keywords: typing.Mapping[str, typing.Any]) -> str:
+        if len(self.major_fields) == 1:
+            return str(keywords[self.major_fields[0]])
+
+        return ':'.join([str(keywords[param]) for param in self.major_fields])
 
 
 class CDNEndpoint:
@@ -51,7 +102,7 @@ class CDNEndpoint:
         if format not in self.formats:
             raise ValueError(f'Invalid format: {format!r}')
 
-        size = keywords.pop('size', None)
+        size = kwargs.pop('size', None)
         if size is not None:
             if not 16 <= size <= 4096:
                 raise ValueError(f'Size should be >= 16 and <= 4096, got {size!r}')
@@ -67,6 +118,27 @@ class CDNEndpoint:
         return url
 
 
+class CDNRequest:
+    """A CDN endpoint with the keyword arguments for its url, used for bulk requests.
+    If path is given the asset is written to the file instead of being streamed."""
+
+    __slots__ = ('endpoint', 'kwargs', 'path')
+
+    def __init__(
+        self,
+        endpoint: CDNEndpoint,
+        kwargs: typing.Optional[typing.Mapping[str, typing.Any]] = None,
+        *,
+        path: typing.Optional[typing.Union[str, os.PathLike[str]]] = None,
+    ) -> None:
+        self.endpoint = endpoint
+        self.kwargs = dict(kwargs) if kwargs is not None else {}
+        self.path = path
+
+    def __repr__(self) -> str:
+        return f'CDNRequest(endpoint={self.endpoint!r}, kwargs={self.kwargs!r}, path={self.path!r})'
+
+
 class CDNFormat(str, enum.Enum):
     JPEG = 'jpeg'
     PNG = 'png'
@@ -240,7 +312,7 @@ UPDATE_MY_USER = APIEndpoint(PATCH, '/users/@me')
 
 GET_MY_GUILDS = APIEndpoint(GET, '/users/@me/guilds')
 
-LEAVE_GUILD = APIEndpoint(DELETE, 'users/@me/guilds/{guild_id}')
+LEAVE_GUILD = APIEndpoint(DELETE, '/users/@me/guilds/{guild_id}')
 
 CREATE_DM = APIEndpoint(POST, '/users/@me/channels')
 
@@ -3,6 +3,9 @@ USER_AGENT = 'User-Agent'
 CONTENT_TYPE = 'Content-Type'
 APPLICATION_JSON = 'application/json'
 
+ETAG = 'ETag'
+IF_NONE_MATCH = 'If-None-Match'
+
 X_AUDIT_LOG_REASON = 'X-Audit-Log-Reason'
 
 X_RATELIMIT_LIMIT = 'X-RateLimit-Limit'
@@ -12,3 +15,5 @@ X_RATELIMIT_RESET_AFTER = 'X-RateLimit-Reset-After'
 X_RATELIMIT_BUCKET = 'X-RateLimit-Bucket'
 X_RATELIMIT_GLOBAL = 'X-RateLimit-Global'
 X_RATELIMIT_SCOPE = 'X-RateLimit-Scope'
+
+RETRY_AFTER = 'Retry-After'
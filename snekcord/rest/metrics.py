@@ -0,0 +1,214 @@
+from __future__ import annotations
+
+import bisect
+import collections
+import typing
+
+from loguru import logger
+
+if typing.TYPE_CHECKING:
+    from ..json import JSONObject
+
+__all__ = ('Histogram', 'RequestSample', 'RequestMetrics', 'RESTMetrics')
+
+LATENCY_BOUNDS = tuple(0.001 * 2**exponent for exponent in range(17))
+SIZE_BOUNDS = tuple(2**exponent for exponent in range(6, 25))
+
+# Every guild and channel gets its own rate limit buckets, so they are capped
+MAX_BUCKETS = 1024
+
+MetricsHookT = typing.Callable[['RequestSample'], None]
+
+
+class Histogram:
+    """A histogram with fixed upper bounds, observations larger than
+    the last bound are counted in an extra overflow bucket."""
+
+    def __init__(self, bounds: typing.Sequence[float]) -> None:
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def get_percentile(self, percentile: float) -> typing.Optional[float]:
+        """Estimate a percentile (0-1) as the upper bound of the bucket it falls in."""
+        if not self.count:
+            return None
+
+        target = percentile * self.count
+        total = 0
+
+        for index, count in enumerate(self.counts):
+            total += count
+
+            if total >= target and count:
+                return self.bounds[index] if index < len(self.bounds) else float('inf')
+
+        return float('inf')
+
+    def snapshot(self) -> JSONObject:
+        return {
+            'count': self.count,
+            'sum': self.sum,
+            'p50': self.get_percentile(0.5),
+            'p90': self.get_percentile(0.9),
+            'p99': self.get_percentile(0.99),
+            'buckets': {
+                str(bound): count for bound, count in zip(self.bounds, self.counts) if count
+            },
+            'overflow': self.counts[-1],
+        }
+
+
+class RequestSample:
+    """The measurements of a single HTTP request made by RESTSession."""
+
+    __slots__ = (
+        'route',
+        'bucket',
+        'status',
+        'queue_time',
+        'network_time',
+        'decode_time',
+        'size',
+    )
+
+    def __init__(
+        self,
+        route: str,
+        *,
+        bucket: typing.Optional[str] = None,
+        status: typing.Optional[int] = None,
+        queue_time: float = 0.0,
+        network_time: float = 0.0,
+        decode_time: float = 0.0,
+        size: typing.Optional[int] = None,
+    ) -> None:
+        self.route = route
+        self.bucket = bucket
+        self.status = status
+        self.queue_time = queue_time
+        self.network_time = network_time
+        self.decode_time = decode_time
+        self.size = size
+
+    def __repr__(self) -> str:
+        return (
+            f'RequestSample(route={self.route!r}, bucket={self.bucket!r}, '
+            f'status={self.status!r}, network_time={self.network_time:.3f})'
+        )
+
+
+class RequestMetrics:
+    """The aggregated measurements of every request to an endpoint or rate limit bucket."""
+
+    statuses: typing.Counter[int]
+
+    def __init__(self) -> None:
+        self.requests = 0
+        self.errors = 0
+        self.ratelimited = 0
+        self.statuses = collections.Counter()
+
+        self.queue_time = Histogram(LATENCY_BOUNDS)
+        self.network_time = Histogram(LATENCY_BOUNDS)
+        self.decode_time = Histogram(LATENCY_BOUNDS)
+        self.size = Histogram(SIZE_BOUNDS)
+
+    def record(self, sample: RequestSample) -> None:
+        self.requests += 1
+
+        if sample.status is None:
+            self.errors += 1
+        else:
+            self.statuses[sample.status] += 1
+
+            if sample.status == 429:
+                self.ratelimited += 1
+
+        self.queue_time.observe(sample.queue_time)
+        self.network_time.observe(sample.network_time)
+
+        if sample.decode_time:
+            self.decode_time.observe(sample.decode_time)
+
+        if sample.size is not None:
+            self.size.observe(sample.size)
+
+    def snapshot(self) -> JSONObject:
+        return {
+            'requests': self.requests,
+            'errors': self.errors,
+            'ratelimited': self.ratelimited,
+            'statuses': {str(status): count for status, count in self.statuses.items()},
+            'queue_time': self.queue_time.snapshot(),
+            'network_time': self.network_time.snapshot(),
+            'decode_time': self.decode_time.snapshot(),
+            'size': self.size.snapshot(),
+        }
+
+
+class RESTMetrics:
+    """Collects RequestSamples from a RESTSession per route and per rate limit bucket.
+
+    Pass an instance to RESTSession(metrics=...) to enable instrumentation,
+    without one the session skips all measurements. Only the max_buckets most
+    recently used buckets are kept, the rest are evicted."""
+
+    endpoints: typing.Dict[str, RequestMetrics]
+    buckets: collections.OrderedDict[str, RequestMetrics]
+    hooks: typing.List[MetricsHookT]
+
+    def __init__(self, *, max_buckets: int = MAX_BUCKETS) -> None:
+        self.max_buckets = max_buckets
+        self.endpoints = {}
+        self.buckets = collections.OrderedDict()
+        self.hooks = []
+
+    def add_hook(self, hook: MetricsHookT) -> None:
+        """Register a function to be called with every RequestSample as it is recorded."""
+        self.hooks.append(hook)
+
+    def remove_hook(self, hook: MetricsHookT) -> None:
+        self.hooks.remove(hook)
+
+    def record(self, sample: RequestSample) -> None:
+        metrics = self.endpoints.get(sample.route)
+        if metrics is None:
+            metrics = self.endpoints[sample.route] = RequestMetrics()
+
+        metrics.record(sample)
+
+        if sample.bucket is not None:
+            metrics = self.buckets.get(sample.bucket)
+            if metrics is None:
+                metrics = self.buckets[sample.bucket] = RequestMetrics()
+
+                while len(self.buckets) > self.max_buckets:
+                    self.buckets.popitem(last=False)
+            else:
+                self.buckets.move_to_end(sample.bucket)
+
+            metrics.record(sample)
+
+        for hook in self.hooks:
+            try:
+                hook(sample)
+            except Exception:
+                logger.exception(f'Metrics hook {hook!r} raised an exception')
+
+    def snapshot(self) -> JSONObject:
+        """Return the current measurements as a JSON serializable object."""
+        return {
+            'endpoints': {route: metrics.snapshot() for route, metrics in self.endpoints.items()},
+            'buckets': {key: metrics.snapshot() for key, metrics in self.buckets.items()},
+        }
+
+    def reset(self) -> None:
+        self.endpoints.clear()
+        self.buckets.clear()
@@ -0,0 +1,134 @@
+from __future__ import annotations
+
+import os
+import typing
+
+import aiohttp
+import aiohttp.payload
+
+from ..json import dump_json
+from ..streams import (
+    AsyncReadStream,
+    FSReadStream,
+    MappedFSReadStream,
+    MemoryViewReadStream,
+    SupportsStream,
+    create_stream,
+)
+from . import hdrs
+
+if typing.TYPE_CHECKING:
+    from ..json import JSONObject
+
+__all__ = ('MultipartFile', 'create_form')
+
+
+class MappedFilePayload(aiohttp.payload.Payload):
+    """A payload for a memory-mapped file with a known size, the file is streamed
+    from the map so the request can be sent with a Content-Length."""
+
+    def __init__(self, stream: MappedFSReadStream, size: int, **kwargs: typing.Any) -> None:
+        super().__init__(stream, **kwargs)
+        self.stream = stream
+        self._size = size
+
+    def decode(self, encoding: str = 'utf-8', errors: str = 'strict') -> str:
+        raise TypeError('file payloads cannot be decoded')
+
+    async def write(self, writer: typing.Any) -> None:
+        # The slices are views of the map, so the file is never copied into bytes
+        async for chunk in self.stream.aiter():
+            await writer.write(chunk)
+
+
+class MultipartFile:
+    """A file to be uploaded as part of a multipart/form-data request.
+
+    The stream is read in chunks while the request is being sent, so a file can
+    only be uploaded once."""
+
+    __slots__ = ('stream', 'filename', 'description')
+
+    def __init__(
+        self,
+        file: SupportsStream,
+        *,
+        filename: typing.Optional[str] = None,
+        description: typing.Optional[str] = None,
+    ) -> None:
+        self.stream = create_stream(file)
+        self.filename = filename
+        self.description = description
+
+    def __repr__(self) -> str:
+        return f'MultipartFile(stream={self.stream!r}, filename={self.filename!r})'
+
+    async def get_filename(self, index: int) -> str:
+        if self.filename is not None:
+            return self.filename
+
+        if isinstance(self.stream, FSReadStream) and isinstance(self.stream.path, str):
+            return os.path.basename(self.stream.path)
+
+        try:
+            extension = await self.stream.get_extension()
+        except ValueError:
+            extension = ''
+
+        return f'file{index}{extension}'
+
+
+async def create_form(
+    json: typing.Optional[JSONObject], files: typing.Sequence[MultipartFile]
+) -> aiohttp.MultipartWriter:
+    """Create a multipart/form-data body in the format Discord expects for uploads,
+    the JSON payload is sent as payload_json and each file as files[n]."""
+    writer = aiohttp.MultipartWriter('form-data')
+
+    payload_json: JSONObject = dict(json) if json is not None else {}
+
+    # Attachments already in the payload (kept when editing a message) are preserved
+    attachments = list(typing.cast('typing.List[JSONObject]', payload_json.get('attachments', ())))
+
+    parts: typing.List[typing.Tuple[str, AsyncReadStream, str]] = []
+
+    for index, file in enumerate(files):
+        filename = await file.get_filename(index)
+
+        attachment: JSONObject = {'id': index, 'filename': filename}
+        if file.description is not None:
+            attachment['description'] = file.description
+
+        attachments.append(attachment)
+        parts.append((filename, file.stream, await file.stream.get_content_type()))
+
+    payload_json['attachments'] = attachments
+
+    payload = writer.append(dump_json(payload_json), {hdrs.CONTENT_TYPE: hdrs.APPLICATION_JSON})
+    payload.set_content_disposition('form-data', name='payload_json')
+
+    for index, (filename, stream, content_type) in enumerate(parts):
+        size = None
+        if isinstance(stream, MappedFSReadStream) and await stream.get_map() is not None:
+            size = stream.get_size()
+
+        if size is not None:
+            payload = writer.append_payload(
+                MappedFilePayload(
+                    typing.cast(MappedFSReadStream, stream), size, content_type=content_type
+                )
+            )
+        elif isinstance(stream, MemoryViewReadStream):
+            # In-memory buffers have a known size and are written without being copied
+            payload = writer.append_payload(
+                aiohttp.payload.BytesPayload(await stream.aread_all(), content_type=content_type)
+            )
+        else:
+            # The payload pulls chunks from the stream as the transport drains
+            payload = writer.append_payload(
+                aiohttp.payload.AsyncIterablePayload(stream.aiter(), content_type=content_type)
+            )
+
+        payload.set_content_disposition('form-data', name=f'files[{index}]', filename=filename)
+
+    return writer
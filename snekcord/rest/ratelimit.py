@@ -0,0 +1,340 @@
+from __future__ import annotations
+
+import asyncio
+import heapq
+import itertools
+import time
+import typing
+
+from loguru import logger
+
+from . import hdrs
+from .scheduler import RequestPriority, RequestScheduler
+
+if typing.TYPE_CHECKING:
+    from .endpoints import APIEndpoint
+
+__all__ = ('BaseRateLimiter', 'RateLimitBucket', 'RateLimiter')
+
+GLOBAL_LIMIT = 50
+GLOBAL_PERIOD = 1.0
+
+PRUNE_THRESHOLD = 1024
+
+
+def get_route(endpoint: APIEndpoint) -> str:
+    return endpoint.route
+
+
+def get_major_params(endpoint: APIEndpoint, keywords: typing.Mapping[str, typing.Any]) -> str:
+    return endpoint.get_major_key(keywords)
+
+
+class RateLimitBucket:
+    """A queue of requests that share the same rate limit, ordered by priority
+    and then by the order they arrived in.
+
+    Until the first response arrives the limit is unknown, so only one request
+    is allowed through; the rest wait for the headers of that response."""
+
+    waiters: typing.List[typing.Tuple[RequestPriority, int, asyncio.Future[None]]]
+
+    def __init__(self, key: str) -> None:
+        self.key = key
+
+        self.limit: typing.Optional[int] = None
+        self.remaining = 1
+        self.reset_at = 0.0
+        self.unlimited = False
+
+        self.inflight = 0
+        self.waiters = []
+        self.sequence = itertools.count()
+        self.wakeup_handle: typing.Optional[asyncio.TimerHandle] = None
+
+    def __repr__(self) -> str:
+        return (
+            f'RateLimitBucket(key={self.key!r}, limit={self.limit!r}, '
+            f'remaining={self.remaining!r}, inflight={self.inflight!r})'
+        )
+
+    def is_idle(self, now: float) -> bool:
+        if self.waiters or self.inflight:
+            return False
+
+        return self.reset_at <= now or self.reset_at == float('inf')
+
+    def try_acquire(self, now: float) -> bool:
+        if not self.unlimited:
+            if self.reset_at <= now:
+                if self.limit is not None:
+                    self.remaining = self.limit
+                    self.reset_at = float('inf')
+                elif not self.inflight:
+                    self.remaining = max(self.remaining, 1)
+
+            if self.remaining <= 0:
+                return False
+
+            self.remaining -= 1
+
+        self.inflight += 1
+        return True
+
+    async def acquire(self, priority: RequestPriority = RequestPriority.NORMAL) -> None:
+        if not self.waiters and self.try_acquire(time.monotonic()):
+            return
+
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self.waiters, (priority, next(self.sequence), future))
+        self.schedule_wakeup()
+
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                self.release()
+            raise
+
+    def release(
+        self,
+        headers: typing.Optional[typing.Mapping[str, str]] = None,
+        *,
+        retry_after: typing.Optional[float] = None,
+    ) -> None:
+        """Give back a slot taken by acquire. Without headers the request is assumed
+        to have never reached Discord and the slot is returned to the bucket."""
+        self.inflight -= 1
+
+        if headers is not None:
+            self.update(headers)
+        elif not self.unlimited:
+            self.remaining += 1
+
+        if retry_after is not None:
+            self.unlimited = False
+            self.remaining = 0
+            self.reset_at = time.monotonic() + retry_after
+
+        self.wakeup()
+
+    def wakeup(self) -> None:
+        now = time.monotonic()
+
+        while self.waiters:
+            future = self.waiters[0][2]
+
+            if future.done():
+                heapq.heappop(self.waiters)
+            elif self.try_acquire(now):
+                heapq.heappop(self.waiters)
+                future.set_result(None)
+            else:
+                break
+
+        self.schedule_wakeup()
+
+    def schedule_wakeup(self) -> None:
+        if self.wakeup_handle is not None:
+            self.wakeup_handle.cancel()
+            self.wakeup_handle = None
+
+        # Until the window resets the waiters can only be woken by release(), this includes
+        # a new bucket whose waiters are queued behind the request that discovers the limit
+        delay = self.reset_at - time.monotonic()
+        if not self.waiters or delay <= 0 or self.reset_at == float('inf'):
+            return
+
+        self.wakeup_handle = asyncio.get_running_loop().call_later(delay, self.wakeup)
+
+    def update(self, headers: typing.Mapping[str, str]) -> None:
+        now = time.monotonic()
+
+        try:
+            limit = int(headers[hdrs.X_RATELIMIT_LIMIT])
+            remaining = int(headers[hdrs.X_RATELIMIT_REMAINING])
+            reset_after = float(headers[hdrs.X_RATELIMIT_RESET_AFTER])
+        except (KeyError, ValueError):
+            if self.limit is None:
+                self.unlimited = True
+        else:
+            reset_at = now + reset_after
+
+            if self.limit is not None and abs(reset_at - self.reset_at) < 0.5:
+                self.remaining = min(self.remaining, remaining)
+            else:
+                self.remaining = max(remaining - self.inflight, 0)
+
+            self.limit = limit
+            self.reset_at = reset_at
+            self.unlimited = False
+
+
+class BaseRateLimiter:
+    """The abstract base class for all rate limiters."""
+
+    async def acquire(
+        self,
+        endpoint: APIEndpoint,
+        keywords: typing.Mapping[str, typing.Any],
+        *,
+        priority: RequestPriority = RequestPriority.NORMAL,
+    ) -> typing.Any:
+        """Wait until a request to the endpoint may be sent and return a ticket for it.
+        Requests with a more urgent priority should be let through first."""
+        raise NotImplementedError
+
+    async def release(
+        self,
+        endpoint: APIEndpoint,
+        keywords: typing.Mapping[str, typing.Any],
+        ticket: typing.Any,
+        *,
+        status: typing.Optional[int] = None,
+        headers: typing.Optional[typing.Mapping[str, str]] = None,
+        data: typing.Any = None,
+    ) -> typing.Optional[float]:
+        """Release a ticket returned by acquire and update the limits from the response.
+
+        Returns
+        -------
+        typing.Optional[float]
+            The number of seconds the request was told to wait when it was rate limited
+            (status 429), the request should be acquired and sent again.
+        """
+        raise NotImplementedError
+
+    def get_bucket_name(self, ticket: typing.Any) -> typing.Optional[str]:
+        """Return the name of the bucket a ticket was acquired from, if it is known."""
+        return None
+
+    async def close(self) -> None:
+        """Release any resources held by the rate limiter."""
+
+
+class RateLimiter(BaseRateLimiter):
+    """Schedules requests according to the rate limits Discord reports.
+
+    Routes are mapped to buckets through the X-RateLimit-Bucket header, a bucket
+    is further split by the major parameters of the endpoint (channel_id, guild_id, ...).
+    Requests wait on their bucket and then on the global limit before being sent,
+    the global limit is shared between the major parameters by the scheduler."""
+
+    def __init__(
+        self, *, global_limit: int = GLOBAL_LIMIT, global_period: float = GLOBAL_PERIOD
+    ) -> None:
+        self.routes: typing.Dict[str, str] = {}
+        self.buckets: typing.Dict[str, RateLimitBucket] = {}
+
+        self.scheduler = RequestScheduler(limit=global_limit, period=global_period)
+
+    def get_bucket_key(
+        self, endpoint: APIEndpoint, keywords: typing.Mapping[str, typing.Any]
+    ) -> str:
+        route = get_route(endpoint)
+        return f'{self.routes.get(route, route)}:{get_major_params(endpoint, keywords)}'
+
+    def get_bucket(
+        self, endpoint: APIEndpoint, keywords: typing.Mapping[str, typing.Any]
+    ) -> RateLimitBucket:
+        key = self.get_bucket_key(endpoint, keywords)
+
+        bucket = self.buckets.get(key)
+        if bucket is None:
+            if len(self.buckets) >= PRUNE_THRESHOLD:
+                self.prune()
+
+            bucket = self.buckets[key] = RateLimitBucket(key)
+
+        return bucket
+
+    def get_bucket_name(self, ticket: RateLimitBucket) -> typing.Optional[str]:
+        return ticket.key
+
+    def prune(self) -> None:
+        now = time.monotonic()
+
+        for key, bucket in tuple(self.buckets.items()):
+            if bucket.is_idle(now):
+                del self.buckets[key]
+
+    async def acquire(
+        self,
+        endpoint: APIEndpoint,
+        keywords: typing.Mapping[str, typing.Any],
+        *,
+        priority: RequestPriority = RequestPriority.NORMAL,
+    ) -> RateLimitBucket:
+        bucket = self.get_bucket(endpoint, keywords)
+        await bucket.acquire(priority)
+
+        try:
+            await self.scheduler.acquire(priority, get_major_params(endpoint, keywords))
+        except BaseException:
+            bucket.release()
+            raise
+
+        return bucket
+
+    async def release(
+        self,
+        endpoint: APIEndpoint,
+        keywords: typing.Mapping[str, typing.Any],
+        bucket: RateLimitBucket,
+        *,
+        status: typing.Optional[int] = None,
+        headers: typing.Optional[typing.Mapping[str, str]] = None,
+        data: typing.Any = None,
+    ) -> typing.Optional[float]:
+        if headers is None:
+            bucket.release()
+            return None
+
+        bucket_hash = headers.get(hdrs.X_RATELIMIT_BUCKET)
+        if bucket_hash is not None:
+            route = get_route(endpoint)
+
+            if self.routes.get(route) != bucket_hash:
+                self.routes[route] = bucket_hash
+                self.buckets.setdefault(self.get_bucket_key(endpoint, keywords), bucket)
+
+        if status != 429:
+            bucket.release(headers)
+            return None
+
+        retry_after = self.get_retry_after(headers, data)
+
+        if headers.get(hdrs.X_RATELIMIT_GLOBAL) == 'true' or (
+            isinstance(data, dict) and data.get('global') is True
+        ):
+            logger.warning(f'Global rate limit hit, retrying in {retry_after:.3f}s')
+
+            self.scheduler.pause(retry_after)
+            bucket.release(headers)
+        else:
+            if headers.get(hdrs.X_RATELIMIT_SCOPE) == 'shared':
+                logger.debug(
+                    f'Shared rate limit hit on {bucket.key}, retrying in {retry_after:.3f}s'
+                )
+            else:
+                logger.warning(f'Rate limit hit on {bucket.key}, retrying in {retry_after:.3f}s')
+
+            bucket.release(headers, retry_after=retry_after)
+
+        return retry_after
+
+    def get_retry_after(self, headers: typing.Mapping[str, str], data: typing.Any) -> float:
+        if isinstance(data, dict):
+            retry_after = data.get('retry_after')
+            if isinstance(retry_after, (int, float)):
+                return float(retry_after)
+
+        try:
+            return float(headers[hdrs.RETRY_AFTER])
+        except (KeyError, ValueError):
+            pass
+
+        try:
+            return float(headers[hdrs.X_RATELIMIT_RESET_AFTER])
+        except (KeyError, ValueError):
+            return 1.0
@@ -0,0 +1,235 @@
+from __future__ import annotations
+
+import collections
+import time
+import typing
+
+from .endpoints import (
+    ADD_CHANNEL_PIN,
+    CREATE_GUILD_CHANNEL,
+    CREATE_GUILD_EMOJI,
+    CREATE_GUILD_ROLE,
+    DELETE_CHANNEL,
+    DELETE_CHANNEL_MESSAGE,
+    DELETE_CHANNEL_MESSAGES,
+    DELETE_GUILD,
+    DELETE_GUILD_EMOJI,
+    DELETE_GUILD_ROLE,
+    GET_CHANNEL,
+    GET_CHANNEL_PINS,
+    GET_GUILD,
+    GET_GUILD_CHANNELS,
+    GET_GUILD_EMOJIS,
+    GET_GUILD_ROLES,
+    REMOVE_CHANNEL_PIN,
+    UPDATE_CHANNEL,
+    UPDATE_CHANNEL_MESSAGE,
+    UPDATE_GUILD_CHANNEL_POSITIONS,
+    UPDATE_GUILD_EMOJI,
+    UPDATE_GUILD_ROLE,
+    UPDATE_GUILD_ROLE_POSITIONS,
+    APIEndpoint,
+)
+
+__all__ = ('CachedResponse', 'ResponseCache', 'MemoryResponseCache')
+
+DEFAULT_CACHE_POLICIES: typing.Dict[APIEndpoint, float] = {
+    GET_GUILD: 60.0,
+    GET_GUILD_ROLES: 60.0,
+    GET_GUILD_CHANNELS: 60.0,
+    GET_CHANNEL_PINS: 60.0,
+}
+
+# The endpoints whose cached responses are made stale by a gateway event,
+# paired with the keyword arguments for the endpoint and where to find them in the payload
+EVENT_INVALIDATIONS: typing.Dict[
+    str, typing.Tuple[typing.Tuple[APIEndpoint, typing.Dict[str, str]], ...]
+] = {
+    'GUILD_CREATE': (
+        (GET_GUILD, {'guild_id': 'id'}),
+        (GET_GUILD_ROLES, {'guild_id': 'id'}),
+        (GET_GUILD_CHANNELS, {'guild_id': 'id'}),
+    ),
+    'GUILD_UPDATE': (
+        (GET_GUILD, {'guild_id': 'id'}),
+        (GET_GUILD_ROLES, {'guild_id': 'id'}),
+    ),
+    'GUILD_DELETE': (
+        (GET_GUILD, {'guild_id': 'id'}),
+        (GET_GUILD_ROLES, {'guild_id': 'id'}),
+        (GET_GUILD_CHANNELS, {'guild_id': 'id'}),
+    ),
+    'GUILD_EMOJIS_UPDATE': (
+        (GET_GUILD, {'guild_id': 'guild_id'}),
+        (GET_GUILD_EMOJIS, {'guild_id': 'guild_id'}),
+    ),
+    'GUILD_ROLE_CREATE': (
+        (GET_GUILD, {'guild_id': 'guild_id'}),
+        (GET_GUILD_ROLES, {'guild_id': 'guild_id'}),
+    ),
+    'GUILD_ROLE_UPDATE': (
+        (GET_GUILD, {'guild_id': 'guild_id'}),
+        (GET_GUILD_ROLES, {'guild_id': 'guild_id'}),
+    ),
+    'GUILD_ROLE_DELETE': (
+        (GET_GUILD, {'guild_id': 'guild_id'}),
+        (GET_GUILD_ROLES, {'guild_id': 'guild_id'}),
+    ),
+    'CHANNEL_CREATE': (
+        (GET_CHANNEL, {'channel_id': 'id'}),
+        (GET_GUILD_CHANNELS, {'guild_id': 'guild_id'}),
+    ),
+    'CHANNEL_UPDATE': (
+        (GET_CHANNEL, {'channel_id': 'id'}),
+        (GET_GUILD_CHANNELS, {'guild_id': 'guild_id'}),
+    ),
+    'CHANNEL_DELETE': (
+        (GET_CHANNEL, {'channel_id': 'id'}),
+        (GET_GUILD_CHANNELS, {'guild_id': 'guild_id'}),
+        (GET_CHANNEL_PINS, {'channel_id': 'id'}),
+    ),
+    'CHANNEL_PINS_UPDATE': ((GET_CHANNEL_PINS, {'channel_id': 'channel_id'}),),
+    'MESSAGE_UPDATE': ((GET_CHANNEL_PINS, {'channel_id': 'channel_id'}),),
+    'MESSAGE_DELETE': ((GET_CHANNEL_PINS, {'channel_id': 'channel_id'}),),
+    'MESSAGE_DELETE_BULK': ((GET_CHANNEL_PINS, {'channel_id': 'channel_id'}),),
+}
+
+# The endpoints whose cached responses are made stale by a successful request to another
+# endpoint, paired with the keyword arguments for the endpoint and where to find them in the
+# request's keyword arguments or, failing that, in the response
+REQUEST_INVALIDATIONS: typing.Dict[
+    APIEndpoint, typing.Tuple[typing.Tuple[APIEndpoint, typing.Dict[str, str]], ...]
+] = {
+    DELETE_GUILD: (
+        (GET_GUILD_ROLES, {'guild_id': 'guild_id'}),
+        (GET_GUILD_CHANNELS, {'guild_id': 'guild_id'}),
+    ),
+    CREATE_GUILD_EMOJI: (
+        (GET_GUILD, {'guild_id': 'guild_id'}),
+        (GET_GUILD_EMOJIS, {'guild_id': 'guild_id'}),
+    ),
+    UPDATE_GUILD_EMOJI: (
+        (GET_GUILD, {'guild_id': 'guild_id'}),
+        (GET_GUILD_EMOJIS, {'guild_id': 'guild_id'}),
+    ),
+    DELETE_GUILD_EMOJI: (
+        (GET_GUILD, {'guild_id': 'guild_id'}),
+        (GET_GUILD_EMOJIS, {'guild_id': 'guild_id'}),
+    ),
+    CREATE_GUILD_ROLE: (
+        (GET_GUILD, {'guild_id': 'guild_id'}),
+        (GET_GUILD_ROLES, {'guild_id': 'guild_id'}),
+    ),
+    UPDATE_GUILD_ROLE_POSITIONS: (
+        (GET_GUILD, {'guild_id': 'guild_id'}),
+        (GET_GUILD_ROLES, {'guild_id': 'guild_id'}),
+    ),
+    UPDATE_GUILD_ROLE: (
+        (GET_GUILD, {'guild_id': 'guild_id'}),
+        (GET_GUILD_ROLES, {'guild_id': 'guild_id'}),
+    ),
+    DELETE_GUILD_ROLE: (
+        (GET_GUILD, {'guild_id': 'guild_id'}),
+        (GET_GUILD_ROLES, {'guild_id': 'guild_id'}),
+    ),
+    CREATE_GUILD_CHANNEL: ((GET_GUILD_CHANNELS, {'guild_id': 'guild_id'}),),
+    UPDATE_GUILD_CHANNEL_POSITIONS: ((GET_GUILD_CHANNELS, {'guild_id': 'guild_id'}),),
+    UPDATE_CHANNEL: ((GET_GUILD_CHANNELS, {'guild_id': 'guild_id'}),),
+    DELETE_CHANNEL: (
+        (GET_GUILD_CHANNELS, {'guild_id': 'guild_id'}),
+        (GET_CHANNEL_PINS, {'channel_id': 'channel_id'}),
+    ),
+    ADD_CHANNEL_PIN: ((GET_CHANNEL_PINS, {'channel_id': 'channel_id'}),),
+    REMOVE_CHANNEL_PIN: ((GET_CHANNEL_PINS, {'channel_id': 'channel_id'}),),
+    UPDATE_CHANNEL_MESSAGE: ((GET_CHANNEL_PINS, {'channel_id': 'channel_id'}),),
+    DELETE_CHANNEL_MESSAGE: ((GET_CHANNEL_PINS, {'channel_id': 'channel_id'}),),
+    DELETE_CHANNEL_MESSAGES: ((GET_CHANNEL_PINS, {'channel_id': 'channel_id'}),),
+}
+
+
+class CachedResponse:
+    """The body of a successful GET request along with what is needed to revalidate it."""
+
+    __slots__ = ('body', 'content_type', 'etag', 'expires_at')
+
+    def __init__(
+        self, body: bytes, *, content_type: str, etag: typing.Optional[str], expires_at: float
+    ) -> None:
+        self.body = body
+        self.content_type = content_type
+        self.etag = etag
+        self.expires_at = expires_at
+
+    def __repr__(self) -> str:
+        return (
+            f'CachedResponse(content_type={self.content_type!r}, etag={self.etag!r}, '
+            f'size={len(self.body)})'
+        )
+
+    def is_fresh(self) -> bool:
+        return self.expires_at > time.monotonic()
+
+
+class ResponseCache:
+    """The abstract base class for all response caches."""
+
+    async def get(self, url: str) -> typing.Optional[CachedResponse]:
+        """Retrieves the response cached for url, stale responses are returned as well."""
+        raise NotImplementedError
+
+    async def set(self, url: str, response: CachedResponse) -> None:
+        """Caches the response for url."""
+        raise NotImplementedError
+
+    async def drop(self, url: str) -> None:
+        """Removes the response cached for url."""
+        raise NotImplementedError
+
+    async def clear(self) -> None:
+        """Removes every cached response."""
+        raise NotImplementedError
+
+
+class MemoryResponseCache(ResponseCache):
+    """An in-memory response cache that evicts the least recently used
+    responses once the combined size of their bodies exceeds max_size."""
+
+    responses: collections.OrderedDict[str, CachedResponse]
+
+    def __init__(self, *, max_size: int = 2**24) -> None:
+        self.max_size = max_size
+        self.size = 0
+        self.responses = collections.OrderedDict()
+
+    async def get(self, url: str) -> typing.Optional[CachedResponse]:
+        response = self.responses.get(url)
+
+        if response is not None:
+            self.responses.move_to_end(url)
+
+        return response
+
+    async def set(self, url: str, response: CachedResponse) -> None:
+        if len(response.body) > self.max_size:
+            return await self.drop(url)
+
+        previous = self.responses.pop(url, None)
+        if previous is not None:
+            self.size -= len(previous.body)
+
+        self.responses[url] = response
+        self.size += len(response.body)
+
+        while self.size > self.max_size:
+            _, evicted = self.responses.popitem(last=False)
+            self.size -= len(evicted.body)
+
+    async def drop(self, url: str) -> None:
+        response = self.responses.pop(url, None)
+
+        if response is not None:
+            self.size -= len(response.body)
+
+    async def clear(self) -> None:
+        self.responses.clear()
+        self.size = 0
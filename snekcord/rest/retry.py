@@ -0,0 +1,91 @@
+from __future__ import annotations
+
+import collections
+import random
+import typing
+
+import attr
+
+from . import hdrs
+
+__all__ = ('RetryPolicy', 'LatencyTracker')
+
+IDEMPOTENT_METHODS = frozenset({'GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE'})
+RETRY_STATUSES = frozenset({500, 502, 503, 504})
+
+
+@attr.s(kw_only=True)
+class RetryPolicy:
+    """Settings for how RESTSession retries failed requests and hedges slow ones."""
+
+    max_retries: int = attr.ib(default=3)
+    """The maximum number of times a request is retried, 0 disables retries."""
+
+    backoff_base: float = attr.ib(default=0.5)
+    """The upper bound of the first backoff in seconds, doubled for every retry."""
+
+    backoff_max: float = attr.ib(default=30.0)
+    """The largest upper bound a backoff can have in seconds."""
+
+    methods: typing.FrozenSet[str] = attr.ib(default=IDEMPOTENT_METHODS)
+    """The methods that are safe to retry."""
+
+    statuses: typing.FrozenSet[int] = attr.ib(default=RETRY_STATUSES)
+    """The response statuses that cause a retry."""
+
+    deadline: typing.Optional[float] = attr.ib(default=None)
+    """The number of seconds a request may take including retries, None means no deadline."""
+
+    hedge_percentile: typing.Optional[float] = attr.ib(default=None)
+    """The latency percentile (0-1) after which a second copy of a GET request is sent,
+    None disables hedging. The copy counts against the rate limits like any other request."""
+
+    hedge_min_samples: int = attr.ib(default=20)
+    """The number of latencies a route needs before its requests are hedged."""
+
+    hedge_min_delay: float = attr.ib(default=0.05)
+    """The smallest number of seconds to wait before hedging a request."""
+
+    def should_retry(self, method: str, attempt: int) -> bool:
+        return method in self.methods and attempt < self.max_retries
+
+    def get_backoff(
+        self, attempt: int, headers: typing.Optional[typing.Mapping[str, str]] = None
+    ) -> float:
+        # Full jitter spreads out the retries of clients that failed at the same time
+        backoff = random.uniform(0, min(self.backoff_max, self.backoff_base * 2**attempt))
+
+        if headers is not None:
+            try:
+                return max(backoff, float(headers[hdrs.RETRY_AFTER]))
+            except (KeyError, ValueError):
+                pass
+
+        return backoff
+
+
+class LatencyTracker:
+    """Keeps the most recent latencies of each route to find hedging thresholds."""
+
+    samples: typing.Dict[str, collections.deque[float]]
+
+    def __init__(self, *, max_samples: int = 256) -> None:
+        self.max_samples = max_samples
+        self.samples = {}
+
+    def record(self, route: str, latency: float) -> None:
+        samples = self.samples.get(route)
+        if samples is None:
+            samples = self.samples[route] = collections.deque(maxlen=self.max_samples)
+
+        samples.append(latency)
+
+    def get_percentile(
+        self, route: str, percentile: float, *, min_samples: int = 1
+    ) -> typing.Optional[float]:
+        samples = self.samples.get(route)
+        if samples is None or len(samples) < max(min_samples, 1):
+            return None
+
+        ordered = sorted(samples)
+        return ordered[min(int(percentile * len(ordered)), len(ordered) - 1)]
@@ -0,0 +1,205 @@
+from __future__ import annotations
+
+import asyncio
+import enum
+import heapq
+import itertools
+import time
+import typing
+
+from .endpoints import (
+    ADD_GUILD_BAN,
+    BEGIN_GUILD_PRUNE,
+    DELETE_CHANNEL_MESSAGE,
+    DELETE_CHANNEL_MESSAGES,
+    GET_GUILD_AUDIT_LOG,
+    GET_GUILD_INTEGRATIONS,
+    GET_GUILD_INVITES,
+    GET_GUILD_PRUNE_COUNT,
+    GET_GUILD_VOICE_REGIONS,
+    GET_GUILD_WIDGET,
+    GET_VOICE_REGIONS,
+    REMOVE_GUILD_BAN,
+    REMOVE_GUILD_MEMBER,
+    TRIGGER_CHANNEL_TYPING,
+    UPDATE_GUILD_MEMBER,
+    APIEndpoint,
+)
+
+__all__ = ('RequestPriority', 'RequestScheduler')
+
+
+class RequestPriority(enum.IntEnum):
+    """The priority class of a request, requests in a lower class are
+    always sent before requests in a higher class that are waiting."""
+
+    URGENT = 0
+    HIGH = 1
+    NORMAL = 2
+    LOW = 3
+
+
+# The priority of requests to these endpoints when the caller does not give one
+DEFAULT_PRIORITIES: typing.Dict[APIEndpoint, RequestPriority] = {
+    ADD_GUILD_BAN: RequestPriority.URGENT,
+    REMOVE_GUILD_BAN: RequestPriority.URGENT,
+    REMOVE_GUILD_MEMBER: RequestPriority.URGENT,
+    UPDATE_GUILD_MEMBER: RequestPriority.URGENT,
+    DELETE_CHANNEL_MESSAGE: RequestPriority.URGENT,
+    DELETE_CHANNEL_MESSAGES: RequestPriority.URGENT,
+    BEGIN_GUILD_PRUNE: RequestPriority.URGENT,
+    TRIGGER_CHANNEL_TYPING: RequestPriority.LOW,
+    GET_GUILD_AUDIT_LOG: RequestPriority.LOW,
+    GET_GUILD_INTEGRATIONS: RequestPriority.LOW,
+    GET_GUILD_INVITES: RequestPriority.LOW,
+    GET_GUILD_PRUNE_COUNT: RequestPriority.LOW,
+    GET_GUILD_VOICE_REGIONS: RequestPriority.LOW,
+    GET_GUILD_WIDGET: RequestPriority.LOW,
+    GET_VOICE_REGIONS: RequestPriority.LOW,
+}
+
+
+class FairQueue:
+    """Waiters of one priority class, served in weighted fair order across flows.
+
+    Each waiter is stamped with a virtual finish time, the finish time of the
+    previous waiter in its flow (or the current virtual time if the flow is idle)
+    plus 1 / weight. Waiters are served in order of finish time and the virtual time
+    advances to the finish time of the waiter that was served (self-clocked fair queuing),
+    so a flow with a thousand waiters cannot hold back a flow with one."""
+
+    waiters: typing.List[typing.Tuple[float, int, asyncio.Future[None]]]
+
+    def __init__(self) -> None:
+        self.waiters = []
+        self.finish_times: typing.Dict[typing.Hashable, float] = {}
+        self.virtual_time = 0.0
+
+    def __len__(self) -> int:
+        return len(self.waiters)
+
+    def push(
+        self, flow: typing.Hashable, weight: float, sequence: int, future: asyncio.Future[None]
+    ) -> None:
+        finish_time = max(self.virtual_time, self.finish_times.get(flow, 0.0)) + 1 / weight
+        self.finish_times[flow] = finish_time
+
+        heapq.heappush(self.waiters, (finish_time, sequence, future))
+
+    def prune(self) -> None:
+        while self.waiters and self.waiters[0][2].done():
+            heapq.heappop(self.waiters)
+
+        if not self.waiters:
+            # Every flow is idle, none of them has used more than its share
+            self.finish_times.clear()
+            self.virtual_time = 0.0
+
+    def pop(self) -> asyncio.Future[None]:
+        finish_time, _, future = heapq.heappop(self.waiters)
+        self.virtual_time = finish_time
+
+        self.prune()
+        return future
+
+
+class RequestScheduler:
+    """Lets up to `limit` requests through every `period` seconds.
+
+    When requests have to wait the ones with the most urgent priority go first,
+    requests with the same priority are shared fairly between flows (the guild,
+    channel or webhook a request is for) in proportion to the weight of the flow."""
+
+    weights: typing.Dict[typing.Hashable, float]
+
+    def __init__(self, *, limit: int, period: float) -> None:
+        self.limit = limit
+        self.period = period
+
+        self.count = 0
+        self.window_reset_at = 0.0
+        self.paused_until = 0.0
+
+        self.queues = {priority: FairQueue() for priority in RequestPriority}
+        self.weights = {}
+        self.sequence = itertools.count()
+
+        self.wakeup_handle: typing.Optional[asyncio.TimerHandle] = None
+
+    def set_weight(self, flow: typing.Hashable, weight: float) -> None:
+        """Sets the share of a flow relative to other flows, the default weight is 1."""
+        if weight <= 0:
+            raise ValueError('weight should be > 0')
+
+        if weight == 1:
+            self.weights.pop(flow, None)
+        else:
+            self.weights[flow] = weight
+
+    def pause(self, delay: float) -> None:
+        """Stops letting requests through for delay seconds, after a global rate limit."""
+        self.paused_until = max(self.paused_until, time.monotonic() + delay)
+
+    def has_waiters(self) -> bool:
+        return any(self.queues.values())
+
+    def try_acquire(self, now: float) -> bool:
+        if now < self.paused_until:
+            return False
+
+        if now >= self.window_reset_at:
+            self.window_reset_at = now + self.period
+            self.count = 0
+
+        if self.count >= self.limit:
+            return False
+
+        self.count += 1
+        return True
+
+    def release(self) -> None:
+        """Gives back a slot taken by a request that was never sent."""
+        self.count = max(self.count - 1, 0)
+        self.wakeup()
+
+    async def acquire(
+        self, priority: RequestPriority = RequestPriority.NORMAL, flow: typing.Hashable = None
+    ) -> None:
+        if not self.has_waiters() and self.try_acquire(time.monotonic()):
+            return
+
+        future = asyncio.get_running_loop().create_future()
+        self.queues[priority].push(flow, self.weights.get(flow, 1.0), next(self.sequence), future)
+        self.schedule_wakeup()
+
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                self.release()
+            else:
+                self.queues[priority].prune()
+            raise
+
+    def wakeup(self) -> None:
+        now = time.monotonic()
+
+        for queue in self.queues.values():
+            while queue:
+                if not self.try_acquire(now):
+                    return self.schedule_wakeup()
+
+                queue.pop().set_result(None)
+
+        self.schedule_wakeup()
+
+    def schedule_wakeup(self) -> None:
+        if self.wakeup_handle is not None:
+            self.wakeup_handle.cancel()
+            self.wakeup_handle = None
+
+        if not self.has_waiters():
+            return
+
+        delay = max(self.window_reset_at, self.paused_until) - time.monotonic()
+        self.wakeup_handle = asyncio.get_running_loop().call_later(max(delay, 0), self.wakeup)
@@ -1,23 +1,46 @@
 from __future__ import annotations
 
+import asyncio
+import collections
+import time
 import typing
+import urllib.parse
 
 import aiohttp
+import aiohttp.payload
+from loguru import logger
 from multidict import CIMultiDict
 
 from ..exceptions import RESTError
-from ..json import dump_json, load_json
-from ..streams import ResponseReadStream
+from ..json import get_json_backend
+from ..streams import AsyncReadStream, FSReadStream, ResponseReadStream
 from . import hdrs
-from .endpoints import APIEndpoint, CDNEndpoint
+from .cdn_cache import CDNCache
+from .connector import RESTConnector, RESTConnectorOptions
+from .endpoints import APIEndpoint, CDNEndpoint, CDNRequest
+from .metrics import RequestSample, RESTMetrics
+from .multipart import MultipartFile, create_form
+from .ratelimit import BaseRateLimiter, RateLimiter, get_route
+from .response_cache import (
+    DEFAULT_CACHE_POLICIES,
+    EVENT_INVALIDATIONS,
+    REQUEST_INVALIDATIONS,
+    CachedResponse,
+    MemoryResponseCache,
+    ResponseCache,
+)
+from .retry import LatencyTracker, RetryPolicy
+from .scheduler import DEFAULT_PRIORITIES, RequestPriority
 
 if typing.TYPE_CHECKING:
     from ..auth import Authorization
-    from ..json import JSONType
+    from ..json import JSONBackend, JSONObject, JSONType
 
 BASE_API_URL = 'https://discord.com/api/v9'
 BASE_CDN_URL = 'https://cdn.discordapp.com'
 
+MAX_RATELIMIT_RETRIES = 5
+
 
 class RESTSession:
     headers: CIMultiDict[str]
@@ -29,6 +52,16 @@ class RESTSession:
         api: typing.Optional[str] = None,
         cdn: typing.Optional[str] = None,
         headers: typing.Optional[typing.Mapping[str, str]] = None,
+        ratelimiter: typing.Optional[BaseRateLimiter] = None,
+        connector_options: typing.Optional[RESTConnectorOptions] = None,
+        coalesce_requests: bool = True,
+        response_cache: typing.Optional[ResponseCache] = None,
+        cache_policies: typing.Optional[typing.Mapping[APIEndpoint, float]] = None,
+        priorities: typing.Optional[typing.Mapping[APIEndpoint, RequestPriority]] = None,
+        retry_policy: typing.Optional[RetryPolicy] = None,
+        metrics: typing.Optional[RESTMetrics] = None,
+        cdn_cache: typing.Optional[CDNCache] = None,
+        json_backend: typing.Optional[JSONBackend] = None,
     ) -> None:
         self.authorization = authorization
 
@@ -42,53 +75,754 @@ class RESTSession:
 
         self.headers[hdrs.AUTHORIZATION] = self.authorization.to_token()
 
+        if connector_options is not None:
+            self.connector_options = connector_options
+        else:
+            self.connector_options = RESTConnectorOptions()
+
+        self.coalesce_requests = coalesce_requests
+        self.inflight: typing.Dict[typing.Hashable, asyncio.Future[typing.Any]] = {}
+
+        if cache_policies is not None:
+            self.cache_policies = dict(cache_policies)
+        else:
+            self.cache_policies = dict(DEFAULT_CACHE_POLICIES)
+
+        if priorities is not None:
+            self.priorities = dict(priorities)
+        else:
+            self.priorities = dict(DEFAULT_PRIORITIES)
+
+        if response_cache is not None:
+            self.response_cache = response_cache
+        else:
+            self.response_cache = self.create_response_cache()
+
+        self.retry_policy = retry_policy if retry_policy is not None else RetryPolicy()
+        self.latencies = LatencyTracker()
+        self.metrics = metrics
+
+        if json_backend is not None:
+            self.json_backend = json_backend
+        else:
+            self.json_backend = get_json_backend()
+
+        self.cdn_cache = cdn_cache
+        self.cdn_inflight: typing.Dict[str, asyncio.Future[None]] = {}
+
         self.session: typing.Optional[aiohttp.ClientSession] = None
+        if ratelimiter is not None:
+            self.ratelimiter = ratelimiter
+        else:
+            self.ratelimiter = self.create_ratelimiter()
+
+    def create_connector(self) -> aiohttp.BaseConnector:
+        return RESTConnector(self.connector_options)
 
     def create_session(self) -> aiohttp.ClientSession:
-        return aiohttp.ClientSession(json_serialize=dump_json)
+        return aiohttp.ClientSession(
+            connector=self.create_connector(), json_serialize=self.json_backend.dumps
+        )
+
+    def create_ratelimiter(self) -> BaseRateLimiter:
+        return RateLimiter()
+
+    def create_response_cache(self) -> ResponseCache:
+        return MemoryResponseCache()
+
+    def load_cached(self, cached: CachedResponse) -> typing.Union[bytes, JSONType]:
+        # The body is decoded on every hit so callers never share mutable objects
+        if cached.content_type == hdrs.APPLICATION_JSON:
+            return self.json_backend.loads(cached.body)
+
+        return cached.body
+
+    def get_coalesce_key(
+        self, url: str, params: typing.Optional[typing.Mapping[str, typing.Any]]
+    ) -> typing.Optional[typing.Hashable]:
+        if params is None:
+            return url
+
+        key = (url, frozenset(params.items()))
+
+        try:
+            hash(key)
+        except TypeError:
+            return None
+
+        return key
 
     async def request_api(
         self, endpoint: APIEndpoint, **kwargs: typing.Any
     ) -> typing.Union[bytes, JSONType]:
-        if self.session is None:
-            self.session = self.create_session()
-
         try:
             headers = kwargs.pop('headers')
         except KeyError:
-            headers = self.headers
-        else:
-            headers.update(self.headers)
+            headers = None
 
         params = kwargs.pop('params', None)
         json = kwargs.pop('json', None)
+        files = kwargs.pop('files', None)
 
-        url = endpoint.url(self.api, **kwargs)
-        response = await self.session.request(
-            endpoint.method, url, params=params, headers=headers, json=json
-        )
+        deadline = kwargs.pop('deadline', self.retry_policy.deadline)
+        deadline_at = time.monotonic() + deadline if deadline is not None else None
+
+        priority = kwargs.pop('priority', None)
+        if priority is None:
+            priority = self.priorities.get(endpoint, RequestPriority.NORMAL)
+
+        keywords = endpoint.get_major_keywords(kwargs)
+        url = endpoint.build_url(self.api, kwargs)
+
+        ttl = None
+        if endpoint.method == 'GET' and headers is None and params is None:
+            ttl = self.cache_policies.get(endpoint)
+
+        if ttl is not None:
+            cached = await self.response_cache.get(url)
+            if cached is not None and cached.is_fresh():
+                return self.load_cached(cached)
+
+        key = None
+        if self.coalesce_requests and endpoint.method == 'GET' and headers is None and not files:
+            key = self.get_coalesce_key(url, params)
+
+        if key is None:
+            data = await self.send_request(
+                endpoint,
+                url,
+                keywords,
+                params,
+                headers,
+                json,
+                ttl,
+                deadline_at,
+                files,
+                priority=priority,
+            )
+
+            if endpoint.method != 'GET':
+                await self.invalidate_request(endpoint, kwargs, data)
+
+            return data
+
+        # Identical GET requests that are in flight at the same time share one request,
+        # the shield keeps a cancelled caller from cancelling it for everyone else
+        future = self.inflight.get(key)
+        if future is None:
+            future = asyncio.ensure_future(
+                self.send_request(
+                    endpoint,
+                    url,
+                    keywords,
+                    params,
+                    headers,
+                    json,
+                    ttl,
+                    deadline_at,
+                    priority=priority,
+                )
+            )
+            future.add_done_callback(
+                lambda future: self.inflight.pop(key) if self.inflight.get(key) is future else None
+            )
+
+            self.inflight[key] = future
+
+        return await asyncio.shield(future)
+
+    async def send_request(
+        self,
+        endpoint: APIEndpoint,
+        url: str,
+        keywords: typing.Mapping[str, typing.Any],
+        params: typing.Optional[typing.Mapping[str, typing.Any]],
+        headers: typing.Optional[typing.Mapping[str, str]],
+        json: typing.Optional[JSONType],
+        ttl: typing.Optional[float] = None,
+        deadline_at: typing.Optional[float] = None,
+        files: typing.Optional[typing.Sequence[MultipartFile]] = None,
+        *,
+        priority: RequestPriority = RequestPriority.NORMAL,
+    ) -> typing.Union[bytes, JSONType]:
+        if self.session is None:
+            self.session = self.create_session()
+
+        if headers is None:
+            request_headers = self.headers
+        else:
+            # The caller's headers are left untouched, the session's headers take precedence
+            request_headers = CIMultiDict(headers)
+            request_headers.update(self.headers)
 
-        data = await response.read()
-        if response.headers.get(hdrs.CONTENT_TYPE) == hdrs.APPLICATION_JSON:
-            data = load_json(data)
+        cached = None
+        if ttl is not None:
+            cached = await self.response_cache.get(url)
+
+            if cached is not None and cached.etag is not None:
+                request_headers = CIMultiDict(request_headers)
+                request_headers[hdrs.IF_NONE_MATCH] = cached.etag
+
+        response, body, data = await self.retry_request(
+            endpoint,
+            url,
+            keywords,
+            params,
+            request_headers,
+            json,
+            files,
+            deadline_at,
+            priority=priority,
+        )
 
         if not response.ok:
             raise RESTError(self, endpoint.method, url, response, data)
 
+        if ttl is not None:
+            if response.status == 304 and cached is not None:
+                cached.expires_at = time.monotonic() + ttl
+                await self.response_cache.set(url, cached)
+
+                return self.load_cached(cached)
+
+            if response.status == 200:
+                cached = CachedResponse(
+                    body,
+                    content_type=response.headers.get(hdrs.CONTENT_TYPE, ''),
+                    etag=response.headers.get(hdrs.ETAG),
+                    expires_at=time.monotonic() + ttl,
+                )
+                await self.response_cache.set(url, cached)
+
+        elif endpoint.method != 'GET':
+            # A successful modification makes any cached response for the same resource stale
+            await self.response_cache.drop(url)
+
         return data
 
-    async def request_cdn(self, endpoint: CDNEndpoint, **kwargs: typing.Any) -> ResponseReadStream:
+    async def retry_request(
+        self,
+        endpoint: APIEndpoint,
+        url: str,
+        keywords: typing.Mapping[str, typing.Any],
+        params: typing.Optional[typing.Mapping[str, typing.Any]],
+        headers: CIMultiDict[str],
+        json: typing.Optional[JSONType],
+        files: typing.Optional[typing.Sequence[MultipartFile]],
+        deadline_at: typing.Optional[float],
+        *,
+        priority: RequestPriority = RequestPriority.NORMAL,
+    ) -> typing.Tuple[aiohttp.ClientResponse, bytes, typing.Union[bytes, JSONType]]:
+        policy = self.retry_policy
+
+        # Files are streamed from their source while being sent so they cannot be sent again
+        retryable = not files
+
+        attempt = 0
+        while True:
+            timeout = None
+            if deadline_at is not None:
+                timeout = deadline_at - time.monotonic()
+                if timeout <= 0:
+                    raise asyncio.TimeoutError
+
+            try:
+                response, body, data = await asyncio.wait_for(
+                    self.hedge_request(
+                        endpoint, url, keywords, params, headers, json, files, priority=priority
+                    ),
+                    timeout,
+                )
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as exc:
+                if deadline_at is not None and time.monotonic() >= deadline_at:
+                    raise
+
+                if not retryable or not policy.should_retry(endpoint.method, attempt):
+                    raise
+
+                backoff = policy.get_backoff(attempt)
+                if deadline_at is not None and time.monotonic() + backoff >= deadline_at:
+                    raise
+
+                logger.debug(
+                    f'{endpoint.method} {url} failed with {exc!r}, retrying in {backoff:.3f}s'
+                )
+            else:
+                if response.status not in policy.statuses:
+                    return response, body, data
+
+                if not retryable or not policy.should_retry(endpoint.method, attempt):
+                    return response, body, data
+
+                backoff = policy.get_backoff(attempt, response.headers)
+                if deadline_at is not None and time.monotonic() + backoff >= deadline_at:
+                    return response, body, data
+
+                logger.debug(
+                    f'{endpoint.method} {url} failed with status {response.status}, '
+                    f'retrying in {backoff:.3f}s'
+                )
+
+            await asyncio.sleep(backoff)
+            attempt += 1
+
+    async def hedge_request(
+        self,
+        endpoint: APIEndpoint,
+        url: str,
+        keywords: typing.Mapping[str, typing.Any],
+        params: typing.Optional[typing.Mapping[str, typing.Any]],
+        headers: CIMultiDict[str],
+        json: typing.Optional[JSONType],
+        files: typing.Optional[typing.Sequence[MultipartFile]] = None,
+        *,
+        priority: RequestPriority = RequestPriority.NORMAL,
+    ) -> typing.Tuple[aiohttp.ClientResponse, bytes, typing.Union[bytes, JSONType]]:
+        policy = self.retry_policy
+
+        delay = None
+        if policy.hedge_percentile is not None and endpoint.method == 'GET':
+            delay = self.latencies.get_percentile(
+                get_route(endpoint), policy.hedge_percentile, min_samples=policy.hedge_min_samples
+            )
+
+        if delay is None:
+            return await self.perform_request(
+                endpoint, url, keywords, params, headers, json, files, priority=priority
+            )
+
+        delay = max(delay, policy.hedge_min_delay)
+
+        # A second copy of the request is sent if the first one is slower than most,
+        # whichever copy succeeds first is used and the other is cancelled
+        tasks = [
+            asyncio.ensure_future(
+                self.perform_request(
+                    endpoint, url, keywords, params, headers, json, files, priority=priority
+                )
+            )
+        ]
+
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=delay)
+            if not done:
+                logger.debug(f'Hedging {endpoint.method} {url} after {delay:.3f}s')
+                tasks.append(
+                    asyncio.ensure_future(
+                        self.perform_request(
+                            endpoint, url, keywords, params, headers, json, files, priority=priority
+                        )
+                    )
+                )
+
+            while True:
+                done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+
+                for task in done:
+                    tasks.remove(task)
+
+                    if task.exception() is None or not tasks:
+                        return task.result()
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def perform_request(
+        self,
+        endpoint: APIEndpoint,
+        url: str,
+        keywords: typing.Mapping[str, typing.Any],
+        params: typing.Optional[typing.Mapping[str, typing.Any]],
+        headers: CIMultiDict[str],
+        json: typing.Optional[JSONType],
+        files: typing.Optional[typing.Sequence[MultipartFile]] = None,
+        *,
+        priority: RequestPriority = RequestPriority.NORMAL,
+    ) -> typing.Tuple[aiohttp.ClientResponse, bytes, typing.Union[bytes, JSONType]]:
+        assert self.session is not None
+
+        # The body is encoded once for all attempts, straight to bytes when the backend can
+        payload = None
+        if json is not None and not files:
+            payload = aiohttp.payload.BytesPayload(
+                self.json_backend.dumpb(json), content_type=hdrs.APPLICATION_JSON
+            )
+
+        retries = 0
+        while True:
+            queued_at = time.monotonic()
+            bucket = await self.ratelimiter.acquire(endpoint, keywords, priority=priority)
+            started_at = received_at = time.monotonic()
+
+            try:
+                if not files:
+                    response = await self.session.request(
+                        endpoint.method, url, params=params, headers=headers, data=payload
+                    )
+                else:
+                    form = await create_form(typing.cast('JSONObject', json), files)
+                    response = await self.session.request(
+                        endpoint.method, url, params=params, headers=headers, data=form
+                    )
+
+                body = data = await response.read()
+                received_at = time.monotonic()
+
+                if response.headers.get(hdrs.CONTENT_TYPE) == hdrs.APPLICATION_JSON:
+                    data = self.json_backend.loads(body)
+            except asyncio.CancelledError:
+                await self.ratelimiter.release(endpoint, keywords, bucket)
+                raise
+            except BaseException:
+                await self.ratelimiter.release(endpoint, keywords, bucket)
+
+                if self.metrics is not None:
+                    self.metrics.record(
+                        RequestSample(
+                            get_route(endpoint),
+                            bucket=self.ratelimiter.get_bucket_name(bucket),
+                            queue_time=started_at - queued_at,
+                            network_time=time.monotonic() - started_at,
+                        )
+                    )
+                raise
+
+            if self.metrics is not None:
+                self.metrics.record(
+                    RequestSample(
+                        get_route(endpoint),
+                        bucket=self.ratelimiter.get_bucket_name(bucket),
+                        status=response.status,
+                        queue_time=started_at - queued_at,
+                        network_time=received_at - started_at,
+                        decode_time=time.monotonic() - received_at if data is not body else 0.0,
+                        size=len(body),
+                    )
+                )
+
+            if self.retry_policy.hedge_percentile is not None and response.status < 500:
+                self.latencies.record(get_route(endpoint), received_at - started_at)
+
+            retry_after = await self.ratelimiter.release(
+                endpoint,
+                keywords,
+                bucket,
+                status=response.status,
+                headers=response.headers,
+                data=data,
+            )
+
+            if retry_after is None or retries >= MAX_RATELIMIT_RETRIES or files:
+                return response, body, data
+
+            retries += 1
+
+    async def invalidate(self, endpoint: APIEndpoint, **kwargs: typing.Any) -> None:
+        """Remove the cached response for an endpoint so the next request is sent to Discord.
+
+        Parameters
+        ----------
+        endpoint: APIEndpoint
+            The endpoint to invalidate.
+        **kwargs: typing.Any
+            The keyword arguments for the endpoint's url.
+        """
+        await self.response_cache.drop(endpoint.url(self.api, **kwargs))
+
+    async def invalidate_event(self, event: str, payload: JSONObject) -> None:
+        """Remove the cached responses made stale by a gateway event."""
+        for endpoint, fields in EVENT_INVALIDATIONS.get(event, ()):
+            if endpoint not in self.cache_policies:
+                continue
+
+            kwargs = {keyword: payload.get(field) for keyword, field in fields.items()}
+
+            # Snowflakes are strings in JSON payloads and integers in ETF payloads
+            if all(isinstance(value, (str, int)) for value in kwargs.values()):
+                await self.invalidate(
+                    endpoint, **{keyword: str(value) for keyword, value in kwargs.items()}
+                )
+
+    async def invalidate_request(
+        self,
+        endpoint: APIEndpoint,
+        keywords: typing.Mapping[str, typing.Any],
+        data: typing.Union[bytes, JSONType],
+    ) -> None:
+        """Remove the cached responses for other endpoints made stale by a successful request."""
+        for stale, fields in REQUEST_INVALIDATIONS.get(endpoint, ()):
+            if stale not in self.cache_policies:
+                continue
+
+            kwargs = {}
+            for keyword, field in fields.items():
+                value = keywords.get(field)
+                if value is None and isinstance(data, dict):
+                    value = data.get(field)
+
+                kwargs[keyword] = value
+
+            if all(isinstance(value, (str, int)) for value in kwargs.values()):
+                await self.invalidate(
+                    stale, **{keyword: str(value) for keyword, value in kwargs.items()}
+                )
+
+    async def request_cdn(self, endpoint: CDNEndpoint, **kwargs: typing.Any) -> AsyncReadStream:
+        url = endpoint.url(self.cdn, **kwargs)
+
+        if self.cdn_cache is None:
+            return await self.fetch_cdn(endpoint, url)
+
+        stream = await self.cdn_cache.get(url)
+        if stream is not None:
+            return stream
+
+        # Concurrent requests for the same asset wait for one download into the cache
+        future = self.cdn_inflight.get(url)
+        if future is None:
+            future = asyncio.ensure_future(self.cache_cdn(endpoint, url))
+            future.add_done_callback(
+                lambda future: (
+                    self.cdn_inflight.pop(url) if self.cdn_inflight.get(url) is future else None
+                )
+            )
+
+            self.cdn_inflight[url] = future
+
+        await asyncio.shield(future)
+
+        stream = await self.cdn_cache.get(url)
+        if stream is not None:
+            return stream
+
+        # The asset is too large to be cached or was evicted straight away
+        return await self.fetch_cdn(endpoint, url)
+
+    async def request_cdn_many(
+        self,
+        requests: typing.Iterable[
+            typing.Union[CDNRequest, typing.Tuple[CDNEndpoint, typing.Mapping[str, typing.Any]]]
+        ],
+        *,
+        concurrency: int = 8,
+        host_concurrency: typing.Optional[int] = None,
+        return_exceptions: bool = False,
+    ) -> typing.AsyncIterator[
+        typing.Tuple[CDNRequest, typing.Union[AsyncReadStream, BaseException]]
+    ]:
+        """Request many CDN assets concurrently, yielding each request along with
+        its stream in the order they complete.
+
+        Requests are taken from each host in turn so that one slow host does not hold up
+        the others. At most `concurrency` streams are waiting to be consumed at a time,
+        streams that are not consumed when the iteration stops are closed.
+
+        Parameters
+        ----------
+        requests: typing.Iterable[CDNRequest | tuple[CDNEndpoint, typing.Mapping[str, typing.Any]]]
+            The requests to make, a pair of an endpoint and its keyword arguments
+            is converted into a CDNRequest. A request with a path is written to that file
+            and yielded as an FSReadStream of it.
+        concurrency: int
+            The maximum number of requests in progress at a time.
+        host_concurrency: typing.Optional[int]
+            The maximum number of requests in progress to a single host at a time.
+        return_exceptions: bool
+            Whether to yield exceptions in place of streams instead of raising them.
+        """
+        if concurrency < 1:
+            raise ValueError(f'concurrency should be at least 1, got {concurrency!r}')
+
+        pending: typing.Dict[str, collections.deque[CDNRequest]] = {}
+
+        for request in requests:
+            if not isinstance(request, CDNRequest):
+                request = CDNRequest(*request)
+
+            # The url is built up front so invalid keyword arguments fail before anything is sent
+            url = request.endpoint.url(self.cdn, **request.kwargs)
+            pending.setdefault(urllib.parse.urlsplit(url).netloc, collections.deque()).append(
+                request
+            )
+
+        remaining = sum(len(queue) for queue in pending.values())
+
+        hosts = collections.deque(pending)
+        active: typing.Counter[str] = collections.Counter()
+        condition = asyncio.Condition()
+
+        results: asyncio.Queue[
+            typing.Tuple[CDNRequest, typing.Union[AsyncReadStream, BaseException]]
+        ] = asyncio.Queue(concurrency)
+
+        def next_request() -> typing.Optional[typing.Tuple[str, CDNRequest]]:
+            for _ in range(len(hosts)):
+                host = hosts[0]
+                hosts.rotate(-1)
+
+                if host_concurrency is not None and active[host] >= host_concurrency:
+                    continue
+
+                queue = pending[host]
+                request = queue.popleft()
+
+                if not queue:
+                    del pending[host]
+                    hosts.remove(host)
+
+                return host, request
+
+            return None
+
+        async def worker() -> None:
+            while True:
+                async with condition:
+                    while True:
+                        if not hosts:
+                            return
+
+                        picked = next_request()
+                        if picked is not None:
+                            break
+
+                        await condition.wait()
+
+                host, request = picked
+                active[host] += 1
+
+                result: typing.Union[AsyncReadStream, BaseException]
+                try:
+                    result = await self.download_cdn(request)
+                except Exception as exc:
+                    result = exc
+                finally:
+                    active[host] -= 1
+
+                    async with condition:
+                        condition.notify_all()
+
+                try:
+                    await results.put((request, result))
+                except asyncio.CancelledError:
+                    if isinstance(result, AsyncReadStream):
+                        result.close()
+
+                    raise
+
+        workers = [asyncio.ensure_future(worker()) for _ in range(min(concurrency, remaining))]
+
+        try:
+            for _ in range(remaining):
+                request, result = await results.get()
+
+                if isinstance(result, BaseException) and not return_exceptions:
+                    raise result
+
+                yield request, result
+        finally:
+            for task in workers:
+                task.cancel()
+
+            await asyncio.gather(*workers, return_exceptions=True)
+
+            while not results.empty():
+                _, result = results.get_nowait()
+
+                if isinstance(result, AsyncReadStream):
+                    result.close()
+
+    async def download_cdn(self, request: CDNRequest) -> AsyncReadStream:
+        stream = await self.request_cdn(request.endpoint, **request.kwargs)
+
+        if request.path is None:
+            return stream
+
+        try:
+            await stream.to_file(request.path)
+        finally:
+            stream.close()
+
+        return FSReadStream(request.path, content_type=stream.content_type)
+
+    async def cache_cdn(self, endpoint: CDNEndpoint, url: str) -> None:
+        assert self.cdn_cache is not None
+
+        stream = await self.fetch_cdn(endpoint, url)
+
+        try:
+            await self.cdn_cache.set(url, stream)
+        finally:
+            stream.close()
+
+    async def fetch_cdn(self, endpoint: CDNEndpoint, url: str) -> ResponseReadStream:
         if self.session is None:
             self.session = self.create_session()
 
-        url = endpoint.url(self.cdn, **kwargs)
-        response = await self.session.request('GET', url)
+        if self.metrics is None:
+            response = await self.session.request('GET', url)
+        else:
+            started_at = time.monotonic()
+            sample = RequestSample(f'CDN {endpoint.path}')
+
+            try:
+                response = await self.session.request('GET', url)
+            except asyncio.CancelledError:
+                raise
+            except BaseException:
+                sample.network_time = time.monotonic() - started_at
+                self.metrics.record(sample)
+                raise
+
+            # The body is streamed by the caller so only the time to the headers is measured
+            sample.network_time = time.monotonic() - started_at
+            sample.status = response.status
+            sample.size = response.content_length
+            self.metrics.record(sample)
 
         if not response.ok:
+            response.release()
             raise RESTError(self, 'GET', url, response, None)
 
         return ResponseReadStream(response)
 
+    async def warmup_host(self, url: str) -> None:
+        assert self.session is not None
+
+        try:
+            async with self.session.head(url, allow_redirects=False) as response:
+                await response.read()
+        except aiohttp.ClientError as exc:
+            logger.debug(f'Failed to warm up connection to {url}: {exc!r}')
+
+    async def warmup(self, connections: typing.Optional[int] = None) -> None:
+        """Open connections to the API and CDN hosts ahead of time so that the first
+        requests do not pay for the TCP and TLS handshakes.
+
+        Parameters
+        ----------
+        connections: typing.Optional[int]
+            The number of connections to open to each host,
+            defaults to `RESTConnectorOptions.warmup_connections`.
+        """
+        if connections is None:
+            connections = self.connector_options.warmup_connections
+
+        if connections <= 0:
+            return
+
+        if self.session is None:
+            self.session = self.create_session()
+
+        await asyncio.gather(
+            *(self.warmup_host(url) for url in (self.api, self.cdn) for _ in range(connections))
+        )
+
     async def close(self) -> None:
         if self.session is not None:
             await self.session.close()
+
+        await self.ratelimiter.close()
+        await self.response_cache.clear()
+
+        if self.cdn_cache is not None:
+            await self.cdn_cache.close()
@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import asyncio
+import contextlib
 import typing
 import weakref
 from collections import defaultdict
@@ -211,6 +212,27 @@ class CachedEventState(
         """
         return self.locks[self.to_unique(object)]
 
+    @contextlib.asynccontextmanager
+    async def synchronize_many(
+        self, objects: typing.Iterable[SupportsUniqueT]
+    ) -> typing.AsyncIterator[None]:
+        """Acquire the locks for several objects at once. This should be used
+        by batch upsert functions to prevent race conditions. The locks are
+        acquired in order of unique identifier so that batches cannot deadlock.
+
+        Raises
+        ------
+        TypeError
+            Raised when an object cannot be converted into a unique identifier.
+        """
+        locks = [self.locks[unique] for unique in sorted(set(map(self.to_unique, objects)))]
+
+        async with contextlib.AsyncExitStack() as stack:
+            for lock in locks:
+                await stack.enter_async_context(lock)
+
+            yield
+
     async def __aiter__(self) -> typing.AsyncIterator[ObjectT]:
         async for item in self.cache.iterate():
             yield await self.from_cached(item)
@@ -265,11 +287,42 @@ class CachedEventState(
         await self.remove_refs(cached)
         return await self.from_cached(cached)
 
+    async def drop_many(
+        self, objects: typing.Iterable[typing.Union[UniqueT, SupportsUniqueT]]
+    ) -> typing.List[ObjectT]:
+        """Remove several objects from the cache driver in one batch
+        and clean up any references to them.
+
+        Returns
+        -------
+        typing.List[ObjectT]
+            The user facing versions of the objects that were in cache.
+
+        Raises
+        ------
+        TypeError
+            Raised when an object cannot be converted into a unique identifier.
+        """
+        dropped = await self.cache.drop_many([self.to_unique(object) for object in objects])
+
+        cached = [object for object in dropped if object is not None]
+        if not cached:
+            return []
+
+        await self.remove_refs_many(cached)
+        return [await self.from_cached(object) for object in cached]
+
     async def remove_refs(self, object: CachedModelT) -> None:
         """Remove any references to object from the corresponding ref-stores.
         This is called as part of the drop routine and should not be called
         manually."""
 
+    async def remove_refs_many(self, objects: typing.Sequence[CachedModelT]) -> None:
+        """Remove any references to several objects, this is called by drop_many.
+        Subclasses can override this to make use of the batch operations of the ref-stores."""
+        for object in objects:
+            await self.remove_refs(object)
+
     async def upsert_cached(
         self, data: JSONObject, flags: CacheFlags = CacheFlags.ALL
     ) -> CachedModelT:
@@ -290,6 +343,27 @@ class CachedEventState(
         """
         raise NotImplementedError
 
+    async def upsert_many_cached(
+        self, objects: typing.Iterable[JSONObject], flags: CacheFlags = CacheFlags.ALL
+    ) -> typing.List[CachedModelT]:
+        """Add or otherwise update several objects in cache. Subclasses can override
+        this to make use of the batch operations of the cache driver.
+
+        Parameters
+        ----------
+        objects: typing.Iterable[JSONObject]
+            The data to update each object with.
+        flags: CacheFlags
+            The flags determining which objects to add to cache.
+            This should be passed down to other upsert functions.
+
+        Returns
+        -------
+        typing.List[CachedModelT]
+            The raw models representing the updated objects in cache, in order.
+        """
+        return [await self.upsert_cached(data, flags) for data in objects]
+
     async def from_cached(self, cached: CachedModelT) -> ObjectT:
         """Return an immutable user facing object from a cached model."""
         raise NotImplementedError
@@ -314,6 +388,27 @@ class CachedEventState(
         cached = await self.upsert_cached(data, flags)
         return await self.from_cached(cached)
 
+    async def upsert_many(
+        self, objects: typing.Iterable[JSONObject], flags: CacheFlags = CacheFlags.ALL
+    ) -> typing.List[ObjectT]:
+        """Add or otherwise update several objects in cache.
+
+        Parameters
+        ----------
+        objects: typing.Iterable[JSONObject]
+            The data to update each object with.
+        flags: CacheFlags
+            The flags determining which objects to add to cache.
+            This should be passed down to other upsert functions.
+
+        Returns
+        -------
+        typing.List[ObjectT]
+            The user facing versions of the objects in cache, in order.
+        """
+        cached = await self.upsert_many_cached(objects, flags)
+        return [await self.from_cached(object) for object in cached]
+
 
 class CachedStateView(CachedState[SupportsUniqueT, UniqueT, ObjectT]):
     """A frozen view into a cached state with only a subset of objects."""
@@ -14,7 +14,7 @@ from ..events import (
     ChannelPinsUpdateEvent,
     ChannelUpdateEvent,
 )
-from ..json import JSONObject, JSONType, json_get
+from ..json import JSONObject, JSONSnowflake, JSONType, json_get
 from ..objects import (
     CachedChannel,
     CategoryChannel,
@@ -287,7 +287,7 @@ class ChannelState(CachedEventState[SupportsChannelID, Snowflake, CachedChannel,
     async def create_event(self, event: str, shard: Shard, payload: JSONObject) -> BaseEvent:
         event = ChannelEvents(event)
 
-        guild_id = json_get(payload, 'guild_id', str, default=None)
+        guild_id = json_get(payload, 'guild_id', JSONSnowflake, default=None)
         guild = SnowflakeWrapper(guild_id, state=self.client.guilds)
 
         if event is ChannelEvents.CREATE:
@@ -299,11 +299,11 @@ class ChannelState(CachedEventState[SupportsChannelID, Snowflake, CachedChannel,
             return ChannelUpdateEvent(shard=shard, payload=payload, guild=guild, channel=channel)
 
         elif event is ChannelEvents.DELETE:
-            channel = await self.drop(json_get(payload, 'id', str))
+            channel = await self.drop(json_get(payload, 'id', JSONSnowflake))
             return ChannelDeleteEvent(shard=shard, payload=payload, guild=guild, channel=channel)
 
         elif event is ChannelEvents.PINS_UPDATE:
-            channel = await self.get(json_get(payload, 'channel_id', str))
+            channel = await self.get(json_get(payload, 'channel_id', JSONSnowflake))
 
             timestamp = json_get(payload, 'timestamp', typing.Optional[str])
             if timestamp is not None:
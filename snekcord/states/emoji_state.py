@@ -4,7 +4,7 @@ import typing
 
 from ..cache import RefStore, SnowflakeMemoryRefStore
 from ..enums import CacheFlags
-from ..json import JSONObject, json_get
+from ..json import JSONObject, JSONSnowflake, json_get
 from ..objects import (
     CachedCustomEmoji,
     CustomEmoji,
@@ -60,7 +60,7 @@ class EmojiState(CachedEventState[SupportsEmojiID, Snowflake, CachedCustomEmoji,
 
         user = json_get(data, 'user', JSONObject, default=None)
         if user is not None:
-            data['user_id'] = Snowflake(json_get(user, 'id', str))
+            data['user_id'] = Snowflake(json_get(user, 'id', JSONSnowflake))
 
             if flags & CacheFlags.USERS:
                 await self.client.users.upsert_cached(user, flags)
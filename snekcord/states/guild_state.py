@@ -14,7 +14,7 @@ from ..events import (
     GuildUnavailableEvent,
     GuildUpdateEvent,
 )
-from ..json import JSONObject, json_get
+from ..json import JSONObject, JSONSnowflake, json_get
 from ..objects import (
     CachedGuild,
     Guild,
@@ -205,7 +205,7 @@ class GuildState(CachedEventState[SupportsGuildID, Snowflake, CachedGuild, Guild
             return GuildUpdateEvent(shard=shard, payload=payload, guild=guild)
 
         elif event is GuildEvents.DELETE:
-            guild = await self.drop(json_get(payload, 'id', str))
+            guild = await self.drop(json_get(payload, 'id', JSONSnowflake))
             return GuildDeleteEvent(shard=shard, payload=payload, guild=guild)
 
         assert False
@@ -1,27 +1,70 @@
 from __future__ import annotations
 
+import asyncio
+import inspect
 import typing
+from collections import defaultdict
 from datetime import datetime
 
-from ..cache import RefStore, SnowflakeMemoryRefStore
+from ..cache import Checkpoint, RefStore, SnowflakeMemoryRefStore
 from ..enums import CacheFlags
-from ..json import JSONObject, JSONType, json_get
+from ..exceptions import RESTError
+from ..json import JSONObject, JSONSnowflake, JSONType, json_get
 from ..objects import (
     CachedMember,
     Member,
     SnowflakeWrapper,
     SupportsGuildID,
     SupportsMemberID,
+    SupportsRoleID,
     SupportsUserID,
 )
+from ..rest.endpoints import ADD_MEMBER_ROLE, GET_GUILD_MEMBERS, REMOVE_MEMBER_ROLE
+from ..rest.scheduler import RequestPriority
 from ..snowflake import Snowflake, SnowflakeCouple
-from ..undefined import undefined
+from ..undefined import MaybeUndefined, undefined
 from .base_state import CachedEventState, CachedState
 
 if typing.TYPE_CHECKING:
     from ..clients import Client
 
-__all__ = ('MemberState', 'GuildMembersView')
+__all__ = ('RoleUpdateProgress', 'MemberState', 'GuildMembersView')
+
+MAX_MEMBERS_PER_PAGE = 1000
+
+RoleUpdateCallback = typing.Callable[
+    ['RoleUpdateProgress'], typing.Optional[typing.Awaitable[None]]
+]
+
+
+class RoleUpdateProgress:
+    """The progress of a bulk role update, see MemberState.add_role_many()."""
+
+    __slots__ = ('guild_id', 'role_id', 'add', 'total', 'completed', 'skipped', 'failed')
+
+    failed: typing.Dict[Snowflake, RESTError]
+
+    def __init__(self, guild_id: Snowflake, role_id: Snowflake, *, add: bool, total: int) -> None:
+        self.guild_id = guild_id
+        self.role_id = role_id
+        self.add = add
+        self.total = total
+        # The members updated by this call
+        self.completed = 0
+        # The members updated before the operation was resumed
+        self.skipped = 0
+        # The members who could not be found
+        self.failed = {}
+
+    def __repr__(self) -> str:
+        return (
+            f'RoleUpdateProgress(total={self.total!r}, completed={self.completed!r}, '
+            f'skipped={self.skipped!r}, failed={len(self.failed)!r})'
+        )
+
+    @property
+    def remaining(self) -> int:
+        return self.total - self.completed - self.skipped - len(self.failed)
 
 
 class MemberState(CachedEventState[SupportsMemberID, SnowflakeCouple, CachedMember, Member]):
@@ -62,12 +105,18 @@ class MemberState(CachedEventState[SupportsMemberID, SnowflakeCouple, CachedMemb
 
         return dict(data, guild_id=guild_id)
 
+    def to_user_id(self, object: typing.Union[SupportsUserID, Member]) -> Snowflake:
+        if isinstance(object, Member):
+            return object.id.low
+
+        return self.client.users.to_unique(object)
+
     async def upsert_cached(
         self, data: JSONObject, flags: CacheFlags = CacheFlags.ALL
     ) -> CachedMember:
         user = json_get(data, 'user', JSONObject, default=None)
         if user is not None:
-            data['user_id'] = Snowflake(json_get(user, 'id', str))
+            data['user_id'] = Snowflake(json_get(user, 'id', JSONSnowflake))
 
             if flags & CacheFlags.USERS:
                 await self.client.users.upsert(user)
@@ -78,7 +127,7 @@ class MemberState(CachedEventState[SupportsMemberID, SnowflakeCouple, CachedMemb
         guild_id = Snowflake.into(data, 'guild_id')
         assert guild_id is not None
 
-        role_ids = json_get(data, 'roles', typing.List[str], default=())
+        role_ids = json_get(data, 'roles', typing.List[JSONSnowflake], default=())
         data['role_ids'] = [Snowflake(role_id) for role_id in role_ids]
 
         if flags & CacheFlags.MEMBERS:
@@ -100,6 +149,371 @@ class MemberState(CachedEventState[SupportsMemberID, SnowflakeCouple, CachedMemb
 
         return cached
 
+    async def upsert_many_cached(
+        self, objects: typing.Iterable[JSONObject], flags: CacheFlags = CacheFlags.ALL
+    ) -> typing.List[CachedMember]:
+        objects = list(objects)
+
+        users = []
+        member_ids = []
+
+        for data in objects:
+            user = json_get(data, 'user', JSONObject, default=None)
+            if user is not None:
+                data['user_id'] = Snowflake(json_get(user, 'id', JSONSnowflake))
+                users.append(user)
+
+            user_id = Snowflake.into(data, 'user_id')
+            assert user_id is not None
+
+            guild_id = Snowflake.into(data, 'guild_id')
+            assert guild_id is not None
+
+            role_ids = json_get(data, 'roles', typing.List[JSONSnowflake], default=())
+            data['role_ids'] = [Snowflake(role_id) for role_id in role_ids]
+
+            member_ids.append(SnowflakeCouple(guild_id, user_id))
+
+        if users and flags & CacheFlags.USERS:
+            await self.client.users.upsert_many_cached(users, flags)
+
+        created = []
+        updated = []
+        upserted = []
+
+        async with self.synchronize_many(member_ids):
+            # A member that appears more than once in the batch is only created once
+            seen: typing.Dict[SnowflakeCouple, CachedMember] = {}
+
+            for member_id, data, cached in zip(
+                member_ids, objects, await self.cache.get_many(member_ids)
+            ):
+                if member_id in seen:
+                    cached = seen[member_id]
+                    cached.update(data)
+                elif cached is None:
+                    cached = CachedMember.from_json(data)
+                    created.append((member_id, cached))
+                else:
+                    cached.update(data)
+                    updated.append((member_id, cached))
+
+                seen[member_id] = cached
+                upserted.append(cached)
+
+            if created and flags & CacheFlags.MEMBERS:
+                await self.cache.create_many(created)
+
+                refs: defaultdict[Snowflake, typing.List[Snowflake]] = defaultdict(list)
+                for member_id, _ in created:
+                    refs[member_id.high].append(member_id.low)
+
+                for guild_id, user_ids in refs.items():
+                    await self.guild_refstore.add_many(guild_id, user_ids)
+
+            if updated:
+                await self.cache.update_many(updated)
+
+        return upserted
+
+    async def fetch_page(
+        self, guild_id: Snowflake, after: Snowflake, limit: int
+    ) -> typing.List[JSONObject]:
+        data = await self.client.rest.request_api(
+            GET_GUILD_MEMBERS, guild_id=guild_id, params={'after': after, 'limit': limit}
+        )
+        assert isinstance(data, list)
+
+        return [self.inject_metadata(member, guild_id) for member in data]
+
+    async def stream(
+        self,
+        guild: SupportsGuildID,
+        *,
+        after: MaybeUndefined[SupportsUserID] = undefined,
+        limit: MaybeUndefined[int] = undefined,
+        flags: CacheFlags = CacheFlags.ALL,
+    ) -> typing.AsyncIterator[Member]:
+        """Iterate over every member of a guild in order of user id. Each page of
+        members is upserted in one batch and the next page is fetched while the
+        current one is being consumed.
+
+        Parameters
+        ----------
+        guild: SupportsGuildID
+            The guild to iterate over.
+        after: MaybeUndefined[SupportsUserID]
+            The user to start after, defaults to the start of the member list.
+        limit: MaybeUndefined[int]
+            The maximum number of members to yield.
+        flags: CacheFlags
+            The flags determining which objects to add to cache, CacheFlags.NONE
+            streams members without keeping them in memory.
+
+        Example
+        -------
+        ```py
+        async for member in client.members.stream(guild, flags=CacheFlags.NONE):
+            print(member.nick)
+        ```
+        """
+        guild_id = self.client.guilds.to_unique(guild)
+
+        cursor = self.client.users.to_unique(after) if after is not undefined else Snowflake(0)
+        remaining = int(limit) if limit is not undefined else None
+
+        def fetch_page(page_size: int) -> asyncio.Task[typing.List[JSONObject]]:
+            return asyncio.create_task(self.fetch_page(guild_id, cursor, page_size))
+
+        if remaining is None:
+            page_size = MAX_MEMBERS_PER_PAGE
+        elif remaining > 0:
+            page_size = min(remaining, MAX_MEMBERS_PER_PAGE)
+        else:
+            return
+
+        task: typing.Optional[asyncio.Task[typing.List[JSONObject]]] = fetch_page(page_size)
+
+        try:
+            while task is not None:
+                page = await task
+                task = None
+
+                if not page:
+                    return
+
+                user = json_get(page[-1], 'user', JSONObject)
+                cursor = Snowflake(json_get(user, 'id', JSONSnowflake))
+
+                # A short page means there is nothing left to fetch
+                if len(page) >= page_size:
+                    if remaining is None:
+                        task = fetch_page(page_size)
+                    elif remaining > len(page):
+                        page_size = min(remaining - len(page), MAX_MEMBERS_PER_PAGE)
+                        task = fetch_page(page_size)
+
+                for cached in await self.upsert_many_cached(page, flags):
+                    yield await self.from_cached(cached)
+
+                if remaining is not None:
+                    remaining -= len(page)
+        finally:
+            if task is not None:
+                task.cancel()
+
+    async def update_cached_roles(
+        self, guild_id: Snowflake, role_id: Snowflake, user_ids: typing.List[Snowflake], add: bool
+    ) -> None:
+        member_ids = [SnowflakeCouple(guild_id, user_id) for user_id in user_ids]
+        updated = []
+
+        async with self.synchronize_many(member_ids):
+            for member_id, cached in zip(member_ids, await self.cache.get_many(member_ids)):
+                if cached is None:
+                    continue
+
+                if add and role_id not in cached.role_ids:
+                    cached.role_ids.append(role_id)
+                elif not add and role_id in cached.role_ids:
+                    cached.role_ids.remove(role_id)
+                else:
+                    continue
+
+                updated.append((member_id, cached))
+
+            if updated:
+                await self.cache.update_many(updated)
+
+    async def update_role_many(
+        self,
+        guild: SupportsGuildID,
+        role: SupportsRoleID,
+        members: typing.Iterable[typing.Union[SupportsUserID, Member]],
+        *,
+        add: bool,
+        checkpoint: typing.Optional[Checkpoint] = None,
+        concurrency: int = 10,
+        batch_size: int = 100,
+        callback: typing.Optional[RoleUpdateCallback] = None,
+    ) -> RoleUpdateProgress:
+        guild_id = self.client.guilds.to_unique(guild)
+        role_id = self.client.roles.to_unique(role)
+
+        user_ids = list(dict.fromkeys(self.to_user_id(member) for member in members))
+        progress = RoleUpdateProgress(guild_id, role_id, add=add, total=len(user_ids))
+
+        if checkpoint is not None:
+            finished = await checkpoint.load()
+
+            pending = [user_id for user_id in user_ids if user_id not in finished]
+            progress.skipped = len(user_ids) - len(pending)
+        else:
+            pending = user_ids
+
+        endpoint = ADD_MEMBER_ROLE if add else REMOVE_MEMBER_ROLE
+
+        semaphore = asyncio.Semaphore(concurrency)
+        tasks: typing.Set[asyncio.Future[None]] = set()
+
+        updated: typing.List[Snowflake] = []
+        missing: typing.List[Snowflake] = []
+
+        async def update(user_id: Snowflake) -> None:
+            try:
+                # Bulk assignments give way to requests made while they are running
+                await self.client.rest.request_api(
+                    endpoint,
+                    guild_id=guild_id,
+                    member_id=user_id,
+                    role_id=role_id,
+                    priority=RequestPriority.LOW,
+                )
+            except RESTError as exception:
+                # Members who left are recorded instead of stopping the whole operation
+                if not exception.is_not_found():
+                    raise
+
+                progress.failed[user_id] = exception
+                missing.append(user_id)
+            else:
+                updated.append(user_id)
+            finally:
+                semaphore.release()
+
+        async def flush() -> None:
+            batch = updated[:]
+            updated.clear()
+
+            finished = batch + missing
+            missing.clear()
+
+            if batch:
+                await self.update_cached_roles(guild_id, role_id, batch, add)
+
+            if checkpoint is not None:
+                await checkpoint.add_many(finished)
+
+            progress.completed += len(batch)
+
+            if callback is not None and finished:
+                result = callback(progress)
+                if inspect.isawaitable(result):
+                    await result
+
+        try:
+            for user_id in pending:
+                await semaphore.acquire()
+
+                # Failures are raised as soon as they are noticed instead of after the last member
+                for task in [task for task in tasks if task.done()]:
+                    tasks.remove(task)
+                    task.result()
+
+                tasks.add(asyncio.ensure_future(update(user_id)))
+
+                if len(updated) + len(missing) >= batch_size:
+                    await flush()
+
+            await asyncio.gather(*tasks)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+
+            await asyncio.gather(*tasks, return_exceptions=True)
+            raise
+        finally:
+            # The members updated before an error are still recorded so they are skipped on resume
+            await flush()
+
+        return progress
+
+    async def add_role_many(
+        self,
+        guild: SupportsGuildID,
+        role: SupportsRoleID,
+        members: typing.Iterable[typing.Union[SupportsUserID, Member]],
+        *,
+        checkpoint: typing.Optional[Checkpoint] = None,
+        concurrency: int = 10,
+        batch_size: int = 100,
+        callback: typing.Optional[RoleUpdateCallback] = None,
+    ) -> RoleUpdateProgress:
+        """Give a role to any number of members of a guild.
+
+        Up to `concurrency` requests are in flight at once so that the guild's rate limit
+        bucket is kept full, the rate limiter holds back the requests that do not fit in it.
+        Every `batch_size` members the role is added to the cached members in one batch,
+        the members are recorded in the checkpoint and the callback is called.
+
+        Parameters
+        ----------
+        guild: SupportsGuildID
+            The guild the members are in.
+        role: SupportsRoleID
+            The role to give to the members.
+        members: typing.Iterable[typing.Union[SupportsUserID, Member]]
+            The members to give the role to.
+        checkpoint: typing.Optional[Checkpoint]
+            Where to record the members that have been updated, the members that are
+            already in it are skipped. Passing a FileCheckpoint allows the operation
+            to be resumed after the process exits.
+        concurrency: int
+            The maximum number of requests in flight at a time.
+        batch_size: int
+            The number of members to update between checkpoints.
+        callback: typing.Optional[RoleUpdateCallback]
+            A function called with the progress after every batch, it can be a coroutine function.
+
+        Returns
+        -------
+        RoleUpdateProgress
+            The progress after the last member, members who could not be found
+            are in its failed dictionary.
+
+        Example
+        -------
+        ```py
+        progress = await client.members.add_role_many(
+            guild, role, members, checkpoint=FileCheckpoint('members.txt'), callback=print
+        )
+        ```
+        """
+        return await self.update_role_many(
+            guild,
+            role,
+            members,
+            add=True,
+            checkpoint=checkpoint,
+            concurrency=concurrency,
+            batch_size=batch_size,
+            callback=callback,
+        )
+
+    async def remove_role_many(
+        self,
+        guild: SupportsGuildID,
+        role: SupportsRoleID,
+        members: typing.Iterable[typing.Union[SupportsUserID, Member]],
+        *,
+        checkpoint: typing.Optional[Checkpoint] = None,
+        concurrency: int = 10,
+        batch_size: int = 100,
+        callback: typing.Optional[RoleUpdateCallback] = None,
+    ) -> RoleUpdateProgress:
+        """Take a role from any number of members of a guild,
+        the parameters are the same as add_role_many()."""
+        return await self.update_role_many(
+            guild,
+            role,
+            members,
+            add=False,
+            checkpoint=checkpoint,
+            concurrency=concurrency,
+            batch_size=batch_size,
+            callback=callback,
+        )
+
     async def from_cached(self, cached: CachedMember) -> Member:
         premium_since = undefined.nullify(cached.premium_since)
         if premium_since is not None:
@@ -154,6 +568,15 @@ class GuildMembersView(CachedState[SupportsMemberID, SnowflakeCouple, Member]):
     async def size(self) -> int:
         return len(self.user_ids)
 
+    def stream(
+        self,
+        *,
+        after: MaybeUndefined[SupportsUserID] = undefined,
+        limit: MaybeUndefined[int] = undefined,
+        flags: CacheFlags = CacheFlags.ALL,
+    ) -> typing.AsyncIterator[Member]:
+        return self.state.stream(self.guild_id, after=after, limit=limit, flags=flags)
+
     async def get(
         self, object: typing.Union[SupportsUserID, SupportsMemberID]
     ) -> typing.Optional[Member]:
@@ -162,3 +585,43 @@ class GuildMembersView(CachedState[SupportsMemberID, SnowflakeCouple, Member]):
             return None
 
         return await self.state.get(id)
+
+    async def add_role_many(
+        self,
+        role: SupportsRoleID,
+        members: typing.Iterable[typing.Union[SupportsUserID, Member]],
+        *,
+        checkpoint: typing.Optional[Checkpoint] = None,
+        concurrency: int = 10,
+        batch_size: int = 100,
+        callback: typing.Optional[RoleUpdateCallback] = None,
+    ) -> RoleUpdateProgress:
+        return await self.state.add_role_many(
+            self.guild_id,
+            role,
+            members,
+            checkpoint=checkpoint,
+            concurrency=concurrency,
+            batch_size=batch_size,
+            callback=callback,
+        )
+
+    async def remove_role_many(
+        self,
+        role: SupportsRoleID,
+        members: typing.Iterable[typing.Union[SupportsUserID, Member]],
+        *,
+        checkpoint: typing.Optional[Checkpoint] = None,
+        concurrency: int = 10,
+        batch_size: int = 100,
+        callback: typing.Optional[RoleUpdateCallback] = None,
+    ) -> RoleUpdateProgress:
+        return await self.state.remove_role_many(
+            self.guild_id,
+            role,
+            members,
+            checkpoint=checkpoint,
+            concurrency=concurrency,
+            batch_size=batch_size,
+            callback=callback,
+        )
@@ -1,7 +1,8 @@
 from __future__ import annotations
 
+import asyncio
 import typing
-from datetime import datetime
+from datetime import datetime, timedelta, timezone
 
 from ..builders import MessageCreateBuilder, MessageUpdateBuilder
 from ..cache import RefStore, SnowflakeMemoryRefStore
@@ -14,7 +15,7 @@ from ..events import (
     MessageEvents,
     MessageUpdateEvent,
 )
-from ..json import JSONObject, JSONType, json_get
+from ..json import JSONObject, JSONSnowflake, JSONType, json_get
 from ..objects import (
     CachedMessage,
     MemberIDWrapper,
@@ -45,6 +46,12 @@ if typing.TYPE_CHECKING:
 
 __all__ = ('MessageState', 'ChannelMessagesView')
 
+MAX_MESSAGES_PER_PAGE = 100
+MAX_BULK_DELETE_MESSAGES = 100
+
+# Discord refuses to bulk delete messages older than this, the margin accounts for clock skew
+BULK_DELETE_MAX_AGE = timedelta(days=14) - timedelta(minutes=1)
+
 
 class MessageState(CachedEventState[SupportsMessageID, Snowflake, CachedMessage, Message]):
     def __init__(self, *, client: Client) -> None:
@@ -76,6 +83,12 @@ class MessageState(CachedEventState[SupportsMessageID, Snowflake, CachedMessage,
         messages = await self.channel_refstore.get(channel_id)
         return self.client.create_channel_messages_view(messages, channel_id)
 
+    def resolve_point(self, point: typing.Union[SupportsMessageID, datetime]) -> Snowflake:
+        if isinstance(point, datetime):
+            return Snowflake.build(point)
+
+        return self.to_unique(point)
+
     def inject_metadata(self, data: JSONType, channel_id: Snowflake) -> JSONObject:
         if not isinstance(data, dict):
             raise TypeError('data should be a JSON object')
@@ -103,7 +116,7 @@ class MessageState(CachedEventState[SupportsMessageID, Snowflake, CachedMessage,
 
         author = json_get(data, 'author', JSONObject, default=None)
         if author is not None:
-            data['author_id'] = Snowflake(json_get(author, 'id', str))
+            data['author_id'] = Snowflake(json_get(author, 'id', JSONSnowflake))
 
             if flags & CacheFlags.USERS:
                 await self.client.users.upsert_cached(author, flags)
@@ -173,6 +186,16 @@ class MessageState(CachedEventState[SupportsMessageID, Snowflake, CachedMessage,
         if object.channel_id is not None:
             await self.channel_refstore.remove(object.channel_id, object.id)
 
+    async def remove_refs_many(self, objects: typing.Sequence[CachedMessage]) -> None:
+        channels: typing.Dict[Snowflake, typing.List[Snowflake]] = {}
+
+        for object in objects:
+            if object.channel_id is not None:
+                channels.setdefault(object.channel_id, []).append(object.id)
+
+        for channel_id, message_ids in channels.items():
+            await self.channel_refstore.remove_many(channel_id, message_ids)
+
     async def crosspost(self, channel: SupportsChannelID, message: SupportsMessageID) -> Message:
         channel_id = self.client.channels.to_unique(channel)
 
@@ -227,13 +250,8 @@ class MessageState(CachedEventState[SupportsMessageID, Snowflake, CachedMessage,
         params = {}
 
         if point is not undefined:
-            if isinstance(point, datetime):
-                snowflake = Snowflake.build(point)
-            else:
-                snowflake = self.client.messages.to_unique(point)
-
             assert ordering is not undefined
-            params[ordering.value] = snowflake
+            params[ordering.value] = self.resolve_point(point)
 
         if limit is not undefined:
             params['limit'] = int(limit)
@@ -248,6 +266,140 @@ class MessageState(CachedEventState[SupportsMessageID, Snowflake, CachedMessage,
         iterator = (self.inject_metadata(message, channel_id) for message in data)
         return [await self.upsert(message) for message in iterator]
 
+    async def fetch_history_page(
+        self,
+        channel_id: Snowflake,
+        ordering: FetchOrdering,
+        cursor: typing.Optional[Snowflake],
+        limit: int,
+    ) -> typing.List[JSONObject]:
+        params: JSONObject = {'limit': limit}
+        if cursor is not None:
+            params[ordering.value] = cursor
+
+        data = await self.client.rest.request_api(
+            GET_CHANNEL_MESSAGES, channel_id=channel_id, params=params
+        )
+        assert isinstance(data, list)
+
+        # Discord always returns the newest messages first
+        if ordering is FetchOrdering.AFTER:
+            data.reverse()
+
+        return [self.inject_metadata(message, channel_id) for message in data]
+
+    async def history(
+        self,
+        channel: SupportsChannelID,
+        ordering: FetchOrdering = FetchOrdering.BEFORE,
+        point: MaybeUndefined[typing.Union[SupportsMessageID, datetime]] = undefined,
+        *,
+        until: MaybeUndefined[typing.Union[SupportsMessageID, datetime]] = undefined,
+        limit: MaybeUndefined[int] = undefined,
+        flags: CacheFlags = CacheFlags.ALL,
+    ) -> typing.AsyncIterator[Message]:
+        """Iterate over the history of a channel one page at a time,
+        the next page is fetched while the current one is being consumed.
+
+        Parameters
+        ----------
+        channel: SupportsChannelID
+            The channel to iterate over.
+        ordering: FetchOrdering
+            BEFORE to walk from newest to oldest, AFTER to walk from oldest to newest.
+        point: MaybeUndefined[typing.Union[SupportsMessageID, datetime]]
+            The message or time to start from (exclusive), defaults to
+            the newest message for BEFORE and the oldest message for AFTER.
+        until: MaybeUndefined[typing.Union[SupportsMessageID, datetime]]
+            The message or time to stop at (exclusive).
+        limit: MaybeUndefined[int]
+            The maximum number of messages to yield.
+        flags: CacheFlags
+            The flags determining which objects to add to cache, CacheFlags.NONE
+            avoids filling the cache when backfilling large channels.
+
+        Raises
+        ------
+        ValueError
+            Raised when the ordering is FetchOrdering.AROUND.
+
+        Example
+        -------
+        ```py
+        async for message in client.messages.history(channel, until=yesterday):
+            print(message.content)
+        ```
+        """
+        if ordering is FetchOrdering.AROUND:
+            raise ValueError('history() does not support FetchOrdering.AROUND')
+
+        channel_id = self.client.channels.to_unique(channel)
+
+        if point is not undefined:
+            cursor: typing.Optional[Snowflake] = self.resolve_point(point)
+        elif ordering is FetchOrdering.AFTER:
+            cursor = Snowflake(0)
+        else:
+            cursor = None
+
+        bound = self.resolve_point(until) if until is not undefined else None
+        remaining = int(limit) if limit is not undefined else None
+
+        def is_past_bound(message_id: Snowflake) -> bool:
+            if bound is None:
+                return False
+
+            if ordering is FetchOrdering.BEFORE:
+                return message_id <= bound
+
+            return message_id >= bound
+
+        def fetch_page(page_size: int) -> asyncio.Task[typing.List[JSONObject]]:
+            return asyncio.create_task(
+                self.fetch_history_page(channel_id, ordering, cursor, page_size)
+            )
+
+        if remaining is None:
+            page_size = MAX_MESSAGES_PER_PAGE
+        elif remaining > 0:
+            page_size = min(remaining, MAX_MESSAGES_PER_PAGE)
+        else:
+            return
+
+        task: typing.Optional[asyncio.Task[typing.List[JSONObject]]] = fetch_page(page_size)
+
+        try:
+            while task is not None:
+                page = await task
+                task = None
+
+                if not page:
+                    return
+
+                cursor = Snowflake(json_get(page[-1], 'id', JSONSnowflake))
+
+                # A short page means there is nothing left to fetch
+                if len(page) >= page_size and not is_past_bound(cursor):
+                    if remaining is None:
+                        task = fetch_page(page_size)
+                    elif remaining > len(page):
+                        page_size = min(remaining - len(page), MAX_MESSAGES_PER_PAGE)
+                        task = fetch_page(page_size)
+
+                for data in page:
+                    if is_past_bound(Snowflake(json_get(data, 'id', JSONSnowflake))):
+                        return
+
+                    yield await self.upsert(data, flags)
+
+                    if remaining is not None:
+                        remaining -= 1
+                        if remaining <= 0:
+                            return
+        finally:
+            if task is not None:
+                task.cancel()
+
     def create(
         self,
         channel: SupportsChannelID,
@@ -306,8 +458,153 @@ class MessageState(CachedEventState[SupportsMessageID, Snowflake, CachedMessage,
             json={'messages': message_ids},
         )
 
-        iterator = (await self.client.messages.drop(message_id) for message_id in message_ids)
-        return [message async for message in iterator if message is not None]
+        return await self.drop_many(message_ids)
+
+    async def purge(
+        self,
+        channel: SupportsChannelID,
+        messages: MaybeUndefined[typing.Iterable[SupportsMessageID]] = undefined,
+        *,
+        before: MaybeUndefined[typing.Union[SupportsMessageID, datetime]] = undefined,
+        after: MaybeUndefined[typing.Union[SupportsMessageID, datetime]] = undefined,
+        limit: MaybeUndefined[int] = undefined,
+        concurrency: int = 4,
+    ) -> typing.List[Snowflake]:
+        """Delete any number of messages from a channel, either the messages given
+        or a range of the channel's history.
+
+        Messages are deleted 100 at a time, messages that are too old to be bulk deleted
+        are deleted one at a time. Up to `concurrency` requests are in flight at once so
+        that they are queued on the channel's rate limit buckets back to back, the history
+        is fetched while the messages already found are being deleted. The deleted messages
+        are dropped from the cache in one batch, including when an error is raised part way.
+
+        Parameters
+        ----------
+        channel: SupportsChannelID
+            The channel to delete the messages from.
+        messages: MaybeUndefined[typing.Iterable[SupportsMessageID]]
+            The messages to delete, this cannot be combined with before, after and limit.
+        before: MaybeUndefined[typing.Union[SupportsMessageID, datetime]]
+            Delete the messages before this message or time (exclusive),
+            defaults to the newest message.
+        after: MaybeUndefined[typing.Union[SupportsMessageID, datetime]]
+            Delete the messages after this message or time (exclusive).
+        limit: MaybeUndefined[int]
+            The maximum number of messages in the history range to delete.
+        concurrency: int
+            The maximum number of delete requests in flight at a time.
+
+        Returns
+        -------
+        typing.List[Snowflake]
+            The ids of the deleted messages.
+
+        Raises
+        ------
+        ValueError
+            Raised when messages is combined with a history range.
+
+        Example
+        -------
+        ```py
+        await client.messages.purge(channel, after=datetime.now() - timedelta(hours=1))
+        ```
+        """
+        if messages is not undefined and (
+            before is not undefined or after is not undefined or limit is not undefined
+        ):
+            raise ValueError('messages cannot be combined with before, after or limit')
+
+        channel_id = self.client.channels.to_unique(channel)
+
+        if messages is not undefined:
+            message_ids = [self.to_unique(message) for message in messages]
+
+            async def iterate_ids() -> typing.AsyncIterator[Snowflake]:
+                for message_id in message_ids:
+                    yield message_id
+
+        else:
+
+            async def iterate_ids() -> typing.AsyncIterator[Snowflake]:
+                async for message in self.history(
+                    channel_id,
+                    FetchOrdering.BEFORE,
+                    before,
+                    until=after,
+                    limit=limit,
+                    flags=CacheFlags.NONE,
+                ):
+                    yield message.id
+
+        oldest = Snowflake.build(datetime.now(timezone.utc) - BULK_DELETE_MAX_AGE)
+
+        semaphore = asyncio.Semaphore(concurrency)
+        tasks: typing.Set[asyncio.Future[None]] = set()
+        deleted: typing.List[Snowflake] = []
+
+        async def delete_chunk(chunk: typing.List[Snowflake]) -> None:
+            try:
+                if len(chunk) == 1:
+                    await self.client.rest.request_api(
+                        DELETE_CHANNEL_MESSAGE, channel_id=channel_id, message_id=chunk[0]
+                    )
+                else:
+                    await self.client.rest.request_api(
+                        DELETE_CHANNEL_MESSAGES,
+                        channel_id=channel_id,
+                        json={'messages': [str(message_id) for message_id in chunk]},
+                    )
+
+                deleted.extend(chunk)
+            finally:
+                semaphore.release()
+
+        async def submit(chunk: typing.List[Snowflake]) -> None:
+            await semaphore.acquire()
+
+            # Failures are raised as soon as they are noticed instead of after the last chunk
+            for task in [task for task in tasks if task.done()]:
+                tasks.remove(task)
+                task.result()
+
+            tasks.add(asyncio.ensure_future(delete_chunk(chunk)))
+
+        seen: typing.Set[Snowflake] = set()
+        chunk: typing.List[Snowflake] = []
+
+        try:
+            async for message_id in iterate_ids():
+                if message_id in seen:
+                    continue
+
+                seen.add(message_id)
+
+                if message_id < oldest:
+                    await submit([message_id])
+                    continue
+
+                chunk.append(message_id)
+
+                if len(chunk) >= MAX_BULK_DELETE_MESSAGES:
+                    await submit(chunk)
+                    chunk = []
+
+            if chunk:
+                await submit(chunk)
+
+            await asyncio.gather(*tasks)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+
+            await asyncio.gather(*tasks, return_exceptions=True)
+            raise
+        finally:
+            await self.drop_many(deleted)
+
+        return deleted
 
     def on_create(self) -> OnDecoratorT[MessageCreateEvent]:
         return self.on(MessageEvents.CREATE)
@@ -324,10 +621,10 @@ class MessageState(CachedEventState[SupportsMessageID, Snowflake, CachedMessage,
     async def create_event(self, event: str, shard: Shard, payload: JSONObject) -> BaseEvent:
         event = MessageEvents(event)
 
-        guild_id = json_get(payload, 'guild_id', str, default=None)
+        guild_id = json_get(payload, 'guild_id', JSONSnowflake, default=None)
         guild = SnowflakeWrapper(guild_id, state=self.client.guilds)
 
-        channel_id = json_get(payload, 'channel_id', str)
+        channel_id = json_get(payload, 'channel_id', JSONSnowflake)
         channel = SnowflakeWrapper(channel_id, state=self.client.channels)
 
         if event is MessageEvents.CREATE:
@@ -343,16 +640,14 @@ class MessageState(CachedEventState[SupportsMessageID, Snowflake, CachedMessage,
             )
 
         elif event is MessageEvents.DELETE:
-            message = await self.drop(json_get(payload, 'id', str))
+            message = await self.drop(json_get(payload, 'id', JSONSnowflake))
             return MessageDeleteEvent(
                 shard=shard, payload=payload, guild=guild, channel=channel, message=message
             )
 
         elif event is MessageEvents.BULK_DELETE:
-            message_ids = json_get(payload, 'ids', typing.List[str])
-
-            iterator = (await self.drop(message_id) for message_id in message_ids)
-            messages = [message async for message in iterator if message is not None]
+            message_ids = json_get(payload, 'ids', typing.List[JSONSnowflake])
+            messages = await self.drop_many(message_ids)
 
             return MessageBulkDeleteEvent(
                 shard=shard, payload=payload, guild=guild, channel=channel, messages=messages
@@ -405,6 +700,19 @@ class ChannelMessagesView(CachedStateView[SupportsMessageID, Snowflake, Message]
     ) -> typing.List[Message]:
         return await self.client.messages.fetch_many(self.channel_id, ordering, point, limit=limit)
 
+    def history(
+        self,
+        ordering: FetchOrdering = FetchOrdering.BEFORE,
+        point: MaybeUndefined[typing.Union[SupportsMessageID, datetime]] = undefined,
+        *,
+        until: MaybeUndefined[typing.Union[SupportsMessageID, datetime]] = undefined,
+        limit: MaybeUndefined[int] = undefined,
+        flags: CacheFlags = CacheFlags.ALL,
+    ) -> typing.AsyncIterator[Message]:
+        return self.client.messages.history(
+            self.channel_id, ordering, point, until=until, limit=limit, flags=flags
+        )
+
     def update(
         self,
         message: SupportsMessageID,
@@ -421,3 +729,21 @@ class ChannelMessagesView(CachedStateView[SupportsMessageID, Snowflake, Message]
         self, messages: typing.Iterable[SupportsMessageID]
     ) -> typing.List[Message]:
         return await self.client.messages.delete_many(self.channel_id, messages)
+
+    async def purge(
+        self,
+        messages: MaybeUndefined[typing.Iterable[SupportsMessageID]] = undefined,
+        *,
+        before: MaybeUndefined[typing.Union[SupportsMessageID, datetime]] = undefined,
+        after: MaybeUndefined[typing.Union[SupportsMessageID, datetime]] = undefined,
+        limit: MaybeUndefined[int] = undefined,
+        concurrency: int = 4,
+    ) -> typing.List[Snowflake]:
+        return await self.client.messages.purge(
+            self.channel_id,
+            messages,
+            before=before,
+            after=after,
+            limit=limit,
+            concurrency=concurrency,
+        )
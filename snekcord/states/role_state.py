@@ -3,15 +3,17 @@ from __future__ import annotations
 import typing
 
 from ..builders import RoleCreateBuilder, RolePositionsBuilder, RoleUpdateBuilder
-from ..cache import RefStore, SnowflakeMemoryRefStore
+from ..cache import Checkpoint, RefStore, SnowflakeMemoryRefStore
 from ..enums import CacheFlags, Permissions
 from ..events import RoleEvents
 from ..objects import (
     CachedRole,
+    Member,
     Role,
     SnowflakeWrapper,
     SupportsGuildID,
     SupportsRoleID,
+    SupportsUserID,
 )
 from ..rest.endpoints import DELETE_GUILD_ROLE, GET_GUILD_ROLES
 from ..snowflake import Snowflake
@@ -22,6 +24,7 @@ from .base_state import CachedEventState, CachedStateView
 if typing.TYPE_CHECKING:
     from ..clients import Client
     from ..json import JSONObject, JSONType
+    from .member_state import RoleUpdateCallback, RoleUpdateProgress
 
 __all__ = ('RoleState', 'GuildRolesView')
 
@@ -182,6 +185,50 @@ class RoleState(CachedEventState[SupportsRoleID, Snowflake, CachedRole, Role]):
         )
         return await self.client.roles.drop(role_id)
 
+    async def add_to_members(
+        self,
+        guild: SupportsGuildID,
+        role: SupportsRoleID,
+        members: typing.Iterable[typing.Union[SupportsUserID, Member]],
+        *,
+        checkpoint: typing.Optional[Checkpoint] = None,
+        concurrency: int = 10,
+        batch_size: int = 100,
+        callback: typing.Optional[RoleUpdateCallback] = None,
+    ) -> RoleUpdateProgress:
+        """Give the role to any number of members, see MemberState.add_role_many()."""
+        return await self.client.members.add_role_many(
+            guild,
+            role,
+            members,
+            checkpoint=checkpoint,
+            concurrency=concurrency,
+            batch_size=batch_size,
+            callback=callback,
+        )
+
+    async def remove_from_members(
+        self,
+        guild: SupportsGuildID,
+        role: SupportsRoleID,
+        members: typing.Iterable[typing.Union[SupportsUserID, Member]],
+        *,
+        checkpoint: typing.Optional[Checkpoint] = None,
+        concurrency: int = 10,
+        batch_size: int = 100,
+        callback: typing.Optional[RoleUpdateCallback] = None,
+    ) -> RoleUpdateProgress:
+        """Take the role from any number of members, see MemberState.remove_role_many()."""
+        return await self.client.members.remove_role_many(
+            guild,
+            role,
+            members,
+            checkpoint=checkpoint,
+            concurrency=concurrency,
+            batch_size=batch_size,
+            callback=callback,
+        )
+
 
 class GuildRolesView(CachedStateView[SupportsRoleID, Snowflake, Role]):
     def __init__(
@@ -244,3 +291,43 @@ class GuildRolesView(CachedStateView[SupportsRoleID, Snowflake, Role]):
 
     async def delete(self, role: SupportsRoleID) -> typing.Optional[Role]:
         return await self.client.roles.delete(self.guild_id, role)
+
+    async def add_to_members(
+        self,
+        role: SupportsRoleID,
+        members: typing.Iterable[typing.Union[SupportsUserID, Member]],
+        *,
+        checkpoint: typing.Optional[Checkpoint] = None,
+        concurrency: int = 10,
+        batch_size: int = 100,
+        callback: typing.Optional[RoleUpdateCallback] = None,
+    ) -> RoleUpdateProgress:
+        return await self.client.roles.add_to_members(
+            self.guild_id,
+            role,
+            members,
+            checkpoint=checkpoint,
+            concurrency=concurrency,
+            batch_size=batch_size,
+            callback=callback,
+        )
+
+    async def remove_from_members(
+        self,
+        role: SupportsRoleID,
+        members: typing.Iterable[typing.Union[SupportsUserID, Member]],
+        *,
+        checkpoint: typing.Optional[Checkpoint] = None,
+        concurrency: int = 10,
+        batch_size: int = 100,
+        callback: typing.Optional[RoleUpdateCallback] = None,
+    ) -> RoleUpdateProgress:
+        return await self.client.roles.remove_from_members(
+            self.guild_id,
+            role,
+            members,
+            checkpoint=checkpoint,
+            concurrency=concurrency,
+            batch_size=batch_size,
+            callback=callback,
+        )
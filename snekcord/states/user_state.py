@@ -39,7 +39,7 @@ class UserState(CachedEventState[SupportsUserID, Snowflake, CachedUser, User]):
             if cached is None:
                 cached = CachedUser.from_json(data)
 
-                if flags & CacheFlags.ROLES:
+                if flags & CacheFlags.USERS:
                     await self.cache.create(user_id, cached)
             else:
                 cached.update(data)
@@ -47,6 +47,50 @@ class UserState(CachedEventState[SupportsUserID, Snowflake, CachedUser, User]):
 
         return cached
 
+    async def upsert_many_cached(
+        self, objects: typing.Iterable[JSONObject], flags: CacheFlags = CacheFlags.ALL
+    ) -> typing.List[CachedUser]:
+        objects = list(objects)
+
+        user_ids = []
+        for data in objects:
+            user_id = Snowflake.into(data, 'id')
+            assert user_id is not None
+
+            user_ids.append(user_id)
+
+        created = []
+        updated = []
+        upserted = []
+
+        async with self.synchronize_many(user_ids):
+            # A user that appears more than once in the batch is only created once
+            seen: typing.Dict[Snowflake, CachedUser] = {}
+
+            for user_id, data, cached in zip(
+                user_ids, objects, await self.cache.get_many(user_ids)
+            ):
+                if user_id in seen:
+                    cached = seen[user_id]
+                    cached.update(data)
+                elif cached is None:
+                    cached = CachedUser.from_json(data)
+                    created.append((user_id, cached))
+                else:
+                    cached.update(data)
+                    updated.append((user_id, cached))
+
+                seen[user_id] = cached
+                upserted.append(cached)
+
+            if created and flags & CacheFlags.USERS:
+                await self.cache.create_many(created)
+
+            if updated:
+                await self.cache.update_many(updated)
+
+        return upserted
+
     async def from_cached(self, cached: CachedUser) -> User:
         if cached.flags is not undefined:
             flags = UserFlags(cached.flags)
@@ -8,6 +8,7 @@ import io
 import mimetypes
 import mmap
 import os
+import stat
 import typing
 
 import aiohttp
@@ -21,12 +22,15 @@ __all__ = (
     'AsyncReadStream',
     'BufferReadStream',
     'FSReadStream',
+    'MappedFSReadStream',
+    'MemoryViewReadStream',
     'ResponseReadStream',
 )
 
 FilePath = typing.Union[str, os.PathLike[str], os.PathLike[bytes], int]
 
 CHUNK_SIZE = 2**16
+MAX_CHUNK_SIZE = 2**20
 DEFAULT_CONTENT_TYPE = 'application/octet-stream'
 
 
@@ -69,6 +73,9 @@ class AsyncReadStream:
     async def aread(self, amount: int) -> bytes:
         raise NotImplementedError
 
+    def close(self) -> None:
+        """Release the resources held by the stream."""
+
     async def aiter(self) -> typing.AsyncIterator[bytes]:
         while self.unread:
             yield self.unread.popleft()
@@ -92,6 +99,39 @@ class AsyncReadStream:
 
         return f'data:{content_type};base64,{data.decode("utf-8")}'
 
+    async def to_file(self, path: FilePath) -> int:
+        """Write the rest of the stream to a file chunk by chunk, returning the number
+        of bytes written. The file is replaced only once it has been written completely."""
+        loop = asyncio.get_running_loop()
+
+        if isinstance(path, int):
+            raise TypeError('to_file() requires a path, not a file descriptor')
+
+        path = os.fspath(path)
+        temporary = f'{path}.{os.getpid()}.{id(self):x}.part'
+
+        size = 0
+
+        fp = await loop.run_in_executor(None, open, temporary, 'wb')
+        try:
+            async for chunk in self.aiter():
+                await loop.run_in_executor(None, fp.write, chunk)
+                size += len(chunk)
+
+            await loop.run_in_executor(None, fp.close)
+            await loop.run_in_executor(None, os.replace, temporary, path)
+        except BaseException:
+            fp.close()
+
+            try:
+                os.remove(temporary)
+            except FileNotFoundError:
+                pass
+
+            raise
+
+        return size
+
 
 class BufferReadStream(AsyncReadStream):
     def __init__(self, buffer: io.BytesIO, content_type: typing.Optional[str] = None) -> None:
@@ -104,6 +144,7 @@ class BufferReadStream(AsyncReadStream):
 
         self.buffer = io.BytesIO()
         self.buffer.write(data)
+        self.buffer.seek(0)
 
         AsyncReadStream.__init__(self, content_type=content_type)
         return self
@@ -112,6 +153,81 @@ class BufferReadStream(AsyncReadStream):
         return self.buffer.read(amount)
 
 
+class MemoryViewReadStream(AsyncReadStream):
+    """A stream over an existing buffer that is read through a memoryview.
+
+    aiter() yields slices of the view and aread_all() returns the original
+    object when nothing has been consumed, so the buffer is never copied.
+    The buffer should not be modified while the stream is in use."""
+
+    def __init__(self, data: ReadableBuffer, *, content_type: typing.Optional[str] = None) -> None:
+        self.data = data
+        self.view = memoryview(data)
+
+        if not self.view.c_contiguous:
+            self.view = memoryview(self.view.tobytes())
+
+        self.view = self.view.cast('B')
+        self.position = 0
+
+        super().__init__(content_type=content_type)
+
+    def get_size(self) -> int:
+        """Return the number of bytes left in the stream."""
+        return len(self.view) - self.position + sum(len(data) for data in self.unread)
+
+    def rewind_unread(self) -> bool:
+        # Data pushed back into unread is usually what was just read (e.g. by
+        # detect_content_type), in which case it can be rewound instead of joined
+        end = self.position
+        start = end - sum(len(data) for data in self.unread)
+
+        if start < 0 or self.view[start:end] != b''.join(self.unread):
+            return False
+
+        self.unread.clear()
+        self.position = start
+
+        return True
+
+    async def aread(self, amount: int) -> bytes:
+        start = self.position
+        end = self.position = min(start + amount, len(self.view))
+
+        return self.view[start:end].tobytes()
+
+    async def aiter(self) -> typing.AsyncIterator[bytes]:
+        self.rewind_unread()
+
+        while self.unread:
+            yield self.unread.popleft()
+
+        size = len(self.view)
+
+        while self.position < size:
+            start = self.position
+            end = self.position = min(start + MAX_CHUNK_SIZE, size)
+
+            yield typing.cast(bytes, self.view[start:end])
+
+    async def aread_all(self) -> bytes:
+        rewound = self.rewind_unread()
+
+        start = self.position
+        self.position = len(self.view)
+
+        if not rewound:
+            data = b''.join(self.unread) + self.view[start:]
+            self.unread.clear()
+
+            return data
+
+        if start == 0 and isinstance(self.data, bytes):
+            return self.data
+
+        return typing.cast(bytes, self.view[start:])
+
+
 class FSReadStream(AsyncReadStream):
     def __init__(self, path: FilePath, *, content_type: typing.Optional[str] = None) -> None:
         if isinstance(path, os.PathLike):
@@ -121,7 +237,7 @@ class FSReadStream(AsyncReadStream):
 
         self.fp: typing.Optional[typing.IO[bytes]] = None
 
-        if isinstance(self.path, str):
+        if content_type is None and isinstance(self.path, str):
             content_type = mimetypes.guess_type(self.path)[0]
 
         super().__init__(content_type=content_type)
@@ -146,6 +262,136 @@ class FSReadStream(AsyncReadStream):
         loop = asyncio.get_running_loop()
         return await loop.run_in_executor(None, self.read, amount)
 
+    def close(self) -> None:
+        if self.fp is not None:
+            self.fp.close()
+
+
+class MappedFSReadStream(FSReadStream):
+    """A file stream that memory-maps regular files instead of reading them in an executor.
+
+    aiter() yields memoryview slices of the map that grow from CHUNK_SIZE up to
+    MAX_CHUNK_SIZE, so no bytes objects are created for the chunks. Pages are faulted
+    in by whoever consumes the chunks, which is usually the event loop, so this is best
+    suited to files that are likely to be in the page cache. Files that cannot be mapped
+    (pipes, sockets, empty files) are read like a regular FSReadStream."""
+
+    map: typing.Optional[mmap.mmap]
+
+    def __init__(self, path: FilePath, *, content_type: typing.Optional[str] = None) -> None:
+        super().__init__(path, content_type=content_type)
+
+        self.map = None
+        self.mapped = False
+        self.position = 0
+        self.chunk_size = CHUNK_SIZE
+
+    @classmethod
+    def from_fp(cls, fp: typing.IO[bytes], content_type: typing.Optional[str] = None) -> Self:
+        self = super().from_fp(fp, content_type)
+
+        self.map = None
+        self.mapped = False
+        self.position = 0
+        self.chunk_size = CHUNK_SIZE
+
+        return self
+
+    def open_map(self) -> typing.Optional[mmap.mmap]:
+        if self.fp is None:
+            self.fp = open(self.path, 'rb')
+
+        try:
+            fileno = self.fp.fileno()
+            status = os.fstat(fileno)
+        except (OSError, io.UnsupportedOperation):
+            return None
+
+        if not stat.S_ISREG(status.st_mode) or status.st_size == 0:
+            return None
+
+        mapping = mmap.mmap(fileno, 0, access=mmap.ACCESS_READ)
+
+        if hasattr(mmap, 'MADV_SEQUENTIAL'):
+            mapping.madvise(mmap.MADV_SEQUENTIAL)
+
+        self.position = self.fp.tell()
+        return mapping
+
+    async def get_map(self) -> typing.Optional[mmap.mmap]:
+        if not self.mapped:
+            loop = asyncio.get_running_loop()
+
+            self.map = await loop.run_in_executor(None, self.open_map)
+            self.mapped = True
+
+        return self.map
+
+    def get_size(self) -> typing.Optional[int]:
+        """Return the number of bytes left in the stream if the file is mapped."""
+        if self.map is None:
+            return None
+
+        return len(self.map) - self.position + sum(len(data) for data in self.unread)
+
+    async def aread(self, amount: int) -> bytes:
+        mapping = await self.get_map()
+        if mapping is None:
+            return await super().aread(amount)
+
+        start = self.position
+        end = self.position = min(start + amount, len(mapping))
+
+        return mapping[start:end]
+
+    async def aiter(self) -> typing.AsyncIterator[bytes]:
+        while self.unread:
+            yield self.unread.popleft()
+
+        mapping = await self.get_map()
+        if mapping is None:
+            async for chunk in super().aiter():
+                yield chunk
+
+            return
+
+        view = memoryview(mapping)
+        size = len(mapping)
+
+        while self.position < size:
+            start = self.position
+            end = self.position = min(start + self.chunk_size, size)
+
+            chunk = view[start:end]
+
+            # Start small so short reads stay cheap, then ramp up for bulk transfers
+            self.chunk_size = min(self.chunk_size * 2, MAX_CHUNK_SIZE)
+
+            yield typing.cast(bytes, chunk)
+
+    async def aread_all(self) -> bytes:
+        mapping = await self.get_map()
+        if mapping is None:
+            return await super().aread_all()
+
+        start = self.position
+        self.position = len(mapping)
+
+        data = b''.join(self.unread) + mapping[start:]
+        self.unread.clear()
+
+        return data
+
+    def close(self) -> None:
+        if self.map is not None:
+            try:
+                self.map.close()
+            except BufferError:
+                # Chunks from aiter are still referenced, the mapping is released along with them
+                pass
+
+        super().close()
+
 
 class ResponseReadStream(AsyncReadStream):
     def __init__(
@@ -161,6 +407,9 @@ class ResponseReadStream(AsyncReadStream):
     async def aread(self, amount: int) -> bytes:
         return await self.response.content.read(amount)
 
+    def close(self) -> None:
+        self.response.release()
+
 
 SupportsStream = typing.Union[
     AsyncReadStream,
@@ -188,6 +437,6 @@ def create_stream(
         return ResponseReadStream(object, content_type=content_type)
 
     elif isinstance(object, (bytes, bytearray, memoryview, array.array, mmap.mmap)):
-        return BufferReadStream.from_bytes(object, content_type=content_type)
+        return MemoryViewReadStream(object, content_type=content_type)
 
     return FSReadStream.from_fp(object, content_type=content_type)
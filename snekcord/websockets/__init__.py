@@ -1,2 +1,4 @@
+from .shard_launcher import *
+from .shard_limiter import *
 from .shard_websocket import *
 from .voice_websocket import *
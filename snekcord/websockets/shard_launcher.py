@@ -0,0 +1,221 @@
+from __future__ import annotations
+
+import asyncio
+import inspect
+import time
+import typing
+
+from loguru import logger
+
+from ..json import JSONObject, json_get
+
+if typing.TYPE_CHECKING:
+    from .shard_websocket import Shard
+
+__all__ = ('SessionStartLimit', 'ShardLaunchProgress', 'ShardLauncher')
+
+# Every bucket can identify one shard in this many seconds
+IDENTIFY_INTERVAL = 5.0
+
+# The number of seconds after a reset at which the session start limit resets again
+SESSION_START_LIMIT_PERIOD = 86400.0
+
+ShardLaunchCallback = typing.Callable[
+    ['ShardLaunchProgress'], typing.Optional[typing.Awaitable[None]]
+]
+
+
+class SessionStartLimit:
+    """The number of sessions the bot can still start, from session_start_limit
+    in the response to GET_GATEWAY_BOT."""
+
+    __slots__ = ('total', 'remaining', 'reset_at', 'max_concurrency')
+
+    def __init__(
+        self, *, total: int, remaining: int, reset_after: float, max_concurrency: int = 1
+    ) -> None:
+        self.total = total
+        self.remaining = remaining
+        # The time.monotonic() at which remaining is reset to total
+        self.reset_at = time.monotonic() + reset_after
+        self.max_concurrency = max_concurrency
+
+    def __repr__(self) -> str:
+        return (
+            f'SessionStartLimit(total={self.total!r}, remaining={self.remaining!r}, '
+            f'reset_after={self.reset_after!r}, max_concurrency={self.max_concurrency!r})'
+        )
+
+    @classmethod
+    def from_json(cls, data: JSONObject) -> SessionStartLimit:
+        return cls(
+            total=json_get(data, 'total', int),
+            remaining=json_get(data, 'remaining', int),
+            reset_after=json_get(data, 'reset_after', int) / 1000,
+            max_concurrency=json_get(data, 'max_concurrency', int, default=1),
+        )
+
+    @property
+    def reset_after(self) -> float:
+        return max(self.reset_at - time.monotonic(), 0.0)
+
+    async def consume(self) -> None:
+        """Takes a session from the budget, waiting for the limit to reset if it is exhausted."""
+        while True:
+            now = time.monotonic()
+
+            if now >= self.reset_at:
+                self.remaining = self.total
+                self.reset_at = now + SESSION_START_LIMIT_PERIOD
+
+            if self.remaining > 0:
+                self.remaining -= 1
+                return
+
+            delay = self.reset_at - now
+            logger.warning(f'Session start limit exhausted, waiting {delay:.0f}s for it to reset')
+
+            await asyncio.sleep(delay)
+
+
+class ShardLaunchProgress:
+    """The progress of starting the shards of a client, see ShardLauncher."""
+
+    __slots__ = ('total', 'identified', 'ready', 'started_at')
+
+    identified: typing.Set[int]
+    ready: typing.Set[int]
+
+    def __init__(self, total: int) -> None:
+        self.total = total
+        # The ids of the shards that have sent IDENTIFY
+        self.identified = set()
+        # The ids of the shards that have received READY
+        self.ready = set()
+        self.started_at = time.monotonic()
+
+    def __repr__(self) -> str:
+        return (
+            f'ShardLaunchProgress(total={self.total!r}, identified={len(self.identified)!r}, '
+            f'ready={len(self.ready)!r}, elapsed={self.elapsed:.1f})'
+        )
+
+    @property
+    def pending(self) -> int:
+        return self.total - len(self.identified)
+
+    @property
+    def elapsed(self) -> float:
+        return time.monotonic() - self.started_at
+
+    def is_complete(self) -> bool:
+        return len(self.ready) >= self.total
+
+
+class ShardLauncher:
+    """Starts shards as fast as the gateway allows.
+
+    Shards are grouped into max_concurrency buckets by shard_id % max_concurrency.
+    Each bucket identifies one shard every 5 seconds and the buckets identify in
+    parallel. Every IDENTIFY, including ones sent when a shard cannot resume,
+    takes a session from the session start limit."""
+
+    identify_futures: typing.Dict[int, asyncio.Future[None]]
+
+    def __init__(
+        self,
+        *,
+        max_concurrency: int = 1,
+        limit: typing.Optional[SessionStartLimit] = None,
+        callback: typing.Optional[ShardLaunchCallback] = None,
+    ) -> None:
+        if max_concurrency < 1:
+            raise ValueError('max_concurrency should be >= 1')
+
+        self.max_concurrency = max_concurrency
+        self.limit = limit
+        self.callback = callback
+
+        self.locks: typing.Dict[int, asyncio.Lock] = {}
+        self.identified_at: typing.Dict[int, float] = {}
+
+        self.identify_futures = {}
+        self.progress = ShardLaunchProgress(0)
+
+    def get_bucket(self, shard_id: int) -> int:
+        return shard_id % self.max_concurrency
+
+    async def notify(self) -> None:
+        if self.callback is not None:
+            result = self.callback(self.progress)
+            if inspect.isawaitable(result):
+                await result
+
+    async def wait_for_identify(self, shard_id: int) -> None:
+        """Waits until the shard with shard_id is allowed to send IDENTIFY."""
+        bucket = self.get_bucket(shard_id)
+
+        lock = self.locks.get(bucket)
+        if lock is None:
+            lock = self.locks[bucket] = asyncio.Lock()
+
+        async with lock:
+            delay = self.identified_at.get(bucket, 0.0) + IDENTIFY_INTERVAL - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+
+            if self.limit is not None:
+                await self.limit.consume()
+
+            self.identified_at[bucket] = time.monotonic()
+
+    async def mark_identified(self, shard_id: int) -> None:
+        future = self.identify_futures.pop(shard_id, None)
+        if future is not None and not future.done():
+            future.set_result(None)
+
+        self.progress.identified.add(shard_id)
+        await self.notify()
+
+    async def mark_ready(self, shard_id: int) -> None:
+        self.progress.ready.add(shard_id)
+        await self.notify()
+
+    async def acquire(self, shard: Shard) -> None:
+        """Waits until the shard is allowed to send IDENTIFY."""
+        await self.wait_for_identify(shard.shard_id)
+        await self.mark_identified(shard.shard_id)
+
+    async def set_ready(self, shard: Shard) -> None:
+        """Records that the shard received READY."""
+        await self.mark_ready(shard.shard_id)
+
+    async def launch_bucket(self, shards: typing.List[Shard]) -> None:
+        loop = asyncio.get_running_loop()
+
+        for shard in shards:
+            future = self.identify_futures[shard.shard_id] = loop.create_future()
+            shard.start()
+
+            # The next shard is connected while this one waits for its turn to identify
+            assert shard.task is not None
+            await asyncio.wait((future, shard.task), return_when=asyncio.FIRST_COMPLETED)
+
+    async def launch(self, shards: typing.Iterable[Shard]) -> None:
+        """Starts every shard, returns once every shard has sent IDENTIFY."""
+        buckets: typing.Dict[int, typing.List[Shard]] = {}
+
+        for shard in sorted(shards, key=lambda shard: shard.shard_id):
+            buckets.setdefault(self.get_bucket(shard.shard_id), []).append(shard)
+
+        self.progress = ShardLaunchProgress(sum(len(bucket) for bucket in buckets.values()))
+
+        estimate = (max(map(len, buckets.values()), default=1) - 1) * IDENTIFY_INTERVAL
+        logger.info(
+            f'Launching {self.progress.total} shards in {len(buckets)} buckets, '
+            f'this should take at least {estimate:.0f}s'
+        )
+
+        await asyncio.gather(*(self.launch_bucket(bucket) for bucket in buckets.values()))
+
+        logger.info(f'Launched {self.progress.total} shards in {self.progress.elapsed:.1f}s')
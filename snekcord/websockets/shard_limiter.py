@@ -0,0 +1,138 @@
+from __future__ import annotations
+
+import asyncio
+import collections
+import time
+import typing
+
+from loguru import logger
+
+__all__ = ('ShardSendLimiter',)
+
+# The gateway closes connections that send more than this many commands in a period
+SEND_LIMIT = 120
+SEND_PERIOD = 60.0
+
+# The number of commands in every period that only heartbeats, IDENTIFY and RESUME can use
+RESERVED_SENDS = 5
+
+
+class ShardSendLimiter:
+    """Keeps the commands sent over a gateway connection under the gateway's limit.
+
+    Up to limit commands are let through every period seconds, the last reserved
+    of them are kept for priority commands (heartbeats, IDENTIFY and RESUME) so that
+    the connection stays alive however many other commands are waiting. Commands that
+    have to wait are sent in the order they were made, priority commands first."""
+
+    urgent: typing.Deque[asyncio.Future[None]]
+    waiters: typing.Deque[asyncio.Future[None]]
+
+    def __init__(
+        self,
+        *,
+        limit: int = SEND_LIMIT,
+        period: float = SEND_PERIOD,
+        reserved: int = RESERVED_SENDS,
+    ) -> None:
+        if not 0 <= reserved < limit:
+            raise ValueError('reserved should be >= 0 and < limit')
+
+        self.limit = limit
+        self.period = period
+        self.reserved = reserved
+
+        self.count = 0
+        self.window_reset_at = 0.0
+
+        self.urgent = collections.deque()
+        self.waiters = collections.deque()
+
+        self.wakeup_handle: typing.Optional[asyncio.TimerHandle] = None
+
+    @property
+    def queue_depth(self) -> int:
+        """The number of commands waiting to be sent."""
+        return len(self.urgent) + len(self.waiters)
+
+    def try_acquire(self, now: float, priority: bool) -> bool:
+        if now >= self.window_reset_at:
+            self.window_reset_at = now + self.period
+            self.count = 0
+
+        if self.count >= (self.limit if priority else self.limit - self.reserved):
+            return False
+
+        self.count += 1
+        return True
+
+    def release(self) -> None:
+        """Gives back a slot taken by a command that was never sent."""
+        self.count = max(self.count - 1, 0)
+        self.wakeup()
+
+    async def acquire(self, *, priority: bool = False) -> None:
+        """Waits until a command can be sent."""
+        queue = self.urgent if priority else self.waiters
+
+        if not self.urgent and not queue and self.try_acquire(time.monotonic(), priority):
+            return
+
+        future = asyncio.get_running_loop().create_future()
+        queue.append(future)
+
+        if self.queue_depth == 1:
+            logger.debug(f'Shard send limit reached, queueing commands for {self.retry_after:.1f}s')
+
+        self.schedule_wakeup()
+
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                self.release()
+            elif future in queue:
+                queue.remove(future)
+            raise
+
+    @property
+    def retry_after(self) -> float:
+        return max(self.window_reset_at - time.monotonic(), 0.0)
+
+    def wakeup(self) -> None:
+        now = time.monotonic()
+
+        for queue, priority in ((self.urgent, True), (self.waiters, False)):
+            while queue:
+                if queue[0].done():
+                    queue.popleft()
+                    continue
+
+                if not self.try_acquire(now, priority):
+                    return self.schedule_wakeup()
+
+                queue.popleft().set_result(None)
+
+        self.schedule_wakeup()
+
+    def schedule_wakeup(self) -> None:
+        if self.wakeup_handle is not None:
+            self.wakeup_handle.cancel()
+            self.wakeup_handle = None
+
+        if not self.queue_depth:
+            return
+
+        self.wakeup_handle = asyncio.get_running_loop().call_later(self.retry_after, self.wakeup)
+
+    def close(self) -> None:
+        """Fails every waiting command, called when the connection is lost."""
+        if self.wakeup_handle is not None:
+            self.wakeup_handle.cancel()
+            self.wakeup_handle = None
+
+        for queue in (self.urgent, self.waiters):
+            while queue:
+                future = queue.popleft()
+                if not future.done():
+                    future.set_exception(ConnectionResetError('The WebSocket was closed'))
@@ -7,17 +7,23 @@ import platform
 import random
 import time
 import typing
+import urllib.parse
+import zlib
 
+import attr
 import wsaio
 from loguru import logger
 
+from ..etf import dump_etf, load_etf
 from ..exceptions import (
     AuthenticationFailedError,
     DisallowedIntentsError,
     PendingCancellationError,
     ShardCloseError,
 )
-from ..json import JSONObject, dump_json, json_get, load_json
+from ..json import JSONObject, JSONSnowflake, json_get
+from ..snowflake import Snowflake
+from .shard_limiter import ShardSendLimiter
 
 if typing.TYPE_CHECKING:
     from ..clients import WebSocketClient
@@ -26,12 +32,18 @@ if typing.TYPE_CHECKING:
 __all__ = (
     'ShardOpcode',
     'ShardCloseCode',
+    'ShardOptions',
     'Shard',
     'ShardWebSocket',
 )
 
 T = typing.TypeVar('T')
 
+GATEWAY_VERSION = 9
+
+# Every message in a zlib-stream ends with the suffix of a Z_SYNC_FLUSH
+ZLIB_SUFFIX = b'\x00\x00\xff\xff'
+
 
 class ShardOpcode(enum.IntEnum):
     DISPATCH = 0
@@ -80,6 +92,7 @@ class ShardCancellationToken(enum.IntEnum):
 
     RECONNECT_RECEIVED = enum.auto()
     BINARY_RECEIVED = enum.auto()
+    INVALID_COMPRESSED_DATA = enum.auto()
     INVALID_SESSION = enum.auto()
     SIGNAL_INTERRUPT = enum.auto()
 
@@ -87,18 +100,47 @@ class ShardCancellationToken(enum.IntEnum):
     CONNECTION_CLOSED = enum.auto()
 
 
+@attr.s(kw_only=True)
+class ShardOptions:
+    """Gateway connection settings used by Shard."""
+
+    encoding: str = attr.ib(default='json', validator=attr.validators.in_(('json', 'etf')))
+    """The encoding of gateway payloads, either 'json' or 'etf'. ETF payloads are sent
+    in binary frames and the snowflakes in them are integers instead of strings."""
+
+    compress: bool = attr.ib(default=False)
+    """Whether the gateway should compress everything it sends as one zlib stream
+    (compress=zlib-stream), this trades CPU time for a fraction of the bandwidth."""
+
+
 class ShardWebSocket(wsaio.WebSocketClient):
     def __init__(self, shard: Shard) -> None:
         super().__init__(loop=shard.loop)
         self.shard = shard
         self.detached = False
 
-    async def send_json(self, data: JSONObject) -> None:
-        await self.send(dump_json(data))
+        # The gateway uses the same backend as the client's REST session
+        self.json_backend = shard.client.rest.json_backend
+        self.etf = shard.options.encoding == 'etf'
+
+        # The stream spans the whole connection, a new one is started on every reconnect
+        self.inflator = zlib.decompressobj() if shard.options.compress else None
+        self.buffer = bytearray()
+
+        # The gateway limits the commands sent over each connection
+        self.limiter = ShardSendLimiter()
+
+    async def send_json(self, data: JSONObject, *, priority: bool = False) -> None:
+        await self.limiter.acquire(priority=priority)
+
+        if self.etf:
+            await self.send(dump_etf(data), binary=True)
+        else:
+            await self.send(self.json_backend.dumps(data))
 
     async def send_heartbeat(self) -> None:
         logger.info('WebSocket sending HEARTBEAT payload')
-        await self.send_json({'op': ShardOpcode.HEARTBEAT, 'd': None})
+        await self.send_json({'op': ShardOpcode.HEARTBEAT, 'd': None}, priority=True)
 
     async def send_identify(
         self,
@@ -130,7 +172,7 @@ class ShardWebSocket(wsaio.WebSocketClient):
             payload['d']['large_threshold'] = large_threshold
 
         logger.info('WebSocket sending IDENTIFY payload')
-        await self.send_json(payload)
+        await self.send_json(payload, priority=True)
 
     async def send_resume(self, token: str, session_id: str, sequence: int) -> None:
         payload: JSONObject = {
@@ -143,7 +185,7 @@ class ShardWebSocket(wsaio.WebSocketClient):
         }
 
         logger.info('WebSocket sending resume payload')
-        await self.send_json(payload)
+        await self.send_json(payload, priority=True)
 
     async def request_guild_members(
         self,
@@ -216,10 +258,13 @@ class ShardWebSocket(wsaio.WebSocketClient):
         if self.detached:
             return logger.debug('WebSocket received text but it is detached')
 
+        await self.handle_payload(data)
+
+    async def handle_payload(self, data: typing.Union[str, bytes]) -> None:
         try:
-            payload = load_json(data)
+            payload = load_etf(data) if self.etf else self.json_backend.loads(data)
         except Exception:
-            return logger.debug('WebSocket received non-JSON text payload')
+            return logger.debug('WebSocket received payload that could not be decoded')
 
         if not isinstance(payload, dict):
             return logger.debug('WebSocket received non-object JSON payload')
@@ -277,7 +322,29 @@ class ShardWebSocket(wsaio.WebSocketClient):
         if self.detached:
             return logger.debug('WebSocket received binary but it is detached')
 
-        self.shard.state.cancel(ShardCancellationToken.BINARY_RECEIVED)
+        if self.inflator is None:
+            if not self.etf:
+                return self.shard.state.cancel(ShardCancellationToken.BINARY_RECEIVED)
+
+            return await self.handle_payload(data)
+
+        # A message can be split across several frames, it can only be
+        # inflated once the frame that ends with the flush suffix arrives
+        if not data.endswith(ZLIB_SUFFIX):
+            self.buffer.extend(data)
+            return
+
+        if self.buffer:
+            self.buffer.extend(data)
+            data = bytes(self.buffer)
+            self.buffer.clear()
+
+        try:
+            inflated = self.inflator.decompress(data)
+        except zlib.error:
+            return self.shard.state.cancel(ShardCancellationToken.INVALID_COMPRESSED_DATA)
+
+        await self.handle_payload(inflated)
 
     async def on_close(self, data: bytes, code: int):
         if self.detached:
@@ -286,6 +353,8 @@ class ShardWebSocket(wsaio.WebSocketClient):
         self.shard.state.cancel(ShardCancellationToken.CONNECTION_CLOSING, (data, code))
 
     async def on_closed(self, exc: typing.Optional[BaseException]) -> None:
+        self.limiter.close()
+
         if self.detached:
             return logger.debug('WebSocket closed but is is datached')
 
@@ -293,6 +362,7 @@ class ShardWebSocket(wsaio.WebSocketClient):
 
     def detach(self):
         self.detached = True
+        self.limiter.close()
 
 
 class ShardBeater:
@@ -344,7 +414,7 @@ class ShardState:
 
         self.sequence = -1
         self.session_id: typing.Optional[str] = None
-        self.guilds: typing.Dict[str, ShardGuildStatus] = {}
+        self.guilds: typing.Dict[Snowflake, ShardGuildStatus] = {}
 
         self.hello_future = None
         self.ready_future = None
@@ -359,13 +429,13 @@ class ShardState:
     async def get_cancellation(self) -> typing.Tuple[ShardCancellationToken, typing.Any]:
         return await self.cancellation_queue.get()
 
-    def set_guild_status(self, guild_id: str, status: ShardGuildStatus) -> None:
+    def set_guild_status(self, guild_id: Snowflake, status: ShardGuildStatus) -> None:
         self.guilds[guild_id] = status
 
-    def get_guild_status(self, guild_id: str) -> typing.Optional[ShardGuildStatus]:
+    def get_guild_status(self, guild_id: Snowflake) -> typing.Optional[ShardGuildStatus]:
         return self.guilds.get(guild_id)
 
-    def remove_guild_status(self, guild_id: str) -> typing.Optional[ShardGuildStatus]:
+    def remove_guild_status(self, guild_id: Snowflake) -> typing.Optional[ShardGuildStatus]:
         return self.guilds.pop(guild_id, None)
 
     def set_hello(self) -> None:
@@ -420,12 +490,19 @@ class ShardState:
 
 class Shard:
     def __init__(
-        self, client: WebSocketClient, url: str, shard_id: int, *, sharded: bool = False
+        self,
+        client: WebSocketClient,
+        url: str,
+        shard_id: int,
+        *,
+        sharded: bool = False,
+        options: typing.Optional[ShardOptions] = None,
     ) -> None:
         self.client = client
         self.url = url
         self.shard_id = shard_id
         self.sharded = sharded
+        self.options = options if options is not None else ShardOptions()
 
         self.token = self.client.authorization.token
         self.intents = self.client.intents
@@ -436,7 +513,7 @@ class Shard:
 
         self.state = ShardState()
 
-        self.task = None
+        self.task: typing.Optional[asyncio.Task[None]] = None
         self.reconnect = False
 
     @property
@@ -446,12 +523,28 @@ class Shard:
 
         return self.beater.latency
 
+    @property
+    def queued_commands(self) -> int:
+        """The number of commands waiting for the gateway's send limit."""
+        if self.ws is None:
+            return 0
+
+        return self.ws.limiter.queue_depth
+
     def create_websocket(self) -> ShardWebSocket:
         return ShardWebSocket(self)
 
     def create_beater(self) -> ShardBeater:
         return ShardBeater(self)
 
+    def get_url(self) -> str:
+        params = {'v': str(GATEWAY_VERSION), 'encoding': self.options.encoding}
+
+        if self.options.compress:
+            params['compress'] = 'zlib-stream'
+
+        return f"{self.url.rstrip('/')}/?{urllib.parse.urlencode(params)}"
+
     def get_identify_properties(self) -> JSONObject:
         return {'$os': platform.system(), '$browser': 'snekcord', '$device': 'snekcord'}
 
@@ -463,7 +556,7 @@ class Shard:
             self.beater = self.create_beater()
 
             try:
-                await self.ws.connect(self.url)
+                await self.ws.connect(self.get_url())
             except wsaio.HandshakeFailureError:
                 return self.state.cancel(ShardCancellationToken.HANDSHAKE_FAILED)
 
@@ -475,7 +568,13 @@ class Shard:
             if reconnect and self.state.session_id is not None:
                 await self.ws.send_resume(self.token, self.state.session_id, self.state.sequence)
             else:
-                shard = (self.shard_id, len(self.client.shard_ids)) if self.sharded else None
+                shard = (self.shard_id, self.client.shard_count) if self.sharded else None
+
+                if self.client.launcher is not None:
+                    await self.client.launcher.acquire(self)
+
+                    if self.state.has_cancellation():
+                        return
 
                 await self.ws.send_identify(
                     self.token, self.get_identify_properties(), self.intents, shard=shard
@@ -525,16 +624,21 @@ class Shard:
                 for guild in guilds:
                     guild_id = guild.get('id')
 
-                    if isinstance(guild_id, str):
-                        self.state.set_guild_status(guild_id, ShardGuildStatus.UNKNOWN)
+                    if isinstance(guild_id, (str, int)):
+                        self.state.set_guild_status(Snowflake(guild_id), ShardGuildStatus.UNKNOWN)
+
+            if self.client.launcher is not None:
+                await self.client.launcher.set_ready(self)
 
             return self.state.set_ready()
 
         if event == 'RESUMED':
             return self.state.set_ready()
 
+        await self.client.rest.invalidate_event(event, data)
+
         if event == 'GUILD_CREATE':
-            guild_id = json_get(data, 'id', str)
+            guild_id = Snowflake(json_get(data, 'id', JSONSnowflake))
 
             state = self.state.get_guild_status(guild_id)
             if state is None:
@@ -547,7 +651,7 @@ class Shard:
             self.state.set_guild_status(guild_id, ShardGuildStatus.AVAILABLE)
 
         elif event == 'GUILD_DELETE':
-            guild_id = json_get(data, 'id', str)
+            guild_id = Snowflake(json_get(data, 'id', JSONSnowflake))
 
             if data.get('unavailable', False):
                 event = 'GUILD_UNAVAILABLE'
@@ -603,6 +707,13 @@ class Shard:
             logger.warning('Shard closing due to binary data')
             await self.ws.close(code=wsaio.WebSocketCloseCode.UNSUPPORTED_DATA)
 
+        elif token is ShardCancellationToken.INVALID_COMPRESSED_DATA:
+            # The rest of the stream cannot be inflated, the session is resumed on a new one
+            self.reconnect = True
+
+            logger.warning('Shard closing due to invalid compressed data')
+            await self.ws.close(code=wsaio.WebSocketCloseCode.INVALID_PAYLOAD_DATA)
+
         elif token is ShardCancellationToken.INVALID_SESSION:
             self.reconnect = info
 
@@ -639,10 +750,11 @@ class Shard:
         return True
 
     def start(self) -> None:
-        self._task = self.loop.create_task(self.run())
+        self.task = self.loop.create_task(self.run())
 
     async def join(self) -> None:
-        await self._task
+        if self.task is not None:
+            await self.task
 
     async def run(self) -> None:
         while not self.state.stopping:
@@ -0,0 +1,59 @@
+import asyncio
+
+from snekcord.rest import hdrs
+from snekcord.rest.ratelimit import RateLimitBucket
+
+
+def test_new_bucket_waiters_do_not_spin():
+    async def main():
+        bucket = RateLimitBucket('test')
+
+        wakeups = 0
+        wakeup = bucket.wakeup
+
+        def counting_wakeup():
+            nonlocal wakeups
+            wakeups += 1
+            wakeup()
+
+        bucket.wakeup = counting_wakeup
+
+        # The first request discovers the limit, the rest queue behind it
+        await bucket.acquire()
+        waiters = [asyncio.ensure_future(bucket.acquire()) for _ in range(5)]
+
+        await asyncio.sleep(0.2)
+        assert wakeups == 0
+        assert not any(waiter.done() for waiter in waiters)
+
+        bucket.release(
+            {
+                hdrs.X_RATELIMIT_LIMIT: '5',
+                hdrs.X_RATELIMIT_REMAINING: '4',
+                hdrs.X_RATELIMIT_RESET_AFTER: '0.1',
+            }
+        )
+
+        # Four waiters fit in the current window, the last waits for the reset
+        await asyncio.sleep(0.01)
+        assert sum(waiter.done() for waiter in waiters) == 4
+
+        await asyncio.wait_for(asyncio.gather(*waiters), 1.0)
+        assert wakeups <= 3
+
+    asyncio.run(main())
+
+
+def test_retry_after_wakes_waiters_of_new_bucket():
+    async def main():
+        bucket = RateLimitBucket('test')
+
+        await bucket.acquire()
+        waiter = asyncio.ensure_future(bucket.acquire())
+
+        await asyncio.sleep(0)
+        bucket.release({}, retry_after=0.05)
+
+        await asyncio.wait_for(waiter, 1.0)
+
+    asyncio.run(main())